@@ -0,0 +1,55 @@
+"""
+Benchmark: change points of every name series, one series at a time vs. vectorized.
+
+Usage (from the repository root):
+    python benchmarks/bench_changepoints.py [--scale 1.0] [--jobs 1]
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.changepoints import detect_changepoints, name_changepoints, summarize_breaks
+from src.trajectories import TrajectoryStore
+from synthetic import write_synthetic_csv
+from timing import timed
+
+
+def per_series(values: np.ndarray, years: np.ndarray, **kwargs) -> int:
+    """Same segmentation, called one series at a time; returns the break count."""
+    return sum(len(detect_changepoints(row[None, :], years, **kwargs)) for row in values)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--loop-series', type=int, default=500,
+                        help='Series timed in the per-series loop (then extrapolated)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_synthetic_csv(Path(tmp) / 'babynames.csv', scale=args.scale)
+        store = TrajectoryStore.from_babynames(csv_path)
+
+        breaks, vectorized = timed(lambda: name_changepoints(store, min_births=1, n_jobs=args.jobs))
+
+        values = store.shares().tocsc()[:, :args.loop_series].T.toarray()
+        _, loop = timed(per_series, values, store.years)
+        loop *= len(store.names) / len(values)
+
+        print(f"{len(store.names):,} name series x {len(store.years)} years, "
+              f"{len(breaks):,} breaks")
+        print(f"  per-series loop (extrapolated)  {loop:8.2f} s")
+        print(f"  vectorized                      {vectorized:8.2f} s  ({loop / vectorized:.0f}x)")
+        print()
+        print(summarize_breaks(breaks).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: vectorized NameClassifier vs. per-name classify_name_origin.
+
+Usage (from the repository root):
+    python benchmarks/bench_classify.py [--names 100000]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.classify import ORIGIN_NAME_LISTS, NameClassifier
+from timing import best_of
+
+
+def classify_name_origin_sets(name: str) -> str:
+    """The original per-name implementation, kept as the baseline."""
+    latin_names, asian_names, african_middle_eastern_names, irish_italian_names = (
+        set(ORIGIN_NAME_LISTS['Latin']), set(ORIGIN_NAME_LISTS['Asian']),
+        set(ORIGIN_NAME_LISTS['African_MiddleEastern']), set(ORIGIN_NAME_LISTS['Irish_Italian'])
+    )
+    if name in latin_names:
+        return 'Latin'
+    elif name in asian_names:
+        return 'Asian'
+    elif name in african_middle_eastern_names:
+        return 'African_MiddleEastern'
+    elif name in irish_italian_names:
+        return 'Irish_Italian'
+    else:
+        return 'Anglo'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--names', type=int, default=100_000)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    listed = [name for names in ORIGIN_NAME_LISTS.values() for name in names]
+    # Mostly unlisted names, as in the full vocabulary, plus every listed name
+    unlisted = [f"Name{i}" for i in range(args.names - len(listed))]
+    names = pd.Series(rng.permutation(np.array(listed + unlisted, dtype=object)))
+    classifier = NameClassifier()
+    
+    print(f"names: {len(names):,}")
+    for label, func in [
+        ('per-name apply (before)', lambda: names.apply(classify_name_origin_sets)),
+        ('NameClassifier.classify', lambda: classifier.classify(names)),
+    ]:
+        seconds = best_of(func)
+        print(f"{label:26s} {seconds * 1000:9.1f} ms   {len(names) / seconds:14,.0f} names/s")
+
+
+if __name__ == '__main__':
+    main()
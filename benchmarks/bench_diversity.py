@@ -0,0 +1,61 @@
+"""
+Benchmark: exact vs. HyperLogLog name diversity.
+
+Compares per-year unique-name counts and sliding-decade distinct counts,
+reporting time and relative error of the sketches.
+
+Usage (from the repository root):
+    python benchmarks/bench_diversity.py [--scale 1.0]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.compute_trends import calculate_name_diversity
+from src.distinct import YearlySketches
+from src.encoding import encode_names
+from synthetic import make_babynames
+from timing import timed
+
+
+def exact_rolling(df, window):
+    """Distinct names over each sliding window, one hash set per window."""
+    years = np.arange(df['Year'].min() + window - 1, df['Year'].max() + 1)
+    return np.array([
+        df.loc[(df['Year'] > end - window) & (df['Year'] <= end), 'Name'].nunique()
+        for end in years
+    ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0)
+    args = parser.parse_args()
+    
+    df = encode_names(make_babynames(args.scale))
+    print(f"rows: {len(df):,}")
+    
+    exact, t_exact = timed(lambda: calculate_name_diversity(df))
+    print(f"per-year exact:            {t_exact * 1000:8.1f} ms")
+    for error in (0.02, 0.01, 0.005):
+        approx, t = timed(lambda: calculate_name_diversity(df, method='hll', error=error))
+        rel = np.abs(approx['Unique_Names'] / exact['Unique_Names'] - 1)
+        print(f"per-year hll (error={error:<5}): {t * 1000:8.1f} ms   "
+              f"mean |rel err| {rel.mean():.4f}, max {rel.max():.4f}")
+    
+    rolling_exact, t_exact = timed(lambda: exact_rolling(df, 10))
+    sketches, t_build = timed(lambda: YearlySketches.from_frame(df, error=0.01))
+    rolling_hll, t_roll = timed(lambda: sketches.rolling(10))
+    rel = np.abs(rolling_hll.to_numpy() / rolling_exact - 1)
+    print(f"sliding decades exact:     {t_exact * 1000:8.1f} ms")
+    print(f"sliding decades hll:       {(t_build + t_roll) * 1000:8.1f} ms   "
+          f"mean |rel err| {rel.mean():.4f}, max {rel.max():.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark: CSV parsing vs. the columnar cache in load_babynames.
+
+Usage (from the repository root):
+    python benchmarks/bench_load.py [--scale 1.0]
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.load_data import load_babynames
+from synthetic import write_synthetic_csv
+from timing import best_of, timed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'babynames.csv'
+        write_synthetic_csv(csv_path, scale=args.scale)
+        rows = len(load_babynames(csv_path, use_cache=False))
+        
+        baseline = best_of(pd.read_csv, csv_path, repeat=2)
+        typed = best_of(lambda: load_babynames(csv_path, use_cache=False), repeat=2)
+        _, first = timed(load_babynames, csv_path)
+        cached = best_of(load_babynames, csv_path)
+    
+    print(f"rows: {rows:,}")
+    print(f"pd.read_csv (before):         {baseline:8.3f} s")
+    print(f"typed read_csv, no cache:     {typed:8.3f} s")
+    print(f"first load (parse + write):   {first:8.3f} s")
+    print(f"cached load (memory-mapped):  {cached:8.3f} s  ({baseline / cached:,.0f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
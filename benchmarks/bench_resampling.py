@@ -0,0 +1,51 @@
+"""
+Benchmark: bootstrap throughput of PolicyResampler by number of workers.
+
+Usage (from the repository root):
+    python benchmarks/bench_resampling.py [--scale 1.0] [--resamples 2000] [--jobs 1 2 4]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.load_data import load_name_mapping
+from src.resampling import PolicyResampler
+from synthetic import make_babynames
+from timing import timed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--resamples', type=int, default=2000)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+    
+    mapping = load_name_mapping(ROOT / 'data' / 'name_origin_mapping.csv')
+    df = make_babynames(args.scale)
+    # Give the synthetic vocabulary some mapped names
+    rows = df.index[::5][:len(mapping) * 50]
+    df.loc[rows, 'Name'] = np.repeat(mapping['Name'].to_numpy(), 50)[:len(rows)]
+    
+    resampler, setup = timed(PolicyResampler.from_frame, df, mapping)
+    print(f"rows: {len(df):,}   setup {setup:.2f} s")
+    
+    reference = None
+    for n_jobs in args.jobs:
+        result, seconds = timed(
+            lambda: resampler.bootstrap([1924, 1965], n_resamples=args.resamples, n_jobs=n_jobs))
+        # Seeds are per batch, so the worker count must not change the result
+        reference = result if reference is None else reference
+        same = np.allclose(result['CI_Low'], reference['CI_Low'])
+        print(f"n_jobs={n_jobs:<3d} {seconds:7.2f} s   {args.resamples / seconds:8.0f} resamples/s   "
+              f"identical={same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: K origin-mapping schemes, one merge + groupby pipeline each vs.
+calculate_immigrant_indices in one pass.
+
+Usage (from the repository root):
+    python benchmarks/bench_schemes.py [--scale 1.0] [--schemes 24]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.compute_trends import (
+    calculate_immigrant_index, calculate_immigrant_indices, calculate_yearly_shares
+)
+from src.encoding import encode_names
+from src.load_data import load_name_mapping, merge_with_origins
+from synthetic import make_babynames
+from timing import timed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--schemes', type=int, default=24)
+    args = parser.parse_args()
+    
+    mapping = load_name_mapping(ROOT / 'data' / 'name_origin_mapping.csv')
+    df = make_babynames(args.scale)
+    # Give the synthetic vocabulary some mapped names
+    rows = df.index[::5][:len(mapping) * 50]
+    df.loc[rows, 'Name'] = np.repeat(mapping['Name'].to_numpy(), 50)[:len(rows)]
+    df = encode_names(df)
+    
+    # Variants: shuffled region assignments, alternating region sets
+    rng = np.random.default_rng(0)
+    schemes = {}
+    for k in range(args.schemes):
+        variant = mapping.copy()
+        variant['Origin_Region'] = rng.permutation(variant['Origin_Region'].to_numpy())
+        schemes[f'scheme_{k}'] = (variant, None if k % 2 else ['Latin', 'Asian'])
+    
+    print(f"rows: {len(df):,}   schemes: {len(schemes)}")
+    def per_scheme():
+        for variant, regions in schemes.values():
+            calculate_immigrant_index(calculate_yearly_shares(merge_with_origins(df, variant)), regions)
+    
+    _, seconds = timed(per_scheme)
+    print(f"{'one pipeline per scheme (before)':34s} {seconds:8.2f} s")
+    
+    _, seconds = timed(calculate_immigrant_indices, df, schemes)
+    print(f"{'calculate_immigrant_indices':34s} {seconds:8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: peak memory of in-memory vs. streaming aggregation.
+
+Usage (from the repository root):
+    python benchmarks/bench_streaming.py [--scale 1.0] [--chunksize 200000]
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.compute_trends import calculate_name_diversity, calculate_yearly_shares
+from src.load_data import (
+    get_data_summary, iter_babynames_chunks, load_babynames, load_name_mapping, merge_with_origins
+)
+from src.streaming import StreamingAggregator
+from src.utils import get_top_names
+from synthetic import write_synthetic_csv
+from timing import peak_memory
+
+
+def in_memory(csv_path, mapping):
+    df = load_babynames(csv_path, use_cache=False)
+    calculate_yearly_shares(merge_with_origins(df, mapping))
+    calculate_name_diversity(df)
+    get_top_names(df)
+    get_data_summary(df)
+
+
+def streaming(csv_path, mapping, chunksize):
+    agg = StreamingAggregator(mapping).update_all(iter_babynames_chunks(csv_path, chunksize))
+    agg.yearly_shares()
+    agg.name_diversity()
+    agg.top_names()
+    agg.summary()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--chunksize', type=int, default=200_000)
+    args = parser.parse_args()
+    
+    mapping = load_name_mapping(ROOT / 'data' / 'name_origin_mapping.csv')
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_synthetic_csv(Path(tmp) / 'babynames.csv', scale=args.scale)
+        print(f"file: {csv_path.stat().st_size / 2**20:.0f} MiB")
+        for label, func, extra in [
+            ('in-memory', in_memory, ()),
+            (f'streaming ({args.chunksize:,} rows/chunk)', streaming, (args.chunksize,)),
+        ]:
+            seconds, peak = peak_memory(func, csv_path, mapping, *extra)
+            print(f"{label:34s} {seconds:6.2f} s   peak {peak / 2**20:8.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
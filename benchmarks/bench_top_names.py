@@ -0,0 +1,49 @@
+"""
+Benchmark: dominant gender for the top-N names (generate_data step 1).
+
+Compares the original per-name filter loop with build_top_names, which
+resolves every name from one Name x Gender aggregation. The loop is timed
+on a small sample of names and extrapolated.
+
+Usage (from the repository root):
+    python benchmarks/bench_top_names.py [--scale 1.0]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_data import build_top_names
+from src.encoding import encode_names
+from synthetic import make_babynames
+from timing import timed
+
+LOOP_SAMPLE = 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0)
+    args = parser.parse_args()
+    
+    df = encode_names(make_babynames(args.scale))
+    names = df['Name'].cat.categories[:LOOP_SAMPLE]
+    
+    def get_dominant_gender(name):
+        name_data = df[df['Name'] == name].groupby('Gender', observed=True)['Count'].sum()
+        return name_data.idxmax() if len(name_data) > 0 else 'U'
+    
+    _, seconds = timed(lambda: [get_dominant_gender(name) for name in names])
+    per_name = seconds / LOOP_SAMPLE
+    
+    print(f"rows: {len(df):,}")
+    print(f"{'top N':>8s} {'per-name loop (est.)':>22s} {'build_top_names':>16s}")
+    for n in (1_000, 10_000, 100_000):
+        _, seconds = timed(build_top_names, df, n)
+        print(f"{n:8,d} {per_name * n:20.1f} s {seconds * 1000:13.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: get_top_names (sort-based, per-gender masking) vs. the top-N engine.
+
+Usage (from the repository root):
+    python benchmarks/bench_topn.py [--scale 1.0]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.encoding import encode_names
+from src.topn import approximate_top_names
+from src.utils import get_top_names
+from synthetic import make_babynames
+from timing import best_of
+
+WINDOWS = {
+    'Pre-1924': (1880, 1923),
+    'Quota Era (1924-1964)': (1924, 1964),
+    'Post-1965': (1965, 2014)
+}
+
+
+def get_top_names_sorted(df: pd.DataFrame, n: int = 1000, by_gender: bool = False) -> pd.DataFrame:
+    """The original implementation, kept as the baseline."""
+    if by_gender:
+        top_names = []
+        for gender in df['Gender'].unique():
+            gender_df = df[df['Gender'] == gender]
+            top = gender_df.groupby('Name')['Count'].sum().sort_values(ascending=False).head(n).reset_index()
+            top['Gender'] = gender
+            top_names.append(top)
+        return pd.concat(top_names, ignore_index=True)
+    return df.groupby('Name')['Count'].sum().sort_values(ascending=False).head(n).reset_index()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0)
+    args = parser.parse_args()
+    
+    df = encode_names(make_babynames(args.scale))
+    plain = df.astype({'Name': object, 'Gender': object})
+    
+    def windows_sorted():
+        for start, end in WINDOWS.values():
+            get_top_names_sorted(plain[(plain['Year'] >= start) & (plain['Year'] <= end)], by_gender=True)
+    
+    rows = [
+        ('top 1000', lambda: get_top_names_sorted(plain), lambda: get_top_names(df)),
+        ('top 1000 by gender', lambda: get_top_names_sorted(plain, by_gender=True),
+         lambda: get_top_names(df, by_gender=True)),
+        ('by gender x 3 windows', windows_sorted,
+         lambda: get_top_names(df, by_gender=True, windows=WINDOWS)),
+    ]
+    print(f"rows: {len(df):,}")
+    print(f"{'':24s} {'sort (before)':>14s} {'engine (after)':>15s}")
+    for label, before, after in rows:
+        print(f"{label:24s} {best_of(before) * 1000:11.1f} ms {best_of(after) * 1000:12.1f} ms")
+    
+    chunks = [df.iloc[i:i + 200_000] for i in range(0, len(df), 200_000)]
+    exact = set(get_top_names(df)['Name'])
+    seconds = best_of(lambda: approximate_top_names(chunks, capacity=10_000), repeat=1)
+    approx = set(approximate_top_names(chunks, capacity=10_000)['Name'])
+    print(f"heavy hitters over {len(chunks)} chunks: {seconds * 1000:.1f} ms, "
+          f"recall of exact top 1000: {len(exact & approx) / len(exact):.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: per-name questions on the long frame vs. the trajectory store.
+
+Usage (from the repository root):
+    python benchmarks/bench_trajectories.py [--scale 1.0]
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.load_data import load_babynames
+from src.trajectories import TrajectoryStore
+from synthetic import write_synthetic_csv
+from timing import best_of, timed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--names', type=int, default=50)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_synthetic_csv(Path(tmp) / 'babynames.csv', scale=args.scale)
+        df = load_babynames(csv_path)
+        plain = df.astype({'Name': object, 'Gender': object})
+        names = plain['Name'].value_counts().index[:args.names]
+        
+        _, build = timed(TrajectoryStore.from_babynames, csv_path)
+        open_store = best_of(TrajectoryStore.from_babynames, csv_path)
+        store = TrajectoryStore.from_babynames(csv_path)
+        
+        def filter_series():
+            for name in names:
+                plain[plain['Name'] == name].groupby('Year')['Count'].sum()
+        
+        def peak_years_groupby():
+            by_name_year = plain.groupby(['Name', 'Year'])['Count'].sum()
+            by_name_year.groupby(level='Name').idxmax()
+        
+        rows = [
+            (f"{args.names} name series", filter_series,
+             lambda: [store.series(name) for name in names]),
+            ("peak year of every name", peak_years_groupby,
+             lambda: store.peak_years(normalize=False)),
+        ]
+        print(f"rows: {len(df):,}  store build: {build:.2f} s  open (memory-mapped): {open_store * 1000:.1f} ms")
+        print(f"{'':28s} {'frame (before)':>15s} {'store (after)':>14s}")
+        for label, before, after in rows:
+            print(f"{label:28s} {best_of(before, repeat=1) * 1000:12.1f} ms {best_of(after) * 1000:11.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
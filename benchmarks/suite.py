@@ -0,0 +1,260 @@
+"""
+Benchmark suite: wall time and peak memory of the public functions in
+load_data, compute_trends, utils and visuals on synthetic SSA-shaped data.
+
+Each run is appended to a JSON history file and compared against a stored
+baseline; cases slower or larger than the baseline by more than the
+tolerance are flagged, and the exit status is 1 if any are.
+
+Usage (from the repository root):
+    python benchmarks/suite.py [--scales 1 10 100] [--repeat 3]
+    python benchmarks/suite.py --save-baseline     # store this run as the baseline
+    python benchmarks/suite.py --only compute_trends
+
+Scale 1 is about the size of the real 1880-2014 file (1.8M rows); 10x and
+100x grow the vocabulary and names per year (100x needs tens of GB of RAM).
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src import compute_trends, load_data, utils, visuals
+from src.classify import ORIGIN_NAME_LISTS, DEFAULT_REGION
+from synthetic import write_synthetic_csv
+from timing import measure
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+POLICY_YEARS = [1924, 1965]
+
+
+def make_fixtures(tmp: Path, scale: float) -> Dict[str, Any]:
+    """
+    Write a synthetic CSV and derive the inputs the benchmarked functions take.
+
+    Args:
+        tmp: Scratch directory
+        scale: Size multiplier relative to the real dataset
+
+    Returns:
+        Dict of paths and frames shared by the cases
+    """
+    csv_path = write_synthetic_csv(tmp / 'babynames.csv', scale=scale)
+    df = load_data.load_babynames(csv_path, cache_dir=tmp / 'cache')
+
+    # Spread the top names over every region, so all shares are non-zero
+    regions = list(ORIGIN_NAME_LISTS) + [DEFAULT_REGION]
+    mapping = utils.get_top_names(df, n=1000)[['Name']]
+    mapping['Origin_Region'] = [regions[i % len(regions)] for i in range(len(mapping))]
+    mapping_path = tmp / 'name_origin_mapping.csv'
+    mapping.to_csv(mapping_path, index=False)
+
+    merged = load_data.merge_with_origins(df, mapping)
+    shares = compute_trends.calculate_yearly_shares(merged)
+    index_df = compute_trends.calculate_immigrant_index(shares)
+    return {
+        'tmp': tmp,
+        'csv_path': csv_path,
+        'mapping_path': mapping_path,
+        'df': df,
+        'mapping': mapping,
+        'merged': merged,
+        'shares': shares,
+        'index_df': index_df,
+        'top_names': utils.get_top_names(df, n=1000)
+    }
+
+
+def build_cases(fx: Dict[str, Any]) -> List[Tuple[str, Callable[[], Any]]]:
+    """(module.function[ variant], zero-argument call) for every benchmarked function."""
+    df, mapping, merged, shares, index_df = (
+        fx['df'], fx['mapping'], fx['merged'], fx['shares'], fx['index_df']
+    )
+    tmp = fx['tmp']
+    alternative = mapping.assign(
+        Origin_Region=np.where(mapping['Origin_Region'] == 'Irish_Italian', 'Anglo', mapping['Origin_Region'])
+    )
+
+    def consume_chunks():
+        for _ in load_data.iter_babynames_chunks(fx['csv_path']):
+            pass
+
+    def mapping_template():
+        # The function reports to stdout; keep the results table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            utils.create_mapping_template(fx['top_names'], tmp / 'template.csv')
+
+    def save_html():
+        visuals.save_figure(
+            visuals.plot_immigrant_index(index_df), 'index', output_dir=tmp / 'figures', formats=['html']
+        )
+
+    return [
+        ('load_data.load_babynames [csv]',
+         lambda: load_data.load_babynames(fx['csv_path'], use_cache=False)),
+        ('load_data.load_babynames [cached]',
+         lambda: load_data.load_babynames(fx['csv_path'], cache_dir=tmp / 'cache')),
+        ('load_data.load_babynames [projected]',
+         lambda: load_data.load_babynames(fx['csv_path'], cache_dir=tmp / 'cache',
+                                          columns=['Year', 'Name', 'Count'], year_range=(1900, 1950))),
+        ('load_data.iter_babynames_chunks', consume_chunks),
+        ('load_data.load_name_mapping', lambda: load_data.load_name_mapping(fx['mapping_path'])),
+        ('load_data.merge_with_origins', lambda: load_data.merge_with_origins(df, mapping)),
+        ('load_data.build_origin_lookup',
+         lambda: load_data.build_origin_lookup(df['Name'].cat.categories, mapping)),
+        ('load_data.get_data_summary', lambda: load_data.get_data_summary(df)),
+
+        ('compute_trends.calculate_yearly_shares', lambda: compute_trends.calculate_yearly_shares(merged)),
+        ('compute_trends.year_name_counts', lambda: compute_trends.year_name_counts(df)),
+        ('compute_trends.calculate_immigrant_index', lambda: compute_trends.calculate_immigrant_index(shares)),
+        ('compute_trends.calculate_immigrant_indices',
+         lambda: compute_trends.calculate_immigrant_indices(df, {'default': mapping, 'alternative': alternative})),
+        ('compute_trends.analyze_policy_periods', lambda: compute_trends.analyze_policy_periods(index_df)),
+        ('compute_trends.calculate_change_around_policy',
+         lambda: compute_trends.calculate_change_around_policy(index_df, 1965)),
+        ('compute_trends.calculate_change_around_policies',
+         lambda: compute_trends.calculate_change_around_policies(index_df, POLICY_YEARS, [5, 10, 20], [5, 10, 20])),
+        ('compute_trends.calculate_name_diversity', lambda: compute_trends.calculate_name_diversity(df)),
+
+        ('utils.get_top_names', lambda: utils.get_top_names(df, n=1000)),
+        ('utils.get_top_names [by gender]', lambda: utils.get_top_names(df, n=1000, by_gender=True)),
+        ('utils.get_dominant_gender', lambda: utils.get_dominant_gender(df, fx['top_names']['Name'])),
+        ('utils.filter_by_year_range', lambda: utils.filter_by_year_range(df, 1924, 1964)),
+        ('utils.sort_by_year', lambda: utils.sort_by_year(df.iloc[::-1])),
+        ('utils.classify_name_origin [x1000]',
+         lambda: [utils.classify_name_origin(name) for name in fx['top_names']['Name']]),
+        ('utils.create_mapping_template', mapping_template),
+
+        ('visuals.plot_immigrant_index', lambda: visuals.plot_immigrant_index(index_df)),
+        ('visuals.plot_regional_composition', lambda: visuals.plot_regional_composition(shares)),
+        ('visuals.plot_period_comparison',
+         lambda: visuals.plot_period_comparison(compute_trends.analyze_policy_periods(index_df))),
+        ('visuals.save_figure [html]', save_html),
+    ]
+
+
+def compare(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Optional[dict],
+    tolerance: float,
+    min_seconds: float
+) -> List[str]:
+    """
+    Regressions of a run against the baseline.
+
+    Args:
+        results: {scale: {case: {'seconds', 'peak_mb'}}}
+        baseline: A previous run record, or None
+        tolerance: Allowed relative increase (0.2 = 20%)
+        min_seconds: Ignore timing changes of cases faster than this (noise)
+
+    Returns:
+        One message per regression
+    """
+    if baseline is None:
+        return []
+    regressions = []
+    for scale, cases in results.items():
+        for case, current in cases.items():
+            before = baseline['results'].get(scale, {}).get(case)
+            if before is None:
+                continue
+            if (current['seconds'] > before['seconds'] * (1 + tolerance)
+                    and current['seconds'] >= min_seconds):
+                regressions.append(f"{scale} {case}: time {before['seconds'] * 1000:.1f} -> "
+                                   f"{current['seconds'] * 1000:.1f} ms")
+            if current['peak_mb'] > before['peak_mb'] * (1 + tolerance) + 1:
+                regressions.append(f"{scale} {case}: peak memory {before['peak_mb']:.1f} -> "
+                                   f"{current['peak_mb']:.1f} MB")
+    return regressions
+
+
+def git_revision() -> Optional[str]:
+    """Current commit of the repository, if available."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).resolve().parents[1],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', help="Run only cases whose name contains this text")
+    parser.add_argument('--history', default=str(RESULTS_DIR / 'history.json'))
+    parser.add_argument('--baseline', default=str(RESULTS_DIR / 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--min-seconds', type=float, default=0.005)
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for scale in args.scales:
+        label = f"{scale:g}x"
+        with tempfile.TemporaryDirectory() as tmp:
+            fx = make_fixtures(Path(tmp), scale)
+            print(f"\n{label}: {len(fx['df']):,} rows")
+            print(f"{'case':48s} {'time':>10s} {'peak':>10s}")
+            results[label] = {}
+            for name, func in build_cases(fx):
+                if args.only and args.only not in name:
+                    continue
+                seconds, peak = measure(func, repeat=args.repeat)
+                results[label][name] = {'seconds': seconds, 'peak_mb': peak / 2**20}
+                r = results[label][name]
+                print(f"{name:48s} {r['seconds'] * 1000:7.1f} ms {r['peak_mb']:7.1f} MB")
+
+    run = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results
+    }
+
+    history_path = Path(args.history)
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    history = json.loads(history_path.read_text()) if history_path.exists() else []
+    history.append(run)
+    history_path.write_text(json.dumps(history, indent=2))
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+    regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(run, indent=2))
+        print(f"\nBaseline saved to {baseline_path}")
+    elif baseline is None:
+        print(f"\nNo baseline at {baseline_path}; run with --save-baseline to store one")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against baseline {baseline.get('revision')}:")
+        for message in regressions:
+            print(f"  ! {message}")
+        return 1
+    if baseline is not None:
+        print(f"\nNo regressions against baseline {baseline.get('revision')}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
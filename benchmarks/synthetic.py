@@ -0,0 +1,131 @@
+"""
+Synthetic SSA-shaped baby names data for benchmarks.
+
+The real ``babynames.csv`` is not shipped with the repository, so benchmarks
+run against generated data with the same columns (Id, Name, Year, Gender,
+Count), year range and a Zipfian count distribution.
+"""
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterator
+
+SYLLABLES = [
+    'al', 'an', 'ar', 'be', 'bri', 'ca', 'da', 'de', 'el', 'em', 'fa', 'ga',
+    'ha', 'is', 'ja', 'jo', 'ka', 'la', 'le', 'li', 'lo', 'ma', 'mi', 'na',
+    'ne', 'ni', 'no', 'ra', 're', 'ri', 'ro', 'sa', 'se', 'so', 'ta', 'te',
+    'ti', 'to', 'va', 'vi', 'ya', 'za', 'en', 'on', 'us', 'ia', 'ie', 'y'
+]
+
+YEARS = np.arange(1880, 2015)
+
+
+def make_vocabulary(n_names: int, seed: int = 0) -> np.ndarray:
+    """
+    Generate unique pronounceable names.
+    
+    Args:
+        n_names: Number of distinct names
+        seed: Random seed
+        
+    Returns:
+        Array of capitalized name strings
+    """
+    rng = np.random.default_rng(seed)
+    syllables = np.array(SYLLABLES)
+    names = np.array([], dtype=object)
+    while len(names) < n_names:
+        size = 2 * (n_names - len(names)) + 100
+        parts = rng.choice(syllables, size=(size, 4))
+        lengths = rng.integers(2, 5, size=size)
+        batch = [''.join(row[:k]).capitalize() for row, k in zip(parts, lengths)]
+        names = pd.unique(np.concatenate([names, np.array(batch, dtype=object)]))
+    return np.asarray(names[:n_names], dtype=object)
+
+
+def iter_synthetic_years(scale: float = 1.0, seed: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Yield one SSA-shaped DataFrame per year.
+    
+    At ``scale=1`` the output has roughly the 1.8M rows and ~100k distinct
+    names of the real 1880-2014 file; larger scales grow the number of
+    names per year (and the vocabulary) proportionally.
+    
+    Args:
+        scale: Size multiplier relative to the real dataset
+        seed: Random seed
+        
+    Yields:
+        DataFrame with Name, Year, Gender and Count for a single year
+    """
+    rng = np.random.default_rng(seed)
+    vocab_size = int(100_000 * scale)
+    vocabulary = make_vocabulary(vocab_size, seed)
+    # Popularity is Zipfian over the vocabulary; ~10% of names are unisex
+    popularity = 1.0 / np.arange(1, vocab_size + 1) ** 1.05
+    popularity /= popularity.sum()
+    name_gender = rng.choice(np.array(['F', 'M']), size=vocab_size)
+    unisex = rng.random(vocab_size) < 0.1
+    
+    for i, year in enumerate(YEARS):
+        progress = i / (len(YEARS) - 1)
+        n_names = int((1_500 + 22_000 * progress) * scale)
+        total_births = int(200_000 + 3_800_000 * progress ** 0.7)
+        
+        chosen = rng.choice(vocab_size, size=n_names, replace=False, p=popularity)
+        weights = popularity[chosen] * rng.lognormal(0.0, 0.5, size=n_names)
+        counts = np.maximum(5, (weights / weights.sum() * total_births * scale)).astype(np.int32)
+        genders = name_gender[chosen]
+        
+        # Unisex names also appear under the other gender with a smaller count
+        flip = unisex[chosen]
+        other = np.where(genders[flip] == 'F', 'M', 'F')
+        other_counts = np.maximum(5, counts[flip] // 10).astype(np.int32)
+        
+        year_df = pd.DataFrame({
+            'Name': np.concatenate([vocabulary[chosen], vocabulary[chosen][flip]]),
+            'Year': year,
+            'Gender': np.concatenate([genders, other]),
+            'Count': np.concatenate([counts, other_counts])
+        })
+        # SSA files list each gender by descending count
+        yield year_df.sort_values(['Gender', 'Count'], ascending=[True, False])
+
+
+def make_babynames(scale: float = 1.0, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a full synthetic dataset in memory.
+    
+    Args:
+        scale: Size multiplier relative to the real dataset
+        seed: Random seed
+        
+    Returns:
+        DataFrame with Id, Name, Year, Gender, Count columns
+    """
+    df = pd.concat(iter_synthetic_years(scale, seed), ignore_index=True)
+    df.insert(0, 'Id', np.arange(1, len(df) + 1))
+    return df
+
+
+def write_synthetic_csv(path: str, scale: float = 1.0, seed: int = 0) -> Path:
+    """
+    Write a synthetic dataset to CSV one year at a time.
+    
+    Args:
+        path: Output CSV path
+        scale: Size multiplier relative to the real dataset
+        seed: Random seed
+        
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    next_id = 1
+    with open(path, 'w', newline='') as f:
+        for i, year_df in enumerate(iter_synthetic_years(scale, seed)):
+            year_df.insert(0, 'Id', np.arange(next_id, next_id + len(year_df)))
+            next_id += len(year_df)
+            year_df.to_csv(f, index=False, header=(i == 0))
+    return path
@@ -0,0 +1,45 @@
+"""
+Timing and memory helpers shared by the benchmark scripts.
+
+Wall times come from ``time.perf_counter`` and peak memory from
+``tracemalloc``, so only allocations made through Python's allocators
+(including numpy and pandas buffers) are counted.
+"""
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+
+def timed(func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """Result and wall time in seconds of a single call."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def best_of(func: Callable[..., Any], *args: Any, repeat: int = 3) -> float:
+    """Best wall time in seconds over ``repeat`` calls."""
+    best = float('inf')
+    for _ in range(repeat):
+        best = min(best, timed(func, *args)[1])
+    return best
+
+
+def peak_memory(func: Callable[..., Any], *args: Any) -> Tuple[float, int]:
+    """Wall time in seconds and peak traced allocation in bytes of a single call."""
+    tracemalloc.start()
+    try:
+        _, seconds = timed(func, *args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def measure(func: Callable[..., Any], *args: Any, repeat: int = 3) -> Tuple[float, int]:
+    """
+    Best wall time over ``repeat`` calls, then peak traced allocation of one more.
+
+    Memory is measured in a separate call because tracing slows allocation.
+    """
+    return best_of(func, *args, repeat=repeat), peak_memory(func, *args)[1]
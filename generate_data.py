@@ -1,157 +1,254 @@
 # Quick data generation script
-# This script generates all required data files for the analysis
-
+# This script generates all required data files for the analysis.
+#
+# Run it from the repository root:
+#     python generate_data.py [--top-n 1000] [--jobs N] [--force]
+#
+# When the SSA publishes a new year, append it to the per-year aggregate
+# store (data/.aggregates) instead of editing babynames.csv:
+#     python generate_data.py --append data/yob2015.txt
+# The trend files then cover the store's years beyond babynames.csv too; the
+# top names (and so the mapping) still come from babynames.csv alone. Year
+# files for years babynames.csv already has are rejected.
+#
+# The files form a build graph (see src/build.py): a run only rebuilds the
+# files whose inputs changed, e.g. after editing name_origin_mapping.csv only
+# the two trend files are recomputed. Use --force to rebuild everything.
+#
+# Each step is also importable as a pipeline stage, e.g.
+#     from generate_data import build_top_names
+
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
-
-print("Loading baby names data...")
-df = pd.read_csv('data/babynames.csv')
-print(f"Loaded {len(df):,} records")
-
-# Step 1: Generate top 1000 names file
-print("\nStep 1: Generating top 1000 names...")
-top_names_overall = df.groupby('Name')['Count'].sum().sort_values(ascending=False)
-
-top_1000_names = top_names_overall.head(1000).reset_index()
-top_1000_names.columns = ['Name', 'Total_Count']
-
-# Add dominant gender
-def get_dominant_gender(name):
-    name_data = df[df['Name'] == name].groupby('Gender')['Count'].sum()
-    return name_data.idxmax() if len(name_data) > 0 else 'U'
-
-print("  Adding gender information...")
-top_1000_names['Dominant_Gender'] = top_1000_names['Name'].apply(get_dominant_gender)
-
-output_path = Path('data/top_1000_names_for_mapping.csv')
-top_1000_names.to_csv(output_path, index=False)
-print(f"  ✓ Saved {output_path}")
-
-# Step 2: Generate name origin mapping
-print("\nStep 2: Creating name origin mapping...")
-
-# Define name patterns
-latin_names = {
-    'Jose', 'Juan', 'Luis', 'Carlos', 'Jesus', 'Miguel', 'Antonio', 'Francisco',
-    'Pedro', 'Jorge', 'Manuel', 'Rafael', 'Ramon', 'Fernando', 'Ricardo', 'Roberto',
-    'Eduardo', 'Julio', 'Enrique', 'Pablo', 'Raul', 'Mario', 'Sergio', 'Ruben',
-    'Hector', 'Oscar', 'Cesar', 'Diego', 'Javier', 'Angel', 'Marco', 'Alejandro',
-    'Maria', 'Carmen', 'Rosa', 'Ana', 'Elena', 'Teresa', 'Lucia', 'Gloria',
-    'Isabel', 'Dolores', 'Guadalupe', 'Josefina', 'Beatriz', 'Catalina', 'Margarita',
-    'Adriana', 'Alicia', 'Gabriela', 'Isabella', 'Sofia', 'Camila', 'Valentina',
-    'Natalia', 'Daniela', 'Victoria', 'Andrea', 'Diana', 'Angelica', 'Selena', 'Santiago'
-}
-
-asian_names = {
-    'Ming', 'Mei', 'Wei', 'Li', 'Chen', 'Wang', 'Zhang', 'Liu', 'Yang',
-    'Yuki', 'Akira', 'Kenji', 'Sakura', 'Hiroshi', 'Takashi', 'Yumi',
-    'Kim', 'Park', 'Lee', 'Jung', 'Min', 'Jin', 'Hyun', 'Ji', 'Sung',
-    'Anh', 'Linh', 'Minh', 'Nguyen', 'Tran', 'Pham',
-    'Priya', 'Ravi', 'Amit', 'Raj', 'Kumar', 'Arjun', 'Krishna', 'Deepak'
-}
-
-african_middle_eastern_names = {
-    'Mohammed', 'Muhammad', 'Ahmad', 'Hassan', 'Omar', 'Ali', 'Ibrahim', 'Khalid',
-    'Fatima', 'Aisha', 'Amina', 'Zahra', 'Layla', 'Noor', 'Mariam', 'Yasmin',
-    'Jamal', 'Malik', 'Rashid', 'Kareem', 'Tariq', 'Karim',
-    'Kwame', 'Kofi', 'Amara', 'Zuri', 'Imani', 'Nia', 'Aaliyah', 'Zara',
-    'Tyrone', 'Darnell', 'Latoya', 'Keisha', 'Tanisha', 'Ebony', 'Mohamed'
-}
-
-irish_italian_names = {
-    'Patrick', 'Sean', 'Connor', 'Liam', 'Ryan', 'Brendan', 'Brian', 'Kevin',
-    'Colleen', 'Kathleen', 'Maureen', 'Bridget', 'Erin', 'Kelly', 'Shannon',
-    'Giovanni', 'Giuseppe', 'Antonio', 'Salvatore', 'Vincenzo', 'Marco', 'Luigi',
-    'Carla', 'Gina', 'Rosa', 'Francesca', 'Isabella', 'Lucia', 'Angela',
-    'Gianna', 'Alessandra', 'Bianca', 'Chiara', 'Anthony', 'Angelo', 'Dante', 'Aidan', 'Ciara'
-}
-
-anglo_names = {
-    'John', 'William', 'James', 'Robert', 'Michael', 'David', 'Richard', 'Charles',
-    'Joseph', 'Thomas', 'Christopher', 'Daniel', 'Matthew', 'Donald', 'Mark',
-    'Paul', 'Steven', 'Andrew', 'Kenneth', 'Joshua', 'George', 'Edward',
-    'Mary', 'Patricia', 'Jennifer', 'Linda', 'Barbara', 'Elizabeth', 'Susan',
-    'Jessica', 'Sarah', 'Nancy', 'Karen', 'Betty', 'Helen', 'Dorothy', 'Margaret',
-    'Emily', 'Emma', 'Olivia', 'Ava', 'Sophia', 'Mia', 'Charlotte', 'Amelia'
-}
-
-def classify_name(name):
-    if name in latin_names:
-        return 'Latin'
-    elif name in asian_names:
-        return 'Asian'
-    elif name in african_middle_eastern_names:
-        return 'African_MiddleEastern'
-    elif name in irish_italian_names:
-        return 'Irish_Italian'
-    elif name in anglo_names:
-        return 'Anglo'
+from typing import List, Optional
+
+from src.aggregates import AggregateStore
+from src.build import Build, Stage, format_report
+from src.classify import classify_names
+from src.compute_trends import calculate_yearly_shares, calculate_immigrant_index
+from src.load_data import load_babynames, load_name_mapping, merge_with_origins, year_from_path
+from src.parallel import ParallelExecutor
+from src.utils import get_dominant_gender, get_top_names
+
+IMMIGRANT_REGIONS = ['Irish_Italian', 'Latin', 'Asian', 'African_MiddleEastern']
+# Per-year aggregate store fed by --append, relative to the data directory
+AGGREGATES_DIR = '.aggregates'
+
+
+def build_top_names(
+    df: pd.DataFrame,
+    n: int = 1000,
+    executor: Optional[ParallelExecutor] = None
+) -> pd.DataFrame:
+    """
+    Step 1: top N names with their dominant gender.
+    
+    Both the ranking and the dominant gender come from whole-dataset
+    aggregations, so the cost does not grow with ``n``. With an
+    ``executor`` the ranking runs in its process pool.
+    """
+    top_names = executor.top_names(n) if executor is not None else get_top_names(df, n=n)
+    top_names['Dominant_Gender'] = get_dominant_gender(df, top_names['Name']).to_numpy()
+    return top_names
+
+
+def build_origin_mapping(top_names: pd.DataFrame) -> pd.DataFrame:
+    """Step 2: classify the top names into origin regions."""
+    mapping = top_names.copy()
+    mapping['Origin_Region'] = np.asarray(classify_names(mapping['Name']))
+    return mapping
+
+
+def build_regional_trends(
+    df: pd.DataFrame,
+    mapping_df: pd.DataFrame,
+    executor: Optional[ParallelExecutor] = None,
+    store: Optional[AggregateStore] = None
+) -> pd.DataFrame:
+    """
+    Step 3: yearly birth shares by origin region.
+    
+    Years in the aggregate ``store`` after the last year of ``df`` (added
+    with ``--append``) are appended from the store's summaries; shares are
+    per year, so they do not depend on the other years.
+    """
+    if executor is not None:
+        regional_trends = executor.yearly_shares(mapping_df[['Name', 'Origin_Region']])
+    else:
+        df_with_origin = merge_with_origins(df, mapping_df[['Name', 'Origin_Region']])
+        regional_trends = calculate_yearly_shares(df_with_origin)
+    
+    if store is None or not store.years or store.years[-1] <= df['Year'].max():
+        return regional_trends
+    store.set_mapping(mapping_df)
+    appended = store.yearly_shares()
+    appended = appended[appended['Year'] > df['Year'].max()]
+    regional_trends = pd.concat([regional_trends, appended], ignore_index=True)
+    # The two parts may list different regions
+    return regional_trends.astype({'Origin_Region': 'category'})
+
+
+def build_immigrant_index(regional_trends: pd.DataFrame) -> pd.DataFrame:
+    """Step 4: immigrant name share index."""
+    return calculate_immigrant_index(regional_trends, IMMIGRANT_REGIONS)
+
+
+def update_trends_from_year_files(
+    data_dir: str = 'data',
+    year_files: list = (),
+    top_n: int = 1000,
+    n_jobs: Optional[int] = 1,
+    force: bool = False
+) -> pd.DataFrame:
+    """
+    Append SSA year files to the aggregate store and refresh the data files.
+    
+    The store lives in ``data/.aggregates``; on first use it is seeded from
+    babynames.csv. Only the appended years are aggregated from raw rows. The
+    trend files are then rebuilt through the build graph, where the store is
+    an input of the regional_trends stage, so later runs of ``main`` keep
+    the appended years.
+    
+    The trends take the years of babynames.csv from the CSV itself, so year
+    files can only extend it: a file for a year up to the CSV's last year
+    raises ValueError (correct babynames.csv instead).
+    
+    Args:
+        data_dir: Directory containing babynames.csv
+        year_files: SSA year files (``yobYYYY.txt``)
+        top_n: Number of top names to map
+        n_jobs: Worker processes for the full-data aggregations (None = all cores)
+        force: Rebuild every file
+    
+    Returns:
+        Per-stage build report
+    """
+    data_dir = Path(data_dir)
+    source = str(data_dir / 'babynames.csv')
+    last_year = load_babynames(source, columns=['Year'])['Year'].max()
+    for path in year_files:
+        year = year_from_path(path)
+        if year is not None and year <= last_year:
+            raise ValueError(
+                f"{path}: {year} is already covered by babynames.csv (up to {last_year}); "
+                "correct babynames.csv instead"
+            )
+    
+    store = AggregateStore(data_dir / AGGREGATES_DIR)
+    if not store.years:
+        print("Seeding aggregate store from babynames.csv...")
+        store.add_frame(load_babynames(source))
+    
+    for path in year_files:
+        year = store.add_year_file(path)
+        print(f"  ✓ Added {year} from {path}")
+    store.save()
+    
+    return main(data_dir, top_n, n_jobs, force)
+
+
+def build_stages(
+    data_dir: str = 'data',
+    top_n: int = 1000,
+    executor: Optional[ParallelExecutor] = None
+) -> List[Stage]:
+    """
+    The data files as a build graph.
+    
+    Args:
+        data_dir: Directory containing babynames.csv
+        top_n: Number of top names to map
+        executor: Optional process pool for the full-data aggregations
+        
+    Returns:
+        Stages for ``src.build.Build``
+    """
+    data_dir = Path(data_dir)
+    source = data_dir / 'babynames.csv'
+    stages = [
+        Stage('babynames', lambda: load_babynames(str(source)), files=[source]),
+        Stage('top_names', lambda df: build_top_names(df, top_n, executor),
+              deps=['babynames'], output=data_dir / f'top_{top_n}_names_for_mapping.csv',
+              params={'top_n': top_n}),
+        Stage('origin_mapping', build_origin_mapping,
+              deps=['top_names'], output=data_dir / 'name_origin_mapping.csv',
+              load=load_name_mapping),
+    ]
+    
+    # Years added with --append: the store's summary file is an input of the
+    # trends, so e.g. editing the mapping later rebuilds them with those years
+    store_dir = data_dir / AGGREGATES_DIR
+    if (store_dir / 'summary.npz').exists():
+        stages.append(Stage('aggregates', lambda: AggregateStore(store_dir),
+                            files=[store_dir / 'summary.npz']))
+        stages.append(Stage(
+            'regional_trends',
+            lambda df, mapping, store: build_regional_trends(df, mapping, executor, store),
+            deps=['babynames', 'origin_mapping', 'aggregates'],
+            output=data_dir / 'regional_trends.csv'
+        ))
+    else:
+        stages.append(Stage(
+            'regional_trends', lambda df, mapping: build_regional_trends(df, mapping, executor),
+            deps=['babynames', 'origin_mapping'], output=data_dir / 'regional_trends.csv'
+        ))
+    
+    stages.append(Stage('immigrant_index', build_immigrant_index,
+                        deps=['regional_trends'], output=data_dir / 'immigrant_name_index.csv',
+                        params={'immigrant_regions': IMMIGRANT_REGIONS}))
+    return stages
+
+
+def main(
+    data_dir: str = 'data',
+    top_n: int = 1000,
+    n_jobs: Optional[int] = 1,
+    force: bool = False
+) -> pd.DataFrame:
+    """
+    Bring the four data files up to date, rebuilding only stale ones.
+    
+    Args:
+        data_dir: Directory containing babynames.csv
+        top_n: Number of top names to map
+        n_jobs: Worker processes for the full-data aggregations (None = all cores)
+        force: Rebuild every file
+        
+    Returns:
+        Per-stage build report
+    """
+    data_dir = Path(data_dir)
+    # Aggregations over all rows run in a process pool when n_jobs != 1; the
+    # executor loads nothing until a stage that is rebuilt uses it
+    executor = ParallelExecutor(str(data_dir / 'babynames.csv'), n_jobs) if n_jobs != 1 else None
+    build = Build(build_stages(data_dir, top_n, executor), data_dir / '.build' / 'state.json')
+    try:
+        report = build.run(force=force)
+    finally:
+        if executor is not None:
+            executor.close()
+    
+    print(format_report(report))
+    if (report['Status'] == 'built').any():
+        print("\nYou can now run notebook 04 (plots_for_presentation.ipynb)")
+    else:
+        print("\nAll data files are up to date.")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate the analysis data files.")
+    parser.add_argument('--data-dir', default='data', help="Directory containing babynames.csv")
+    parser.add_argument('--top-n', type=int, default=1000, help="Number of top names to map")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Worker processes for the full-data aggregations (0 = all cores)")
+    parser.add_argument('--force', action='store_true', help="Rebuild every file")
+    parser.add_argument('--append', nargs='+', metavar='YOB_FILE',
+                        help="SSA year files (yobYYYY.txt) to add incrementally")
+    args = parser.parse_args()
+    if args.append:
+        update_trends_from_year_files(args.data_dir, args.append, args.top_n, args.jobs or None, args.force)
     else:
-        return 'Anglo'  # Default
-
-print("  Classifying names...")
-top_1000_names['Origin_Region'] = top_1000_names['Name'].apply(classify_name)
-
-mapping_path = Path('data/name_origin_mapping.csv')
-top_1000_names.to_csv(mapping_path, index=False)
-print(f"  ✓ Saved {mapping_path}")
-print(f"  Distribution: {top_1000_names['Origin_Region'].value_counts().to_dict()}")
-
-# Step 3: Merge and calculate trends
-print("\nStep 3: Calculating regional trends...")
-
-mapping_df = top_1000_names[['Name', 'Origin_Region']].copy()
-df_with_origin = df.merge(mapping_df, on='Name', how='left')
-df_with_origin['Origin_Region'] = df_with_origin['Origin_Region'].fillna('Other')
-
-print("  Computing yearly shares...")
-yearly_totals = df_with_origin.groupby('Year')['Count'].sum().reset_index()
-yearly_totals.columns = ['Year', 'Total_Births']
-
-yearly_by_region = df_with_origin.groupby(['Year', 'Origin_Region'])['Count'].sum().reset_index()
-yearly_by_region.columns = ['Year', 'Origin_Region', 'Region_Births']
-
-yearly_by_region = yearly_by_region.merge(yearly_totals, on='Year')
-yearly_by_region['Share'] = yearly_by_region['Region_Births'] / yearly_by_region['Total_Births'] * 100
-
-regional_path = Path('data/regional_trends.csv')
-yearly_by_region.to_csv(regional_path, index=False)
-print(f"  ✓ Saved {regional_path}")
-
-# Step 4: Calculate immigrant index
-print("\nStep 4: Creating immigrant name share index...")
-
-immigrant_regions = ['Irish_Italian', 'Latin', 'Asian', 'African_MiddleEastern']
-
-immigrant_share = (
-    yearly_by_region[yearly_by_region['Origin_Region'].isin(immigrant_regions)]
-    .groupby('Year')['Share']
-    .sum()
-    .reset_index()
-)
-immigrant_share.columns = ['Year', 'Immigrant_Name_Share']
-
-anglo_share = (
-    yearly_by_region[yearly_by_region['Origin_Region'] == 'Anglo']
-    [['Year', 'Share']]
-    .copy()
-)
-anglo_share.columns = ['Year', 'Anglo_Name_Share']
-
-index_df = immigrant_share.merge(anglo_share, on='Year', how='left')
-index_df['Anglo_Name_Share'] = index_df['Anglo_Name_Share'].fillna(0)
-
-index_path = Path('data/immigrant_name_index.csv')
-index_df.to_csv(index_path, index=False)
-print(f"  ✓ Saved {index_path}")
-
-print("\n" + "="*60)
-print("DATA GENERATION COMPLETE!")
-print("="*60)
-print(f"\nGenerated files:")
-print(f"  ✓ top_1000_names_for_mapping.csv")
-print(f"  ✓ name_origin_mapping.csv")
-print(f"  ✓ regional_trends.csv")
-print(f"  ✓ immigrant_name_index.csv")
-print(f"\nYou can now run notebook 04 (plots_for_presentation.ipynb)")
+        main(args.data_dir, args.top_n, args.jobs or None, args.force)
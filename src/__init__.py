@@ -8,35 +8,80 @@ of immigration trends and cultural change.
 __version__ = "1.0.0"
 __author__ = "Your Name"
 
-from .load_data import (
-    load_babynames,
-    load_name_mapping,
-    merge_with_origins,
-    get_data_summary
-)
-
-from .compute_trends import (
-    calculate_yearly_shares,
-    calculate_immigrant_index,
-    analyze_policy_periods,
-    calculate_change_around_policy,
-    calculate_name_diversity
-)
-
-from .visuals import (
-    add_policy_markers,
-    plot_immigrant_index,
-    plot_regional_composition,
-    plot_period_comparison,
-    save_figure
-)
-
-from .utils import (
-    classify_name_origin,
-    get_top_names,
-    filter_by_year_range,
-    print_summary_stats
-)
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> submodule. Submodules are imported on first attribute
+# access (PEP 562), so e.g. a compute-only job never imports plotly.
+_EXPORTS = {
+    'load_babynames': 'load_data',
+    'load_name_mapping': 'load_data',
+    'merge_with_origins': 'load_data',
+    'get_data_summary': 'load_data',
+    'calculate_yearly_shares': 'compute_trends',
+    'calculate_immigrant_index': 'compute_trends',
+    'calculate_immigrant_indices': 'compute_trends',
+    'analyze_policy_periods': 'compute_trends',
+    'calculate_change_around_policy': 'compute_trends',
+    'calculate_change_around_policies': 'compute_trends',
+    'calculate_name_diversity': 'compute_trends',
+    'add_policy_markers': 'visuals',
+    'plot_immigrant_index': 'visuals',
+    'plot_regional_composition': 'visuals',
+    'plot_period_comparison': 'visuals',
+    'save_figure': 'visuals',
+    'export_figures': 'visuals',
+    'classify_name_origin': 'utils',
+    'get_top_names': 'utils',
+    'filter_by_year_range': 'utils',
+    'print_summary_stats': 'utils'
+}
+
+if TYPE_CHECKING:
+    from .load_data import (
+        load_babynames,
+        load_name_mapping,
+        merge_with_origins,
+        get_data_summary
+    )
+    from .compute_trends import (
+        calculate_yearly_shares,
+        calculate_immigrant_index,
+        calculate_immigrant_indices,
+        analyze_policy_periods,
+        calculate_change_around_policy,
+        calculate_change_around_policies,
+        calculate_name_diversity
+    )
+    from .visuals import (
+        add_policy_markers,
+        plot_immigrant_index,
+        plot_regional_composition,
+        plot_period_comparison,
+        save_figure,
+        export_figures
+    )
+    from .utils import (
+        classify_name_origin,
+        get_top_names,
+        filter_by_year_range,
+        print_summary_stats
+    )
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Cache on the package, so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     'load_babynames',
@@ -45,14 +90,17 @@ __all__ = [
     'get_data_summary',
     'calculate_yearly_shares',
     'calculate_immigrant_index',
+    'calculate_immigrant_indices',
     'analyze_policy_periods',
     'calculate_change_around_policy',
+    'calculate_change_around_policies',
     'calculate_name_diversity',
     'add_policy_markers',
     'plot_immigrant_index',
     'plot_regional_composition',
     'plot_period_comparison',
     'save_figure',
+    'export_figures',
     'classify_name_origin',
     'get_top_names',
     'filter_by_year_range',
@@ -0,0 +1,399 @@
+"""
+Persistent per-year aggregate store.
+
+The SSA publishes one year at a time, so instead of recomputing every
+year from raw rows the store keeps one small partition per year (births
+per name and gender) plus per-year summaries: total births, unique names
+and births per origin region under the current mapping. Adding a year
+file only touches that year's partition and summary row; shares, the
+immigrant index, diversity and top names are then derived from the
+summaries without rereading the raw data.
+"""
+import json
+import os
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .compute_trends import calculate_immigrant_index, shares_from_matrix
+from .encoding import Vocabulary, get_codes
+from .load_data import CSV_NA_OPTIONS, build_origin_lookup, year_from_path
+from .topn import top_n_indices
+
+STORE_VERSION = 1
+
+
+class AggregateStore:
+    """
+    Year-partitioned aggregates of the baby names dataset.
+
+    Layout of the store directory::
+
+        manifest.json      years, genders, store version
+        names.npy          name vocabulary (append-only, index = name id)
+        mapping.csv        current name-origin mapping
+        summary.npz        per-year totals, unique names, region counts
+                           and per-name totals
+        years/<year>.npz   name_id, gender and count for one year
+
+    Example:
+        store = AggregateStore('data/.aggregates')
+        store.add_year_file('data/yob2015.txt')
+        store.set_mapping(load_name_mapping('data/name_origin_mapping.csv'))
+        store.save()
+        index = store.immigrant_index()
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a store, or start an empty one if the directory has none.
+
+        Args:
+            path: Store directory
+        """
+        self.path = Path(path)
+        self._name_vocab = Vocabulary()
+        self._gender_vocab = Vocabulary()
+        self.mapping: Optional[pd.DataFrame] = None
+        self.regions = pd.Index(['Other'])
+
+        # Per-year summaries, keyed by year
+        self.totals: Dict[int, int] = {}
+        self.unique_names: Dict[int, int] = {}
+        self.region_counts: Dict[int, np.ndarray] = {}
+        # Births per (name id, gender) over all years
+        self.name_totals = np.zeros((0, 0), dtype=np.int64)
+
+        self._partitions: Dict[int, pd.DataFrame] = {}
+        self._dirty_years: set = set()
+        self._lookup = np.zeros(1, dtype=np.int8)
+
+        if (self.path / 'manifest.json').exists():
+            self._load()
+
+    @property
+    def names(self) -> pd.Index:
+        """Name vocabulary; position is the name id."""
+        return self._name_vocab.values
+
+    @property
+    def genders(self) -> pd.Index:
+        """Gender vocabulary; position is the gender id."""
+        return self._gender_vocab.values
+
+    @property
+    def years(self) -> List[int]:
+        """Years held in the store, ascending."""
+        return sorted(self.totals)
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def add_frame(self, df: pd.DataFrame) -> List[int]:
+        """
+        Add (or replace) every year present in a baby names frame.
+
+        Args:
+            df: DataFrame with Year, Name, Gender and Count columns
+
+        Returns:
+            Years that were updated
+        """
+        name_codes, names = get_codes(df['Name'])
+        gender_codes, genders = get_codes(df['Gender'])
+        # Translate the frame's dictionaries into store ids once
+        name_ids = self._extend_names(names)[name_codes]
+        gender_ids = self._extend_genders(genders)[gender_codes]
+
+        years = df['Year'].to_numpy()
+        counts = df['Count'].to_numpy()
+        order = np.argsort(years, kind='stable')
+        boundaries = np.flatnonzero(np.diff(years[order])) + 1
+
+        updated = []
+        for rows in np.split(order, boundaries):
+            if len(rows) == 0:
+                continue
+            year = int(years[rows[0]])
+            self._set_partition(year, name_ids[rows], gender_ids[rows], counts[rows])
+            updated.append(year)
+        return updated
+
+    def add_year_file(self, path: str, year: Optional[int] = None) -> int:
+        """
+        Add one SSA year file (``yobYYYY.txt``: Name,Gender,Count, no header).
+
+        Args:
+            path: Path to the year file
+            year: Year of the file (default: parsed from the file name)
+
+        Returns:
+            The year that was added
+        """
+        if year is None:
+            year = year_from_path(path)
+            if year is None:
+                raise ValueError(f"Cannot infer the year from {path}; pass year=")
+
+        df = pd.read_csv(
+            path,
+            names=['Name', 'Gender', 'Count'],
+            dtype={'Name': 'category', 'Gender': 'category', 'Count': 'int32'},
+            **CSV_NA_OPTIONS
+        )
+        df['Year'] = np.int16(year)
+        self.add_frame(df)
+        return year
+
+    def set_mapping(self, mapping_df: pd.DataFrame) -> None:
+        """
+        Set the name-origin mapping and recompute region counts if it changed.
+
+        Args:
+            mapping_df: DataFrame with Name and Origin_Region columns
+        """
+        mapping_df = mapping_df[['Name', 'Origin_Region']].reset_index(drop=True)
+        if self.mapping is not None and self.mapping.equals(mapping_df):
+            return
+        self.mapping = mapping_df
+        self._refresh_lookup()
+        for year in self.years:
+            self.region_counts[year] = self._count_regions(self._partition(year))
+
+    # ------------------------------------------------------------------
+    # Derived outputs
+    # ------------------------------------------------------------------
+
+    def year_region_matrix(self) -> Tuple[np.ndarray, pd.Index, np.ndarray, np.ndarray]:
+        """
+        Dense years x regions count matrix, as ``compute_trends.year_region_matrix``.
+
+        Returns:
+            Tuple of (years, regions, counts, present)
+        """
+        first, last = self.years[0], self.years[-1]
+        years = np.arange(first, last + 1, dtype=np.int16)
+        counts = np.zeros((len(years), len(self.regions) + 1), dtype=np.int64)
+        for year in self.years:
+            counts[year - first] = self.region_counts[year]
+        return years, self.regions, counts, counts > 0
+
+    def yearly_shares(self) -> pd.DataFrame:
+        """Output of ``calculate_yearly_shares`` for the stored years."""
+        return shares_from_matrix(*self.year_region_matrix())
+
+    def immigrant_index(self, immigrant_regions: List[str] = None) -> pd.DataFrame:
+        """Output of ``calculate_immigrant_index`` for the stored years."""
+        return calculate_immigrant_index(self.yearly_shares(), immigrant_regions)
+
+    def name_diversity(self) -> pd.DataFrame:
+        """Output of ``calculate_name_diversity`` for the stored years."""
+        years = self.years
+        diversity = pd.DataFrame({
+            'Year': np.array(years, dtype=np.int16),
+            'Unique_Names': [self.unique_names[y] for y in years],
+            'Total_Births': np.array([self.totals[y] for y in years], dtype=np.int64)
+        })
+        diversity['Names_Per_1000_Births'] = (
+            diversity['Unique_Names'] / diversity['Total_Births'] * 1000
+        )
+        return diversity
+
+    def top_names(self, n: int = 1000) -> pd.DataFrame:
+        """
+        Top N names over all stored years, as ``get_top_names``.
+
+        Args:
+            n: Number of names to return
+
+        Returns:
+            DataFrame with Name and Total_Count
+        """
+        totals = self.name_totals.sum(axis=1)
+        top = top_n_indices(totals, n, totals > 0)
+        return pd.DataFrame({'Name': self.names.take(top).to_numpy(), 'Total_Count': totals[top]})
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Write changed partitions, the summaries and the manifest."""
+        (self.path / 'years').mkdir(parents=True, exist_ok=True)
+        for year in sorted(self._dirty_years):
+            part = self._partitions[year]
+            _atomic_savez(
+                self.path / 'years' / f'{year}.npz',
+                name_id=part['name_id'].to_numpy(),
+                gender=part['gender'].to_numpy(),
+                count=part['count'].to_numpy()
+            )
+        self._dirty_years.clear()
+
+        _atomic_save(self.path / 'names.npy', np.asarray(self.names, dtype=str))
+        if self.mapping is not None:
+            self.mapping.to_csv(self.path / 'mapping.csv', index=False)
+
+        years = self.years
+        _atomic_savez(
+            self.path / 'summary.npz',
+            years=np.array(years, dtype=np.int16),
+            totals=np.array([self.totals[y] for y in years], dtype=np.int64),
+            unique_names=np.array([self.unique_names[y] for y in years], dtype=np.int64),
+            region_counts=np.array(
+                [self.region_counts[y] for y in years], dtype=np.int64
+            ).reshape(len(years), len(self.regions) + 1),
+            name_totals=self.name_totals
+        )
+        manifest = {
+            'version': STORE_VERSION,
+            'genders': list(self.genders),
+            'regions': list(self.regions),
+            'years': years
+        }
+        tmp_path = self.path / 'manifest.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.path / 'manifest.json')
+
+    def _load(self) -> None:
+        """Read the manifest, vocabulary and summaries (partitions are lazy)."""
+        with open(self.path / 'manifest.json') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != STORE_VERSION:
+            raise ValueError(
+                f"Aggregate store at {self.path} has version {manifest.get('version')}, "
+                f"expected {STORE_VERSION}; delete it to rebuild"
+            )
+
+        self._name_vocab = Vocabulary(np.load(self.path / 'names.npy').astype(object))
+        self._gender_vocab = Vocabulary(manifest['genders'])
+        self.regions = pd.Index(manifest['regions'])
+
+        summary = np.load(self.path / 'summary.npz')
+        for i, year in enumerate(summary['years'].tolist()):
+            self.totals[year] = int(summary['totals'][i])
+            self.unique_names[year] = int(summary['unique_names'][i])
+            self.region_counts[year] = summary['region_counts'][i]
+        self.name_totals = summary['name_totals']
+
+        mapping_path = self.path / 'mapping.csv'
+        if mapping_path.exists():
+            self.mapping = pd.read_csv(mapping_path)
+        self._refresh_lookup()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _extend_names(self, names: pd.Index) -> np.ndarray:
+        """Add unseen names to the vocabulary; return store ids for ``names``."""
+        n_before = len(self._name_vocab)
+        ids = self._name_vocab.extend(names)
+        n_new = len(self._name_vocab) - n_before
+        if n_new:
+            self.name_totals = np.vstack([
+                self.name_totals,
+                np.zeros((n_new, self.name_totals.shape[1]), dtype=np.int64)
+            ])
+            self._refresh_lookup()
+        return ids.astype(np.int32)
+
+    def _extend_genders(self, genders: pd.Index) -> np.ndarray:
+        """Add unseen genders; return store ids for ``genders``."""
+        n_before = len(self._gender_vocab)
+        ids = self._gender_vocab.extend(genders)
+        n_new = len(self._gender_vocab) - n_before
+        if n_new:
+            self.name_totals = np.hstack([
+                self.name_totals,
+                np.zeros((self.name_totals.shape[0], n_new), dtype=np.int64)
+            ])
+        return ids.astype(np.int8)
+
+    def _refresh_lookup(self) -> None:
+        """Rebuild the name id -> region code lookup for the current vocabulary."""
+        if self.mapping is None:
+            # Without a mapping every name counts as 'Other'
+            self._lookup = np.zeros(len(self.names) + 1, dtype=np.int8)
+            self.regions = pd.Index(['Other'])
+            return
+        self._lookup, self.regions = build_origin_lookup(self.names, self.mapping)
+
+    def _set_partition(
+        self,
+        year: int,
+        name_ids: np.ndarray,
+        gender_ids: np.ndarray,
+        counts: np.ndarray
+    ) -> None:
+        """Replace one year's partition and update all summaries for it."""
+        valid = (name_ids >= 0) & (gender_ids >= 0)
+        n_genders = len(self.genders)
+        keys = name_ids[valid].astype(np.int64) * n_genders + gender_ids[valid]
+        # Collapse duplicate (name, gender) rows
+        size = len(self.names) * n_genders
+        summed = np.bincount(keys, weights=counts[valid], minlength=size).astype(np.int64)
+        keys = np.flatnonzero(np.bincount(keys, minlength=size))
+        summed = summed[keys]
+        part = pd.DataFrame({
+            'name_id': (keys // n_genders).astype(np.int32),
+            'gender': (keys % n_genders).astype(np.int8),
+            'count': summed.astype(np.int32)
+        })
+
+        if year in self.totals:
+            old = self._partition(year)
+            np.subtract.at(
+                self.name_totals,
+                (old['name_id'].to_numpy(), old['gender'].to_numpy()),
+                old['count'].to_numpy()
+            )
+        np.add.at(
+            self.name_totals,
+            (part['name_id'].to_numpy(), part['gender'].to_numpy()),
+            part['count'].to_numpy()
+        )
+
+        self._partitions[year] = part
+        self._dirty_years.add(year)
+        self.totals[year] = int(summed.sum())
+        self.unique_names[year] = int(part['name_id'].nunique())
+        self.region_counts[year] = self._count_regions(part)
+
+    def _partition(self, year: int) -> pd.DataFrame:
+        """Load a year's partition, from memory or disk."""
+        if year not in self._partitions:
+            data = np.load(self.path / 'years' / f'{year}.npz')
+            self._partitions[year] = pd.DataFrame({
+                'name_id': data['name_id'],
+                'gender': data['gender'],
+                'count': data['count']
+            })
+        return self._partitions[year]
+
+    def _count_regions(self, part: pd.DataFrame) -> np.ndarray:
+        """Births per region (plus a trailing unmapped slot) for one partition."""
+        n_cols = len(self.regions) + 1
+        region_codes = self._lookup[part['name_id'].to_numpy()]
+        return np.bincount(
+            region_codes, weights=part['count'].to_numpy(), minlength=n_cols
+        ).astype(np.int64)
+
+
+def _atomic_save(path: Path, values: np.ndarray) -> None:
+    """np.save via a temp file and rename."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, values)
+    os.replace(tmp_path, path)
+
+
+def _atomic_savez(path: Path, **arrays) -> None:
+    """np.savez via a temp file and rename."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
@@ -0,0 +1,300 @@
+"""
+Incremental builds of the derived data files.
+
+A build is a dependency graph of ``Stage`` objects. Each stage has a key:
+a hash of its parameters, the content of its input files and, for every
+upstream stage, the content of that stage's output file (or its key, for
+in-memory stages). A stage is skipped when its output exists and its key
+matches the one recorded at its last build; its output is only read back
+if a stale stage downstream needs it. Stages whose dependencies are done
+run concurrently in a thread pool.
+
+Because keys use the content of upstream outputs, hand-editing an output
+(e.g. reviewing name_origin_mapping.csv) rebuilds everything downstream of
+it, but not the edited file itself.
+
+Example:
+    build = Build(stages, 'data/.build/state.json')
+    report = build.run()
+    print(format_report(report))
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from .load_data import _file_hash
+
+# Bump when the meaning of recorded keys changes
+BUILD_STATE_VERSION = 1
+
+
+class Stage:
+    """
+    One node of a build: ``func(*dependency_values)`` -> DataFrame.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        deps: Sequence[str] = (),
+        files: Sequence[str] = (),
+        output: Optional[str] = None,
+        params: Optional[dict] = None,
+        load: Callable[[str], pd.DataFrame] = pd.read_csv
+    ):
+        """
+        Args:
+            name: Unique stage name
+            func: Called with the values of ``deps``, in order
+            deps: Names of upstream stages
+            files: Input files read by ``func`` itself (e.g. the raw CSV)
+            output: CSV file the result is written to; None keeps the
+                result in memory only and computes it on demand
+            params: Settings that change the result (part of the key)
+            load: Reads ``output`` back when the stage is up to date
+        """
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.files = tuple(str(path) for path in files)
+        self.output = str(output) if output is not None else None
+        self.params = dict(params or {})
+        self.load = load
+
+
+class Build:
+    """
+    Run a graph of stages, rebuilding only the stale ones.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        state_path: str,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            stages: The stages of the graph
+            state_path: JSON file recording stage keys and file hashes
+            max_workers: Threads for concurrent stages (None = one per stage)
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        for stage in stages:
+            unknown = [dep for dep in stage.deps if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name!r} depends on unknown stages {unknown}")
+        self.order = _topological_order(self.stages)
+        self.state_path = Path(state_path)
+        self.max_workers = max_workers or len(self.stages)
+
+        self._lock = threading.Lock()
+        self._stage_locks = {name: threading.Lock() for name in self.stages}
+        self._values: Dict[str, Any] = {}
+        self._keys: Dict[str, str] = {}
+        self._timings: Dict[str, dict] = {}
+        self._state = self._read_state()
+
+    def run(self, targets: Optional[Sequence[str]] = None, force: bool = False) -> pd.DataFrame:
+        """
+        Bring the targets (default: every stage with an output) up to date.
+
+        Args:
+            targets: Stage names to build, with everything they depend on
+            force: Rebuild every stage regardless of its key
+
+        Returns:
+            DataFrame with Stage, Status ('built', 'up to date', 'computed'
+            or 'not needed') and Seconds, in dependency order
+        """
+        if targets is None:
+            targets = [name for name in self.order if self.stages[name].output is not None]
+        needed = self._ancestors(targets)
+        self._values.clear()
+        self._keys.clear()
+        self._timings.clear()
+
+        pending = [name for name in self.order if name in needed]
+        done = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while pending or running:
+                for name in [n for n in pending if set(self.stages[n].deps) <= done]:
+                    pending.remove(name)
+                    running[pool.submit(self._resolve, name, force)] = name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()
+                    done.add(running.pop(future))
+
+        rows = []
+        for name in self.order:
+            if name in needed:
+                timing = self._timings.get(name, {'status': 'not needed', 'seconds': 0.0})
+                rows.append({'Stage': name, 'Status': timing['status'], 'Seconds': timing['seconds']})
+        return pd.DataFrame(rows, columns=['Stage', 'Status', 'Seconds'])
+
+    def value(self, name: str) -> Any:
+        """Result of a stage: computed, or read back from its output file."""
+        with self._stage_locks[name]:
+            if name not in self._values:
+                stage = self.stages[name]
+                if stage.output is not None:
+                    # Up to date: read the result back instead of rebuilding it
+                    self._values[name] = stage.load(stage.output)
+                else:
+                    args = [self.value(dep) for dep in stage.deps]
+                    start = time.perf_counter()
+                    self._values[name] = stage.func(*args)
+                    self._timings[name] = {
+                        'status': 'computed', 'seconds': time.perf_counter() - start
+                    }
+            return self._values[name]
+
+    # ------------------------------------------------------------------
+    # Keys and state
+    # ------------------------------------------------------------------
+
+    def _resolve(self, name: str, force: bool) -> None:
+        """Compute a stage's key; rebuild the stage if it is stale."""
+        stage = self.stages[name]
+        key = self._stage_key(stage)
+        self._keys[name] = key
+        if stage.output is None:
+            return
+
+        with self._lock:
+            recorded = self._state['stages'].get(name)
+        if not force and recorded == key and os.path.exists(stage.output):
+            self._timings[name] = {'status': 'up to date', 'seconds': 0.0}
+            return
+
+        args = [self.value(dep) for dep in stage.deps]
+        start = time.perf_counter()
+        result = stage.func(*args)
+        _write_csv(result, stage.output)
+        with self._stage_locks[name]:
+            self._values[name] = result
+            self._timings[name] = {'status': 'built', 'seconds': time.perf_counter() - start}
+        with self._lock:
+            self._state['stages'][name] = key
+            self._write_state()
+
+    def _stage_key(self, stage: Stage) -> str:
+        """Hash of everything the stage's result depends on."""
+        digest = hashlib.sha1()
+        digest.update(json.dumps({
+            'version': BUILD_STATE_VERSION,
+            'name': stage.name,
+            'params': stage.params
+        }, sort_keys=True, default=repr).encode())
+        for path in stage.files:
+            digest.update(self._file_fingerprint(path).encode())
+        for dep in stage.deps:
+            upstream = self.stages[dep]
+            if upstream.output is not None:
+                digest.update(self._file_fingerprint(upstream.output).encode())
+            else:
+                digest.update(self._keys[dep].encode())
+        return digest.hexdigest()
+
+    def _file_fingerprint(self, path: str) -> str:
+        """Content hash of a file, re-hashed only if its size or mtime changed."""
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._state['files'].get(path)
+        if cached is not None and (cached['size'], cached['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            return cached['blake2b']
+        content_hash = _file_hash(path)
+        with self._lock:
+            self._state['files'][path] = {
+                'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'blake2b': content_hash
+            }
+        return content_hash
+
+    def _ancestors(self, targets: Sequence[str]) -> set:
+        """The targets and every stage they depend on."""
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage {name!r}")
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.stages[name].deps)
+        return needed
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if state.get('version') != BUILD_STATE_VERSION:
+            state = {'version': BUILD_STATE_VERSION, 'stages': {}, 'files': {}}
+        return state
+
+    def _write_state(self) -> None:
+        """Persist the state (caller holds the lock), so interrupted builds keep progress."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+
+def _topological_order(stages: Dict[str, Stage]) -> List[str]:
+    """Stage names with every stage after its dependencies (declaration order otherwise)."""
+    order: List[str] = []
+    visiting = set()
+
+    def visit(name: str) -> None:
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through stage {name!r}")
+        visiting.add(name)
+        for dep in stages[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name)
+    return order
+
+
+def _write_csv(df: pd.DataFrame, path: str) -> None:
+    """Write a CSV atomically, so a failed stage never leaves a partial output."""
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def format_report(report: pd.DataFrame) -> str:
+    """
+    Per-stage timing table of a build report.
+
+    Args:
+        report: DataFrame returned by ``Build.run``
+
+    Returns:
+        Multi-line string
+    """
+    width = max([len('Stage')] + [len(name) for name in report['Stage']])
+    lines = [f"{'Stage':<{width}}  {'Status':<10}  {'Seconds':>8}"]
+    for row in report.itertuples(index=False):
+        lines.append(f"{row.Stage:<{width}}  {row.Status:<10}  {row.Seconds:>8.2f}")
+    lines.append(f"{'Total':<{width}}  {'':<10}  {report['Seconds'].sum():>8.2f}")
+    return '\n'.join(lines)
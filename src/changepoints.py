@@ -0,0 +1,342 @@
+"""
+Change-point detection over many yearly series at once.
+
+``calculate_change_around_policy`` measures the change at a year chosen in
+advance. This module finds the breaks instead: binary segmentation under a
+mean-shift (L2) cost, run simultaneously for every series of a matrix.
+
+With prefix sums S1 = cumsum(x) and S2 = cumsum(x**2), the cost of any
+segment [a, b) is ``S2[b] - S2[a] - (S1[b] - S1[a])**2 / (b - a)``, so one
+step scores every candidate split of every series (series x years array
+operations) and adds the best one per series if its cost reduction exceeds
+a BIC-style penalty, ``penalty * sigma**2 * log(n_years)``, where sigma is
+a robust noise estimate from first differences. Large inputs (the whole
+name vocabulary) are processed in chunks of series, optionally in a
+process pool.
+
+Example:
+    shares = calculate_yearly_shares(df_merged)
+    region_breaks = region_changepoints(shares)
+    name_breaks = name_changepoints(store, year_range=(1900, 2014), n_jobs=8)
+    summarize_breaks(name_breaks, policy_years=[1924, 1965])
+"""
+import contextlib
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, ContextManager, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    # Both pull in scipy; only annotations need them here
+    from scipy import sparse
+    from .trajectories import TrajectoryStore
+
+BREAK_COLUMNS = ['Series', 'Break_Year', 'Order', 'Gain', 'Mean_Before', 'Mean_After', 'Change']
+
+
+def detect_changepoints(
+    values: np.ndarray,
+    years: np.ndarray,
+    labels: Optional[Sequence] = None,
+    max_breaks: int = 3,
+    min_size: int = 5,
+    penalty: float = 2.0,
+    chunk_size: int = 10_000,
+    n_jobs: Optional[int] = 1
+) -> pd.DataFrame:
+    """
+    Binary segmentation of every row of a series x years matrix.
+
+    Args:
+        values: Array of shape (n_series, n_years)
+        years: Year of each column
+        labels: Name of each series (default: row numbers)
+        max_breaks: Most breaks per series
+        min_size: Fewest years in any segment
+        penalty: Multiplier of the ``sigma**2 * log(n_years)`` penalty
+            (larger = fewer breaks)
+        chunk_size: Series per chunk
+        n_jobs: Worker processes for the chunks (1 = in this process,
+            None = all cores)
+
+    Returns:
+        DataFrame with Series, Break_Year (first year of the new regime),
+        Order (1 = found first, the strongest), Gain (cost reduction),
+        Mean_Before, Mean_After and Change of the adjacent segments
+    """
+    values = np.asarray(values, dtype=np.float64)
+    years = np.asarray(years)
+    labels = np.arange(len(values)) if labels is None else np.asarray(labels, dtype=object)
+    chunks = [values[start:start + chunk_size] for start in range(0, len(values), chunk_size)]
+    with _chunk_pool(n_jobs, len(chunks)) as pool:
+        results = _run_chunks(_detect_chunk, chunks, pool, max_breaks, min_size, penalty)
+    return _breaks_frame(results, chunk_size, years, labels)
+
+
+def _chunk_pool(n_jobs: Optional[int], n_chunks: int) -> ContextManager[Optional[ProcessPoolExecutor]]:
+    """The process pool shared by all chunks of one call, or None to run them here."""
+    if n_jobs == 1 or n_chunks <= 1:
+        return contextlib.nullcontext()
+    return ProcessPoolExecutor(max_workers=n_jobs)
+
+
+def _run_chunks(func: Callable, chunks: list, pool: Optional[ProcessPoolExecutor], *args) -> list:
+    """``func(chunk, *args)`` for every chunk, in ``pool`` if there is one."""
+    if pool is None:
+        return [func(chunk, *args) for chunk in chunks]
+    return list(pool.map(func, chunks, *[[arg] * len(chunks) for arg in args]))
+
+
+def _detect_columns(
+    columns: 'sparse.csc_matrix',
+    max_breaks: int,
+    min_size: int,
+    penalty: float
+) -> Tuple[np.ndarray, ...]:
+    """``_detect_chunk`` on a years x series sparse slice, densified here (in the worker)."""
+    return _detect_chunk(columns.T.toarray(), max_breaks, min_size, penalty)
+
+
+def _breaks_frame(
+    results: List[Tuple[np.ndarray, ...]],
+    chunk_size: int,
+    years: np.ndarray,
+    labels: np.ndarray
+) -> pd.DataFrame:
+    """Assemble per-chunk break arrays into the tidy result."""
+    if not results:
+        return pd.DataFrame(columns=BREAK_COLUMNS)
+    # Chunk-local rows -> rows of the full matrix
+    results = [(rows + i * chunk_size, *rest) for i, (rows, *rest) in enumerate(results)]
+    series, position, order, gain, before, after = (
+        np.concatenate(parts) for parts in zip(*results)
+    )
+    breaks = pd.DataFrame({
+        'Series': labels[series],
+        'Break_Year': years[position],
+        'Order': order,
+        'Gain': gain,
+        'Mean_Before': before,
+        'Mean_After': after,
+        'Change': after - before
+    })
+    return breaks.sort_values(['Series', 'Break_Year'], kind='stable').reset_index(drop=True)
+
+
+def _segment_cost(total: np.ndarray, squares: np.ndarray, length: np.ndarray) -> np.ndarray:
+    """L2 cost (sum of squared deviations from the mean) of segments, from their sums."""
+    return squares - total ** 2 / np.maximum(length, 1)
+
+
+def _noise_variance(values: np.ndarray) -> np.ndarray:
+    """Robust per-row noise variance from first differences (MAD, then std fallback)."""
+    diffs = np.diff(values, axis=1)
+    mad = np.median(np.abs(diffs - np.median(diffs, axis=1, keepdims=True)), axis=1)
+    # Differences of i.i.d. noise have twice its variance
+    sigma = 1.4826 * mad / np.sqrt(2)
+    # Mostly-constant series (e.g. rare names) have a zero MAD
+    fallback = diffs.std(axis=1) / np.sqrt(2)
+    return np.where(sigma > 0, sigma, fallback) ** 2
+
+
+def _detect_chunk(
+    values: np.ndarray,
+    max_breaks: int,
+    min_size: int,
+    penalty: float
+) -> Tuple[np.ndarray, ...]:
+    """
+    Binary segmentation of one chunk of series.
+
+    Returns:
+        Tuple of (row, break position, order, gain, mean before, mean after)
+        arrays, one entry per break
+    """
+    n_series, n_years = values.shape
+    if n_years < 2 * min_size:
+        # No split leaves two segments of min_size years
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, np.array([]), np.array([]), np.array([])
+    s1 = np.zeros((n_series, n_years + 1))
+    s2 = np.zeros((n_series, n_years + 1))
+    np.cumsum(values, axis=1, out=s1[:, 1:])
+    np.cumsum(values ** 2, axis=1, out=s2[:, 1:])
+
+    positions = np.arange(n_years + 1)
+    splits = positions[1:n_years]
+    total_cost = _segment_cost(s1[:, -1], s2[:, -1], n_years)
+    threshold = np.maximum(
+        penalty * _noise_variance(values) * np.log(n_years),
+        1e-12 * total_cost
+    )
+
+    is_break = np.zeros((n_series, n_years + 1), dtype=bool)
+    is_break[:, [0, n_years]] = True
+    # Series still gaining breaks; one that rejects its best split is done
+    active = np.arange(n_series)
+    found = []
+    for order in range(1, max_breaks + 1):
+        breaks = is_break[active]
+        # Enclosing segment [lo, hi) of every candidate split: last break
+        # before, first break after
+        lo = np.maximum.accumulate(np.where(breaks, positions, 0), axis=1)[:, 1:n_years]
+        hi = np.minimum.accumulate(
+            np.where(breaks, positions, n_years)[:, ::-1], axis=1
+        )[:, ::-1][:, 1:n_years]
+        # Prefix sums at lo, split and hi, as flat gathers
+        offsets = (active * (n_years + 1))[:, None]
+        flat1, flat2 = s1.ravel(), s2.ravel()
+        lo1, lo2 = flat1[lo + offsets], flat2[lo + offsets]
+        hi1, hi2 = flat1[hi + offsets], flat2[hi + offsets]
+        mid1, mid2 = s1[active, 1:n_years], s2[active, 1:n_years]
+        gain = (
+            _segment_cost(hi1 - lo1, hi2 - lo2, hi - lo)
+            - _segment_cost(mid1 - lo1, mid2 - lo2, splits - lo)
+            - _segment_cost(hi1 - mid1, hi2 - mid2, hi - splits)
+        )
+        valid = (
+            ~breaks[:, 1:n_years]
+            & (splits - lo >= min_size)
+            & (hi - splits >= min_size)
+        )
+        gain[~valid] = -np.inf
+        best = gain.argmax(axis=1)
+        best_gain = gain[np.arange(len(active)), best]
+        accept = best_gain > threshold[active]
+        if not accept.any():
+            break
+        active = active[accept]
+        is_break[active, best[accept] + 1] = True
+        found.append((active, best[accept] + 1, np.full(len(active), order), best_gain[accept]))
+
+    if not found:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, np.array([]), np.array([]), np.array([])
+    series, position, order, gain = (np.concatenate(parts) for parts in zip(*found))
+
+    # Means of the final segments on either side of each break
+    previous = np.maximum.accumulate(np.where(is_break, positions, 0), axis=1)
+    following = np.minimum.accumulate(np.where(is_break, positions, n_years)[:, ::-1], axis=1)[:, ::-1]
+    lo = previous[series, position - 1]
+    hi = following[series, position + 1]
+    before = (s1[series, position] - s1[series, lo]) / (position - lo)
+    after = (s1[series, hi] - s1[series, position]) / (hi - position)
+    return series, position, order, gain, before, after
+
+
+def region_changepoints(
+    shares_df: pd.DataFrame,
+    value_col: str = 'Share',
+    region_col: str = 'Origin_Region',
+    **kwargs
+) -> pd.DataFrame:
+    """
+    Breaks in every region's yearly share.
+
+    Args:
+        shares_df: Output of ``calculate_yearly_shares``
+        value_col: Column to segment
+        region_col: Column naming the series
+        **kwargs: Passed to ``detect_changepoints``
+
+    Returns:
+        See ``detect_changepoints``; Series holds the region
+    """
+    wide = shares_df.pivot_table(index='Year', columns=region_col, values=value_col, fill_value=0)
+    wide = wide.reindex(np.arange(wide.index.min(), wide.index.max() + 1), fill_value=0)
+    return detect_changepoints(wide.to_numpy().T, wide.index.to_numpy(), list(wide.columns), **kwargs)
+
+
+def name_changepoints(
+    store: 'TrajectoryStore',
+    gender: Optional[str] = None,
+    year_range: Optional[Tuple[int, int]] = None,
+    min_births: int = 1000,
+    normalize: bool = True,
+    max_breaks: int = 3,
+    min_size: int = 5,
+    penalty: float = 2.0,
+    chunk_size: int = 10_000,
+    n_jobs: Optional[int] = 1
+) -> pd.DataFrame:
+    """
+    Breaks in every name's yearly series.
+
+    Each chunk of names goes to a worker as a sparse column slice and is
+    densified there, so only ``chunk_size`` names per worker are ever dense.
+
+    Args:
+        store: TrajectoryStore
+        gender: Gender code, or None for all births
+        year_range: Optional inclusive (start_year, end_year)
+        min_births: Skip names with fewer births in the range
+        normalize: Segment shares of yearly births rather than counts
+        max_breaks, min_size, penalty: See ``detect_changepoints``
+        chunk_size: Names per chunk
+        n_jobs: Worker processes for the chunks (1 = in this process,
+            None = all cores)
+
+    Returns:
+        See ``detect_changepoints``; Series holds the name
+    """
+    matrix = store.shares(gender) if normalize else store.counts(gender)
+    births = store.counts(gender)
+    rows = np.arange(len(store.years))
+    if year_range is not None:
+        rows = rows[(store.years >= year_range[0]) & (store.years <= year_range[1])]
+        matrix, births = matrix.tocsr()[rows], births.tocsr()[rows]
+    keep = np.flatnonzero(np.asarray(births.sum(axis=0)).ravel() >= min_births)
+    matrix = matrix.tocsc()[:, keep]
+
+    chunks = [matrix[:, start:start + chunk_size] for start in range(0, len(keep), chunk_size)]
+    with _chunk_pool(n_jobs, len(chunks)) as pool:
+        results = _run_chunks(_detect_columns, chunks, pool, max_breaks, min_size, penalty)
+    return _breaks_frame(results, chunk_size, store.years[rows], np.asarray(store.names[keep], dtype=object))
+
+
+def summarize_breaks(
+    breaks: pd.DataFrame,
+    policy_years: Sequence[int] = (1924, 1965),
+    window: int = 3,
+    years: Optional[Sequence[int]] = None,
+    first_only: bool = False
+) -> pd.DataFrame:
+    """
+    Do breaks cluster around policy years?
+
+    Compares the number of breaks within ``window`` years of each policy
+    year with the number expected if break years were uniform over the
+    possible years.
+
+    Args:
+        breaks: Output of ``detect_changepoints`` (or the region/name wrappers)
+        policy_years: Years to test
+        window: Half-width of the window, in years
+        years: Possible break years (default: the range of observed breaks)
+        first_only: Count only each series' strongest break (Order 1)
+
+    Returns:
+        DataFrame with Policy_Year, Window, Breaks_Near, Expected_Near,
+        Ratio (observed / expected) and Series_With_Break_Near
+    """
+    if first_only:
+        breaks = breaks[breaks['Order'] == 1]
+    break_years = breaks['Break_Year'].to_numpy()
+    if years is None:
+        years = np.arange(break_years.min(), break_years.max() + 1) if len(break_years) else np.array([])
+    years = np.asarray(years)
+
+    rows = []
+    for policy in policy_years:
+        near = np.abs(break_years - policy) <= window
+        eligible = np.count_nonzero(np.abs(years - policy) <= window)
+        expected = len(break_years) * eligible / len(years) if len(years) else np.nan
+        rows.append({
+            'Policy_Year': policy,
+            'Window': window,
+            'Breaks_Near': int(near.sum()),
+            'Expected_Near': expected,
+            'Ratio': near.sum() / expected if expected else np.nan,
+            'Series_With_Break_Near': breaks.loc[near, 'Series'].nunique()
+        })
+    return pd.DataFrame(rows)
@@ -3,9 +3,23 @@ Compute trends and indices for immigration analysis.
 """
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple, Union
 
+from .distinct import YearlySketches
+from .encoding import get_codes
+from .instrument import traced
+from .load_data import build_origin_lookup
+from .memo import memoize
 
+if TYPE_CHECKING:
+    from scipy import sparse  # imported lazily at run time
+
+# Regions counted by default in the immigrant name share
+DEFAULT_IMMIGRANT_REGIONS = ['Irish_Italian', 'Latin', 'Asian', 'African_MiddleEastern']
+
+
+@traced
+@memoize
 def calculate_yearly_shares(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate the share of births by origin region for each year.
@@ -16,21 +30,155 @@ def calculate_yearly_shares(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with Year, Origin_Region, Region_Births, Total_Births, and Share
     """
-    # Calculate total births per year
-    yearly_totals = df.groupby('Year')['Count'].sum().reset_index()
-    yearly_totals.columns = ['Year', 'Total_Births']
+    years, regions, counts, present = year_region_matrix(df)
+    return shares_from_matrix(years, regions, counts, present)
+
+
+@traced
+def year_region_matrix(
+    df: pd.DataFrame,
+    region_col: str = 'Origin_Region'
+) -> Tuple[np.ndarray, pd.Index, np.ndarray, np.ndarray]:
+    """
+    Aggregate births into a dense years x regions matrix in a single pass.
     
-    # Calculate births by region per year
-    yearly_by_region = df.groupby(['Year', 'Origin_Region'])['Count'].sum().reset_index()
-    yearly_by_region.columns = ['Year', 'Origin_Region', 'Region_Births']
+    Each row is assigned the flat cell ``year_offset * (n_regions + 1) +
+    region_code`` and counts are summed with one ``np.bincount``. The extra
+    last column collects rows without a region, so row sums are the yearly
+    totals.
+    
+    Args:
+        df: DataFrame with Year, Count and a region column
+        region_col: Name of the region column
+        
+    Returns:
+        Tuple of (years, regions, counts, present) where ``counts`` has shape
+        (n_years, n_regions + 1) and ``present`` flags cells with any rows
+    """
+    region_codes, regions = get_codes(df[region_col])
+    return year_region_matrix_from_codes(
+        df['Year'].to_numpy(), region_codes, regions, df['Count'].to_numpy()
+    )
+
+
+@traced
+def year_region_matrix_from_codes(
+    year_values: np.ndarray,
+    region_codes: np.ndarray,
+    regions: pd.Index,
+    counts: np.ndarray
+) -> Tuple[np.ndarray, pd.Index, np.ndarray, np.ndarray]:
+    """
+    ``year_region_matrix`` on raw arrays.
     
-    # Merge and calculate shares
-    result = yearly_by_region.merge(yearly_totals, on='Year')
-    result['Share'] = result['Region_Births'] / result['Total_Births'] * 100
+    Lets callers that already hold per-row region codes (e.g. a name-id
+    lookup gathered on the fly) aggregate without building a region column.
     
-    return result
+    Args:
+        year_values: Year of each row
+        region_codes: Region code of each row (-1 = no region)
+        regions: Region categories the codes index into
+        counts: Count of each row
+        
+    Returns:
+        Same as ``year_region_matrix``
+    """
+    n_cols = len(regions) + 1
+    if len(year_values) == 0:
+        return (
+            year_values[:0].copy(),
+            regions,
+            np.zeros((0, n_cols), dtype=np.int64),
+            np.zeros((0, n_cols), dtype=bool)
+        )
+    
+    first_year = year_values.min()
+    year_offsets = (year_values - first_year).astype(np.int64)
+    n_years = int(year_offsets.max()) + 1
+    
+    # Missing regions (code -1) land in the trailing column
+    cells = year_offsets * n_cols + np.where(region_codes < 0, len(regions), region_codes)
+    totals = np.bincount(cells, weights=counts, minlength=n_years * n_cols)
+    present = np.bincount(cells, minlength=n_years * n_cols) > 0
+    
+    years = np.arange(n_years, dtype=year_values.dtype) + first_year
+    return (
+        years,
+        regions,
+        totals.astype(np.int64).reshape(n_years, n_cols),
+        present.reshape(n_years, n_cols)
+    )
+
+
+@traced
+def shares_from_matrix(
+    years: np.ndarray,
+    regions: pd.Index,
+    counts: np.ndarray,
+    present: np.ndarray
+) -> pd.DataFrame:
+    """
+    Derive long-format yearly shares from a years x regions count matrix.
+    
+    Args:
+        years, regions, counts, present: Output of ``year_region_matrix``
+        
+    Returns:
+        DataFrame with Year, Origin_Region, Region_Births, Total_Births, and Share,
+        with one row per observed (year, region) pair
+    """
+    totals = counts.sum(axis=1)
+    n_regions = len(regions)
+    year_idx, region_idx = np.nonzero(present[:, :n_regions])
+    
+    region_births = counts[year_idx, region_idx]
+    total_births = totals[year_idx]
+    return pd.DataFrame({
+        'Year': years[year_idx],
+        'Origin_Region': pd.Categorical.from_codes(region_idx, categories=regions),
+        'Region_Births': region_births,
+        'Total_Births': total_births,
+        'Share': region_births / total_births * 100
+    })
+
+
+@traced
+def year_name_counts(df: pd.DataFrame) -> Tuple[np.ndarray, pd.Index, 'sparse.csr_matrix']:
+    """
+    Aggregate births into a sparse years x names count matrix.
+    
+    Genders are summed. Columns follow the Name dictionary, so a mapping can
+    be applied to every year at once as a names x regions matrix product.
+    
+    Args:
+        df: Baby names DataFrame with Year, Name and Count
+        
+    Returns:
+        Tuple of (years, names, counts) where ``counts`` is a CSR matrix of
+        shape (n_years, n_names) covering every year from first to last
+    """
+    # scipy is only needed here and by the multi-scheme index; importing it
+    # lazily keeps it (~100 ms) out of the import of this module
+    from scipy import sparse
+    
+    name_codes, names = get_codes(df['Name'])
+    year_values = df['Year'].to_numpy()
+    first_year = year_values.min() if len(year_values) else 0
+    year_offsets = (year_values - first_year).astype(np.int64)
+    n_years = int(year_offsets.max()) + 1 if len(year_values) else 0
+    
+    valid = name_codes >= 0
+    # Duplicate (year, name) cells, e.g. one per gender, are summed
+    counts = sparse.coo_matrix(
+        (df['Count'].to_numpy()[valid].astype(np.int64), (year_offsets[valid], name_codes[valid])),
+        shape=(n_years, len(names))
+    ).tocsr()
+    years = np.arange(n_years, dtype=year_values.dtype) + first_year
+    return years, names, counts
 
 
+@traced
+@memoize
 def calculate_immigrant_index(
     yearly_shares: pd.DataFrame,
     immigrant_regions: List[str] = None
@@ -46,7 +194,7 @@ def calculate_immigrant_index(
         DataFrame with Year, Immigrant_Name_Share, and Anglo_Name_Share
     """
     if immigrant_regions is None:
-        immigrant_regions = ['Irish_Italian', 'Latin', 'Asian', 'African_MiddleEastern']
+        immigrant_regions = DEFAULT_IMMIGRANT_REGIONS
     
     # Calculate immigrant share
     immigrant_share = (
@@ -72,6 +220,120 @@ def calculate_immigrant_index(
     return result
 
 
+@traced
+@memoize
+def calculate_immigrant_indices(
+    df: pd.DataFrame,
+    schemes: Dict[str, Union[pd.DataFrame, Tuple[pd.DataFrame, List[str]]]]
+) -> pd.DataFrame:
+    """
+    Immigrant name index under several origin-mapping schemes in one pass.
+    
+    Births are aggregated once into a years x names matrix; each scheme
+    becomes two indicator columns (immigrant, Anglo) of a sparse
+    names x 2K matrix, and one matrix product gives every scheme's yearly
+    counts. Comparing dozens of schemes costs about as much as one.
+    
+    Args:
+        df: Baby names DataFrame with Year, Name and Count
+        schemes: {label: mapping_df} or {label: (mapping_df, immigrant_regions)};
+            immigrant_regions defaults as in ``calculate_immigrant_index``
+        
+    Returns:
+        DataFrame with Scheme, Year, Immigrant_Name_Share and Anglo_Name_Share;
+        for each scheme, the same rows as
+        ``calculate_immigrant_index(calculate_yearly_shares(merge_with_origins(df, mapping_df)))``
+    """
+    return immigrant_indices_from_counts(*year_name_counts(df), schemes)
+
+
+@traced
+def immigrant_indices_from_counts(
+    years: np.ndarray,
+    names: pd.Index,
+    counts: 'sparse.spmatrix',
+    schemes: Dict[str, Union[pd.DataFrame, Tuple[pd.DataFrame, List[str]]]]
+) -> pd.DataFrame:
+    """
+    ``calculate_immigrant_indices`` on a precomputed ``year_name_counts``.
+    
+    Args:
+        years, names, counts: Output of ``year_name_counts``
+        schemes: See ``calculate_immigrant_indices``
+        
+    Returns:
+        DataFrame with Scheme, Year, Immigrant_Name_Share and Anglo_Name_Share
+    """
+    labels = list(schemes)
+    columns = []
+    for label in labels:
+        scheme = schemes[label]
+        mapping_df, immigrant_regions = scheme if isinstance(scheme, tuple) else (scheme, None)
+        if immigrant_regions is None:
+            immigrant_regions = DEFAULT_IMMIGRANT_REGIONS
+        lookup, regions = build_origin_lookup(names, mapping_df)
+        # Flag regions, then gather per name by region code
+        columns.append(regions.isin(immigrant_regions)[lookup[:-1]])
+        columns.append((regions == 'Anglo')[lookup[:-1]])
+    
+    from scipy import sparse
+    
+    # Names x 2K indicators: mostly zeros, since mappings cover few names
+    indicators = sparse.csc_matrix(np.column_stack(columns), dtype=np.float64)
+    by_scheme = (sparse.csr_matrix(counts, dtype=np.float64) @ indicators).toarray()
+    totals = np.asarray(counts.sum(axis=1), dtype=np.float64).ravel()
+    
+    immigrant, anglo = by_scheme[:, 0::2], by_scheme[:, 1::2]
+    # Years without any immigrant births have no row, as in calculate_immigrant_index
+    year_idx, scheme_idx = np.nonzero((immigrant > 0).T)[::-1]
+    return pd.DataFrame({
+        'Scheme': np.array(labels, dtype=object)[scheme_idx],
+        'Year': years[year_idx],
+        'Immigrant_Name_Share': immigrant[year_idx, scheme_idx] / totals[year_idx] * 100,
+        'Anglo_Name_Share': anglo[year_idx, scheme_idx] / totals[year_idx] * 100
+    })
+
+
+def _year_sorted_values(
+    index_df: pd.DataFrame,
+    value_col: str = 'Immigrant_Name_Share'
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Years and values of a year-indexed series, sorted by year."""
+    years = index_df['Year'].to_numpy()
+    values = index_df[value_col].to_numpy(dtype=np.float64)
+    if np.all(years[1:] >= years[:-1]):
+        return years, values
+    order = np.argsort(years, kind='stable')
+    return years[order], values[order]
+
+
+@traced
+def range_means(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    Means of ``values[lo[i]:hi[i]]`` for many ranges at once.
+    
+    Uses prefix sums of the values and of the non-missing counts, so every
+    range costs O(1) and NaNs are skipped like ``Series.mean()``.
+    
+    Args:
+        values: Array with years along the first axis (extra axes, e.g.
+            resamples, are averaged independently)
+        lo: Range starts
+        hi: Range ends (exclusive)
+        
+    Returns:
+        Means of shape ``(len(lo),) + values.shape[1:]`` (NaN for empty ranges)
+    """
+    valid = ~np.isnan(values)
+    zero = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate([zero, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    counts = np.concatenate([zero, np.cumsum(valid, axis=0)])
+    n = counts[hi] - counts[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(n > 0, (sums[hi] - sums[lo]) / n, np.nan)
+
+
+@traced
 def analyze_policy_periods(
     index_df: pd.DataFrame,
     periods: Dict[str, Tuple[int, int]] = None
@@ -79,6 +341,9 @@ def analyze_policy_periods(
     """
     Analyze average shares for different policy periods.
     
+    Period bounds are located with one ``searchsorted`` over the sorted
+    years, and all periods are reduced together.
+    
     Args:
         index_df: DataFrame with Year and Immigrant_Name_Share
         periods: Dictionary of period_name: (start_year, end_year)
@@ -93,25 +358,126 @@ def analyze_policy_periods(
             'Post-1965': (1965, 2014)
         }
     
-    results = []
-    for period_name, (start, end) in periods.items():
-        period_data = index_df[
-            (index_df['Year'] >= start) & (index_df['Year'] <= end)
-        ]
+    years, values = _year_sorted_values(index_df)
+    bounds = np.array(list(periods.values()), dtype=np.int64).reshape(-1, 2)
+    lo = np.searchsorted(years, bounds[:, 0], side='left')
+    hi = np.searchsorted(years, bounds[:, 1], side='right')
+    # Periods without data are left out
+    keep = hi > lo
+    lo, hi = lo[keep], hi[keep]
+    
+    # reduceat over interleaved (start, end) pairs; the padding makes an
+    # end equal to len(values) a valid index and the odd slots are dropped
+    padded = np.append(values, np.nan)
+    pairs = np.column_stack([lo, hi]).ravel()
+    
+    return pd.DataFrame({
+        'Period': np.array(list(periods), dtype=object)[keep],
+        'Start_Year': bounds[keep, 0],
+        'End_Year': bounds[keep, 1],
+        'Avg_Immigrant_Share': range_means(values, lo, hi),
+        'Min_Immigrant_Share': np.fmin.reduceat(padded, pairs)[::2] if len(pairs) else [],
+        'Max_Immigrant_Share': np.fmax.reduceat(padded, pairs)[::2] if len(pairs) else []
+    })
+
+
+@traced
+def policy_window_grid(
+    policy_years: Iterable[int],
+    before_years: Union[int, Iterable[int]],
+    after_years: Union[int, Iterable[int]]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every combination of policy year, before-width and after-width.
+    
+    Returns:
+        Tuple of flat (policy, before, after) arrays of equal length
+    """
+    grids = np.meshgrid(
+        np.atleast_1d(np.asarray(policy_years, dtype=np.int64)),
+        np.atleast_1d(np.asarray(before_years, dtype=np.int64)),
+        np.atleast_1d(np.asarray(after_years, dtype=np.int64)),
+        indexing='ij'
+    )
+    return tuple(grid.ravel() for grid in grids)
+
+
+@traced
+def policy_window_bounds(
+    years: np.ndarray,
+    policy: np.ndarray,
+    before: np.ndarray,
+    after: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Row ranges of the before and after windows in a sorted year array.
+    
+    The before window is ``[policy - before, policy)`` and the after window
+    ``(policy, policy + after]``; the policy year itself is in neither.
+    
+    Returns:
+        Tuple of (before_lo, before_hi, after_lo, after_hi) for ``range_means``
+    """
+    return (
+        np.searchsorted(years, policy - before, side='left'),
+        np.searchsorted(years, policy, side='left'),
+        np.searchsorted(years, policy, side='right'),
+        np.searchsorted(years, policy + after, side='right')
+    )
+
+
+@traced
+def calculate_change_around_policies(
+    index_df: pd.DataFrame,
+    policy_years: Iterable[int],
+    before_years: Union[int, Iterable[int]] = 10,
+    after_years: Union[int, Iterable[int]] = 10,
+    value_col: str = 'Immigrant_Name_Share'
+) -> pd.DataFrame:
+    """
+    Change in a yearly share around many candidate policy years at once.
+    
+    Every combination of policy year, before-window and after-window is
+    evaluated in one vectorized pass: window bounds come from
+    ``searchsorted`` on the sorted years and the means from prefix sums,
+    instead of two boolean masks per call. As in
+    ``calculate_change_around_policy``, the before window is
+    ``[policy_year - before_years, policy_year)`` and the after window
+    ``(policy_year, policy_year + after_years]``.
+    
+    Args:
+        index_df: DataFrame with Year and the value column
+        policy_years: Candidate policy years
+        before_years: Width(s) of the window before each policy year
+        after_years: Width(s) of the window after each policy year
+        value_col: Column to average
         
-        if len(period_data) > 0:
-            results.append({
-                'Period': period_name,
-                'Start_Year': start,
-                'End_Year': end,
-                'Avg_Immigrant_Share': period_data['Immigrant_Name_Share'].mean(),
-                'Min_Immigrant_Share': period_data['Immigrant_Name_Share'].min(),
-                'Max_Immigrant_Share': period_data['Immigrant_Name_Share'].max()
-            })
+    Returns:
+        DataFrame with Policy_Year, Before_Years, After_Years, Before_Avg,
+        After_Avg, Absolute_Change and Percent_Change, one row per
+        combination
+    """
+    years, values = _year_sorted_values(index_df, value_col)
+    policy, before, after = policy_window_grid(policy_years, before_years, after_years)
+    before_lo, before_hi, after_lo, after_hi = policy_window_bounds(years, policy, before, after)
+    before_avg = range_means(values, before_lo, before_hi)
+    after_avg = range_means(values, after_lo, after_hi)
     
-    return pd.DataFrame(results)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        percent_change = np.where(before_avg > 0, (after_avg / before_avg - 1) * 100, np.nan)
+    
+    return pd.DataFrame({
+        'Policy_Year': policy,
+        'Before_Years': before,
+        'After_Years': after,
+        'Before_Avg': before_avg,
+        'After_Avg': after_avg,
+        'Absolute_Change': after_avg - before_avg,
+        'Percent_Change': percent_change
+    })
 
 
+@traced
 def calculate_change_around_policy(
     index_df: pd.DataFrame,
     policy_year: int,
@@ -121,6 +487,9 @@ def calculate_change_around_policy(
     """
     Calculate change in immigrant share around a policy year.
     
+    To scan many candidate years or window widths, use
+    ``calculate_change_around_policies``.
+    
     Args:
         index_df: DataFrame with Year and Immigrant_Name_Share
         policy_year: Year of policy change
@@ -130,44 +499,97 @@ def calculate_change_around_policy(
     Returns:
         Dictionary with before, after, and change statistics
     """
-    before_data = index_df[
-        (index_df['Year'] >= policy_year - before_years) &
-        (index_df['Year'] < policy_year)
-    ]
-    
-    after_data = index_df[
-        (index_df['Year'] > policy_year) &
-        (index_df['Year'] <= policy_year + after_years)
-    ]
-    
-    before_avg = before_data['Immigrant_Name_Share'].mean()
-    after_avg = after_data['Immigrant_Name_Share'].mean()
+    row = calculate_change_around_policies(
+        index_df, [policy_year], before_years, after_years
+    ).iloc[0]
     
     return {
         'policy_year': policy_year,
-        'before_avg': before_avg,
-        'after_avg': after_avg,
-        'absolute_change': after_avg - before_avg,
-        'percent_change': ((after_avg / before_avg) - 1) * 100 if before_avg > 0 else np.nan
+        'before_avg': row['Before_Avg'],
+        'after_avg': row['After_Avg'],
+        'absolute_change': row['Absolute_Change'],
+        'percent_change': row['Percent_Change']
     }
 
 
-def calculate_name_diversity(df: pd.DataFrame) -> pd.DataFrame:
+@traced
+def count_distinct_per_year(
+    year_offsets: np.ndarray,
+    codes: np.ndarray,
+    n_codes: int,
+    n_years: int
+) -> np.ndarray:
+    """
+    Number of distinct codes in each year.
+    
+    Each (year, code) pair is packed into one integer and deduplicated by
+    sorting, which is much faster than ``np.unique``'s hashing on int64 keys.
+    
+    Args:
+        year_offsets: Year of each row minus the first year
+        codes: Integer code of each row (-1 = skip)
+        n_codes: Size of the code dictionary
+        n_years: Number of year offsets
+        
+    Returns:
+        Distinct counts, one per year offset
+    """
+    valid = codes >= 0
+    pairs = np.sort(year_offsets[valid].astype(np.int64) * n_codes + codes[valid])
+    if len(pairs):
+        pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])]
+    return np.bincount(pairs // n_codes, minlength=n_years)
+
+
+@traced
+@memoize
+def calculate_name_diversity(
+    df: pd.DataFrame,
+    method: str = 'exact',
+    error: float = 0.01
+) -> pd.DataFrame:
     """
     Calculate name diversity metrics over time.
     
+    With ``method='exact'``, distinct names per year are counted on integer
+    name ids: each (year, name id) pair is packed into one integer and
+    deduplicated. With ``method='hll'``, they are estimated from per-year
+    HyperLogLog sketches (see ``distinct.YearlySketches``), which can also
+    be merged across year ranges and partitions.
+    
     Args:
         df: Baby names DataFrame with Year, Name, and Count
+        method: 'exact' or 'hll'
+        error: Target relative standard error for ``method='hll'``
         
     Returns:
         DataFrame with diversity metrics by year
     """
-    diversity = df.groupby('Year').agg({
-        'Name': 'nunique',
-        'Count': 'sum'
-    }).reset_index()
+    years = df['Year'].to_numpy()
+    first_year = years.min() if len(years) else 0
+    year_offsets = (years - first_year).astype(np.int64)
+    n_years = int(year_offsets.max()) + 1 if len(years) else 0
+    observed = np.flatnonzero(np.bincount(year_offsets, minlength=n_years))
+    total_births = np.bincount(
+        year_offsets, weights=df['Count'].to_numpy(), minlength=n_years
+    )
+    
+    if method == 'exact':
+        codes, names = get_codes(df['Name'])
+        unique_names = count_distinct_per_year(year_offsets, codes, len(names), n_years)[observed]
+    elif method == 'hll':
+        estimates = YearlySketches.from_frame(df, error=error).estimate()
+        unique_names = np.rint(
+            estimates.reindex(observed + first_year, fill_value=0).to_numpy()
+        ).astype(np.int64)
+    else:
+        raise ValueError(f"Unknown method {method!r}; expected 'exact' or 'hll'")
     
-    diversity.columns = ['Year', 'Unique_Names', 'Total_Births']
+    diversity = pd.DataFrame({
+        'Year': (observed + first_year).astype(years.dtype),
+        'Unique_Names': unique_names,
+        'Total_Births': total_births[observed].astype(np.int64)
+    })
     diversity['Names_Per_1000_Births'] = (
         diversity['Unique_Names'] / diversity['Total_Births'] * 1000
     )
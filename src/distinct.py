@@ -0,0 +1,222 @@
+"""
+Approximate distinct counting with HyperLogLog.
+
+Unique-name counts (``calculate_name_diversity``) need a hash set per
+group, which gets expensive when slicing by state, gender and sliding
+windows. ``YearlySketches`` keeps one HyperLogLog sketch per year instead;
+sketches for any range of years, or for separate partitions of the data,
+merge with an element-wise maximum, so any slice can be estimated without
+going back to the rows.
+"""
+import pandas as pd
+import numpy as np
+from typing import Tuple
+
+from .encoding import get_codes
+
+# Valid HyperLogLog precisions (number of registers = 2 ** p)
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+
+
+def precision_for_error(error: float) -> int:
+    """
+    Smallest precision whose standard error is at most ``error``.
+
+    The relative standard error of HyperLogLog is about ``1.04 / sqrt(m)``
+    with ``m = 2 ** p`` registers.
+
+    Args:
+        error: Target relative standard error (e.g. 0.01 for 1%)
+
+    Returns:
+        Precision ``p``
+    """
+    p = int(np.ceil(np.log2((1.04 / error) ** 2)))
+    return int(np.clip(p, MIN_PRECISION, MAX_PRECISION))
+
+
+def hash_names(categories: pd.Index) -> np.ndarray:
+    """
+    64-bit hashes of names.
+
+    Hashes depend only on the string, so sketches built from frames with
+    different name dictionaries (other files, states, chunks) can be merged.
+
+    Args:
+        categories: Name dictionary
+
+    Returns:
+        uint64 array aligned with ``categories``
+    """
+    return pd.util.hash_array(np.asarray(categories, dtype=object))
+
+
+def _bucket_and_rank(hashes: np.ndarray, p: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Register index (top p bits) and rank (leading zeros + 1 of the rest)."""
+    buckets = (hashes >> np.uint64(64 - p)).astype(np.int64)
+    rest = hashes << np.uint64(p)
+    # Branch-free count of leading zeros
+    zeros = np.zeros(len(hashes), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        top_clear = (rest >> np.uint64(64 - shift)) == 0
+        zeros += top_clear * shift
+        rest = np.where(top_clear, rest << np.uint64(shift), rest)
+    zeros += rest == 0
+    ranks = np.minimum(zeros, 64 - p) + 1
+    return buckets, ranks.astype(np.uint8)
+
+
+def estimate_cardinality(registers: np.ndarray) -> np.ndarray:
+    """
+    HyperLogLog estimate for each row of a register matrix.
+
+    Uses linear counting for small cardinalities, as in the original paper.
+
+    Args:
+        registers: Array of shape (..., m)
+
+    Returns:
+        Estimated distinct counts, one per row
+    """
+    m = registers.shape[-1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    empty = np.sum(registers == 0, axis=-1)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.maximum(empty, 1))
+    return np.where((raw <= 2.5 * m) & (empty > 0), linear, raw)
+
+
+class YearlySketches:
+    """
+    One HyperLogLog sketch of distinct names per year.
+
+    Example:
+        sketches = YearlySketches.from_frame(df, error=0.01)
+        sketches.estimate()                    # per year
+        sketches.estimate_range(1965, 2014)    # distinct names over a period
+        sketches.rolling(10)                   # sliding decades
+        sketches.merge(other_state_sketches)   # combine partitions
+    """
+
+    def __init__(self, years: np.ndarray, registers: np.ndarray):
+        """
+        Args:
+            years: Sorted years, one per register row
+            registers: uint8 array of shape (n_years, 2 ** p)
+        """
+        self.years = np.asarray(years)
+        self.registers = registers
+
+    @property
+    def precision(self) -> int:
+        """Precision ``p`` of the sketches."""
+        return int(np.log2(self.registers.shape[1]))
+
+    @property
+    def relative_error(self) -> float:
+        """Expected relative standard error of the estimates."""
+        return 1.04 / np.sqrt(self.registers.shape[1])
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        error: float = 0.01,
+        column: str = 'Name'
+    ) -> 'YearlySketches':
+        """
+        Build per-year sketches of distinct values in one pass.
+
+        Args:
+            df: DataFrame with Year and the counted column
+            error: Target relative standard error
+            column: Column whose distinct values are counted
+
+        Returns:
+            YearlySketches
+        """
+        p = precision_for_error(error)
+        m = 1 << p
+        codes, categories = get_codes(df[column])
+        valid = codes >= 0
+        # Hash each distinct name once, then gather by code
+        buckets, ranks = _bucket_and_rank(hash_names(categories), p)
+
+        years = df['Year'].to_numpy()[valid]
+        first_year = years.min() if len(years) else 0
+        year_offsets = (years - first_year).astype(np.int64)
+        n_years = int(year_offsets.max()) + 1 if len(years) else 0
+        registers = np.zeros((n_years, m), dtype=np.uint8)
+        np.maximum.at(
+            registers.reshape(-1),
+            year_offsets * m + buckets[codes[valid]],
+            ranks[codes[valid]]
+        )
+        observed = np.flatnonzero(np.bincount(year_offsets, minlength=n_years))
+        return cls(observed + first_year, registers[observed])
+
+    def estimate(self) -> pd.Series:
+        """Estimated distinct count for each year."""
+        return pd.Series(
+            estimate_cardinality(self.registers), index=pd.Index(self.years, name='Year')
+        )
+
+    def estimate_range(self, start_year: int, end_year: int) -> float:
+        """
+        Estimated distinct count over an inclusive range of years.
+
+        Args:
+            start_year: First year
+            end_year: Last year
+
+        Returns:
+            Estimated number of distinct values
+        """
+        lo, hi = np.searchsorted(self.years, [start_year, end_year + 1])
+        if lo == hi:
+            return 0.0
+        return float(estimate_cardinality(self.registers[lo:hi].max(axis=0)))
+
+    def rolling(self, window: int) -> pd.Series:
+        """
+        Estimated distinct count over sliding windows of ``window`` years.
+
+        Args:
+            window: Window width in years (windows end at each year)
+
+        Returns:
+            Series indexed by the last year of each window
+        """
+        if len(self.years) == 0:
+            return pd.Series(np.zeros(0), index=pd.Index(self.years, name='Year'))
+        full_years = np.arange(self.years[0], self.years[-1] + 1)
+        dense = np.zeros((len(full_years), self.registers.shape[1]), dtype=np.uint8)
+        dense[self.years - self.years[0]] = self.registers
+        merged = dense.copy()
+        for offset in range(1, window):
+            np.maximum(merged[offset:], dense[:-offset], out=merged[offset:])
+        ends = full_years[window - 1:]
+        return pd.Series(
+            estimate_cardinality(merged[window - 1:]), index=pd.Index(ends, name='Year')
+        )
+
+    def merge(self, other: 'YearlySketches') -> 'YearlySketches':
+        """
+        Combine sketches built on another partition (e.g. another state).
+
+        Args:
+            other: Sketches with the same precision
+
+        Returns:
+            New YearlySketches covering the years of both
+        """
+        if other.registers.shape[1] != self.registers.shape[1]:
+            raise ValueError("Cannot merge sketches with different precisions")
+        years = np.union1d(self.years, other.years)
+        registers = np.zeros((len(years), self.registers.shape[1]), dtype=np.uint8)
+        for sketches in (self, other):
+            rows = np.searchsorted(years, sketches.years)
+            registers[rows] = np.maximum(registers[rows], sketches.registers)
+        return YearlySketches(years, registers)
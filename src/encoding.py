@@ -0,0 +1,135 @@
+"""
+Dictionary encoding of name and gender columns.
+
+The categorical dtype of the ``Name`` column acts as the shared name
+dictionary: its categories map each name to an integer id (the category
+code), and every frame sliced from a loaded dataset keeps the same
+dictionary. Aggregations work on these integer codes and only decode the
+few names that end up in a result.
+"""
+import pandas as pd
+import numpy as np
+from typing import Iterable, Tuple
+
+# Columns that are dictionary-encoded on load
+ENCODED_COLUMNS = ('Name', 'Gender')
+
+
+def encode_names(
+    df: pd.DataFrame,
+    columns: Iterable[str] = ENCODED_COLUMNS
+) -> pd.DataFrame:
+    """
+    Dictionary-encode string columns as categoricals.
+
+    Frames whose columns are already categorical are returned unchanged,
+    so this is cheap to call at the top of every function.
+
+    Args:
+        df: Baby names DataFrame
+        columns: Columns to encode (missing columns are skipped)
+
+    Returns:
+        DataFrame with the given columns as categoricals
+    """
+    to_encode = [
+        col for col in columns
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)
+    ]
+    if not to_encode:
+        return df
+
+    encoded = df.copy(deep=False)
+    for col in to_encode:
+        encoded[col] = df[col].astype('category')
+    return encoded
+
+
+def get_codes(series: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Get integer codes and the dictionary for a column.
+
+    Args:
+        series: Categorical (or string) column
+
+    Returns:
+        Tuple of (codes, categories); missing values have code -1
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    return series.cat.codes.to_numpy(), series.cat.categories
+
+
+def get_name_gender_codes(df: pd.DataFrame) -> Tuple[np.ndarray, pd.Index, pd.Index]:
+    """
+    Pack name and gender codes into a single integer key per row.
+
+    The key is ``name_code * n_genders + gender_code``, so
+    ``key // n_genders`` recovers the name id and ``key % n_genders``
+    the gender.
+
+    Args:
+        df: DataFrame with Name and Gender columns
+
+    Returns:
+        Tuple of (keys, name categories, gender categories)
+    """
+    name_codes, names = get_codes(df['Name'])
+    gender_codes, genders = get_codes(df['Gender'])
+    keys = name_codes.astype(np.int64) * len(genders) + gender_codes
+    keys[(name_codes < 0) | (gender_codes < 0)] = -1
+    return keys, names, genders
+
+
+def decode(codes: np.ndarray, categories: pd.Index) -> np.ndarray:
+    """
+    Turn integer codes back into values.
+
+    Args:
+        codes: Integer codes (non-negative)
+        categories: Dictionary the codes index into
+
+    Returns:
+        Array of decoded values
+    """
+    return categories.take(codes).to_numpy()
+
+
+class Vocabulary:
+    """
+    Append-only dictionary assigning stable integer ids to values.
+
+    Unlike a categorical's categories, ids never change as new values
+    arrive, so partial aggregates keyed by id stay valid across chunks,
+    files and sessions.
+    """
+
+    def __init__(self, values: Iterable[str] = ()):
+        """
+        Args:
+            values: Initial values, in id order
+        """
+        self.values = pd.Index(list(values), dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def extend(self, categories: pd.Index) -> np.ndarray:
+        """
+        Map a column's categories to vocabulary ids, adding unseen values.
+
+        The returned array has one extra trailing ``-1`` so it can be
+        indexed directly with category codes (missing values have code -1).
+
+        Args:
+            categories: Categories of a categorical column
+
+        Returns:
+            Array of ids, aligned with ``categories`` plus the trailing -1
+        """
+        ids = self.values.get_indexer(categories)
+        new = categories[ids < 0]
+        if len(new):
+            self.values = self.values.append(pd.Index(new.astype(object)))
+            ids = self.values.get_indexer(categories)
+        return np.append(ids, -1)
@@ -0,0 +1,315 @@
+"""
+Opt-in instrumentation of the ``src`` functions.
+
+The public functions of load_data, compute_trends, utils and visuals are
+decorated with ``traced``; code paths worth separating (CSV parsing, cache
+reads, figure export) are wrapped in ``span`` blocks. While instrumentation
+is disabled (the default) a traced call costs one flag check and ``span``
+returns a shared no-op context, so nothing is recorded or allocated.
+
+Each recorded call stores wall time, CPU time, rows in and out, the growth
+of peak RSS and, with ``memory=True``, the peak of tracemalloc allocations
+made inside it.
+
+Example:
+    from src import instrument
+    instrument.enable(memory=True)
+    df = load_babynames()
+    shares = calculate_yearly_shares(merge_with_origins(df, mapping))
+    print(instrument.format_report())
+    instrument.write_chrome_trace('trace.json')   # open in chrome://tracing or Perfetto
+"""
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_enabled = False
+_memory = False
+_records: List[dict] = []
+_local = threading.local()
+_origin = time.perf_counter()
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def enable(memory: bool = False) -> None:
+    """
+    Start recording traced calls and spans.
+
+    Args:
+        memory: Also track peak allocations with tracemalloc (slows
+            allocation-heavy code noticeably)
+    """
+    global _enabled, _memory
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop recording (recorded calls are kept until ``reset()``)."""
+    global _enabled, _memory
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _enabled = False
+    _memory = False
+
+
+def reset() -> None:
+    """Drop all recorded calls."""
+    _records.clear()
+
+
+def is_enabled() -> bool:
+    """Whether calls are currently recorded."""
+    return _enabled
+
+
+def _rows(value: Any) -> Optional[int]:
+    """Row count of a frame-like value, else None."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+def _max_rss_mb() -> Optional[float]:
+    """Process peak RSS so far, in MB."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 2**20 if sys.platform == 'darwin' else 2**10
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+class _Span:
+    """One recorded call; entered and exited around the measured code."""
+
+    __slots__ = ('name', 'rows_in', 'rows_out', 'start', 'cpu_start', 'rss_start',
+                 'mem_start', 'child_peak', 'child_time')
+
+    def __init__(self, name: str, rows_in: Optional[int] = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def __enter__(self) -> '_Span':
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.child_peak = 0
+        self.child_time = 0.0
+        self.rss_start = _max_rss_mb()
+        if _memory and tracemalloc.is_tracing():
+            self.mem_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        else:
+            self.mem_start = None
+        self.cpu_start = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        wall = time.perf_counter() - self.start
+        cpu = time.thread_time() - self.cpu_start
+        stack = _local.stack
+        stack.pop()
+        parent = stack[-1] if stack else None
+
+        peak_mb = None
+        if self.mem_start is not None and tracemalloc.is_tracing():
+            # reset_peak() in nested spans hides their peaks from this one,
+            # so children report theirs back through child_peak
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            peak_mb = max(peak - self.mem_start, 0) / 2**20
+            if parent is not None:
+                parent.child_peak = max(parent.child_peak, peak)
+        rss_end = _max_rss_mb()
+        if parent is not None:
+            parent.child_time += wall
+
+        _records.append({
+            'name': self.name,
+            'stack': ';'.join(span.name for span in stack + [self]),
+            'depth': len(stack),
+            'thread': threading.get_ident(),
+            'start': self.start - _origin,
+            'wall': wall,
+            'self': wall - self.child_time,
+            'cpu': cpu,
+            'peak_mb': peak_mb,
+            'rss_growth_mb': rss_end - self.rss_start if rss_end is not None else None,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out
+        })
+
+
+def span(name: str, rows: Optional[int] = None):
+    """
+    Context manager recording a block under ``name``.
+
+    Returns a shared no-op context while instrumentation is disabled.
+
+    Args:
+        name: Label of the block in reports and traces
+        rows: Optional input row count
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, rows)
+
+
+def traced(func: Callable) -> Callable:
+    """
+    Decorator: record every call of ``func`` while instrumentation is enabled.
+
+    Rows in is the length of the first DataFrame/Series argument, rows out
+    the length of a DataFrame/Series result.
+    """
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        rows_in = next((_rows(a) for a in args if _rows(a) is not None), None)
+        with _Span(name, rows_in) as current:
+            result = func(*args, **kwargs)
+            current.rows_out = _rows(result)
+        return result
+
+    return wrapper
+
+
+def records() -> pd.DataFrame:
+    """
+    Every recorded call, in completion order.
+
+    Returns:
+        DataFrame with name, stack, depth, thread, start, wall, self, cpu
+        (seconds), peak_mb, rss_growth_mb, rows_in and rows_out
+    """
+    columns = ['name', 'stack', 'depth', 'thread', 'start', 'wall', 'self', 'cpu',
+               'peak_mb', 'rss_growth_mb', 'rows_in', 'rows_out']
+    return pd.DataFrame(list(_records), columns=columns)
+
+
+def report(by: str = 'stack') -> pd.DataFrame:
+    """
+    Aggregate recorded calls, flame-graph style.
+
+    Args:
+        by: 'stack' to aggregate per call path (a tree, in call order) or
+            'name' to aggregate per function regardless of caller
+
+    Returns:
+        DataFrame with Calls, Wall_s, Self_s, CPU_s, Peak_MB, RSS_Growth_MB,
+        Rows_In, Rows_Out and the share of total wall time
+    """
+    df = records()
+    if by not in ('stack', 'name'):
+        raise ValueError("by must be 'stack' or 'name'")
+    if df.empty:
+        return pd.DataFrame(columns=[by, 'Calls', 'Wall_s', 'Self_s', 'CPU_s', 'Peak_MB',
+                                     'RSS_Growth_MB', 'Rows_In', 'Rows_Out', 'Pct_Total'])
+    summary = df.groupby(by, sort=False).agg(
+        Calls=('wall', 'size'),
+        Wall_s=('wall', 'sum'),
+        Self_s=('self', 'sum'),
+        CPU_s=('cpu', 'sum'),
+        Peak_MB=('peak_mb', 'max'),
+        RSS_Growth_MB=('rss_growth_mb', 'sum'),
+        Rows_In=('rows_in', 'max'),
+        Rows_Out=('rows_out', 'max'),
+        First_Start=('start', 'min')
+    ).reset_index()
+    total = df.loc[df['depth'] == 0, 'wall'].sum()
+    summary['Pct_Total'] = summary['Wall_s'] / total * 100 if total > 0 else 0.0
+    if by == 'stack':
+        # Parents before children, siblings in call order
+        summary = summary.sort_values('First_Start', kind='stable')
+        summary = summary.iloc[_tree_order(summary['stack'].tolist())]
+    else:
+        summary = summary.sort_values('Self_s', ascending=False, kind='stable')
+    return summary.drop(columns='First_Start').reset_index(drop=True)
+
+
+def _tree_order(stacks: List[str]) -> List[int]:
+    """Positions of call paths in depth-first order, keeping sibling order."""
+    children: Dict[str, List[int]] = {}
+    for i, stack in enumerate(stacks):
+        parent = stack.rsplit(';', 1)[0] if ';' in stack else ''
+        children.setdefault(parent, []).append(i)
+    order: List[int] = []
+
+    def visit(parent: str) -> None:
+        for i in children.get(parent, []):
+            order.append(i)
+            visit(stacks[i])
+
+    visit('')
+    # Paths whose parent was not recorded (e.g. still running) go last
+    seen = set(order)
+    return order + [i for i in range(len(stacks)) if i not in seen]
+
+
+def format_report(by: str = 'stack') -> str:
+    """
+    Text table of ``report(by)``; call paths are shown as an indented tree.
+
+    Returns:
+        Multi-line string
+    """
+    summary = report(by)
+    labels = [
+        '  ' * stack.count(';') + stack.rsplit(';', 1)[-1] for stack in summary[by]
+    ] if by == 'stack' else list(summary[by])
+    width = max([len('function')] + [len(label) for label in labels])
+    lines = [f"{'function':<{width}}  {'calls':>6}  {'wall s':>8}  {'self s':>8}  "
+             f"{'cpu s':>8}  {'peak MB':>8}  {'rows out':>10}  {'% total':>7}"]
+    for label, row in zip(labels, summary.itertuples(index=False)):
+        peak = f"{row.Peak_MB:8.1f}" if pd.notna(row.Peak_MB) else f"{'-':>8}"
+        rows_out = f"{int(row.Rows_Out):>10,}" if pd.notna(row.Rows_Out) else f"{'-':>10}"
+        lines.append(f"{label:<{width}}  {row.Calls:>6}  {row.Wall_s:8.3f}  {row.Self_s:8.3f}  "
+                     f"{row.CPU_s:8.3f}  {peak}  {rows_out}  {row.Pct_Total:7.1f}")
+    return '\n'.join(lines)
+
+
+def write_chrome_trace(path: str) -> None:
+    """
+    Write recorded calls as Chrome trace JSON (chrome://tracing, Perfetto).
+
+    Args:
+        path: Output JSON path
+    """
+    events = []
+    for rec in _records:
+        args = {'cpu_ms': rec['cpu'] * 1000}
+        for key in ('peak_mb', 'rss_growth_mb', 'rows_in', 'rows_out'):
+            if rec[key] is not None:
+                args[key] = rec[key]
+        events.append({
+            'name': rec['name'],
+            'cat': rec['name'].split('.', 1)[0],
+            'ph': 'X',
+            'ts': rec['start'] * 1e6,
+            'dur': rec['wall'] * 1e6,
+            'pid': os.getpid(),
+            'tid': rec['thread'],
+            'args': args
+        })
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
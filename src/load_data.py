@@ -1,25 +1,305 @@
 """
 Load and preprocess baby names data.
 """
+import glob
+import hashlib
+import json
+import os
+import re
+import warnings
 import pandas as pd
+import numpy as np
 from pathlib import Path
-from typing import Tuple
+from typing import Iterator, List, Optional, Tuple, Union
 
+from .encoding import encode_names, get_codes
+from .instrument import span, traced
+from .utils import slice_year_range, sort_by_year
 
-def load_babynames(data_path: str = '../data/babynames.csv') -> pd.DataFrame:
+
+# Bump when the on-disk cache layout changes so stale caches are rebuilt
+CACHE_VERSION = 3
+
+# Only empty cells are missing: names like "None" or "Nan" are real SSA names
+CSV_NA_OPTIONS = {'keep_default_na': False, 'na_values': ['']}
+
+# Compact dtypes for the SSA columns; string columns are stored as categoricals
+BABYNAMES_DTYPES = {
+    'Id': 'int32',
+    'Name': 'category',
+    'Year': 'int16',
+    'Gender': 'category',
+    'Count': 'int32'
+}
+
+
+@traced
+def load_babynames(
+    data_path: str = '../data/babynames.csv',
+    use_cache: bool = True,
+    cache_dir: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    year_range: Optional[Tuple[int, int]] = None
+) -> pd.DataFrame:
     """
     Load the baby names dataset.
     
+    The first load parses the CSV and writes a typed columnar cache (one
+    ``.npy`` file per column) next to it. Later loads memory-map that cache
+    instead of re-parsing the CSV, as long as the source file is unchanged.
+    
+    Rows are sorted by Year, so ``year_range`` is a zero-copy row slice and
+    ``filter_by_year_range`` finds its rows with a binary search.
+    
     Args:
         data_path: Path to the baby names CSV file
+        use_cache: Whether to read from / write to the columnar cache
+        cache_dir: Directory for the cache (default: ``.cache`` beside the CSV)
+        columns: Columns to return (default: all); only these are mapped
+            from the cache or parsed from the CSV
+        year_range: Optional inclusive (start_year, end_year); rows outside
+            it are dropped before anything else is materialized
         
     Returns:
         DataFrame with baby names data
     """
-    df = pd.read_csv(data_path)
+    read_columns = columns
+    if columns is not None and year_range is not None and 'Year' not in columns:
+        read_columns = list(columns) + ['Year']
+    
+    if not use_cache:
+        df = _read_babynames_csv(data_path, read_columns)
+    else:
+        cache_path = get_cache_path(data_path, cache_dir)
+        df = _read_cache(cache_path, data_path, read_columns)
+        if df is None:
+            df = _read_babynames_csv(data_path)
+            try:
+                _write_cache(df, cache_path, data_path)
+            except OSError as exc:
+                warnings.warn(f"Could not write cache to {cache_path}: {exc}")
+    return encode_names(_select(df, columns, year_range))
+
+
+def _select(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    year_range: Optional[Tuple[int, int]] = None
+) -> pd.DataFrame:
+    """Keep the rows in ``year_range`` and the given columns."""
+    if year_range is not None:
+        df = slice_year_range(df, *year_range)
+    if columns is not None and list(df.columns) != list(columns):
+        df = df[list(columns)]
+    return df
+
+
+def iter_babynames_chunks(
+    data_paths: Union[str, List[str]] = '../data/babynames.csv',
+    chunksize: int = 500_000,
+    **read_csv_kwargs
+) -> Iterator[pd.DataFrame]:
+    """
+    Read the dataset in typed chunks instead of all at once.
+    
+    Accepts one CSV, a glob pattern or a list of files, so larger-than-RAM
+    sources (state-level files, year-partitioned ``yobYYYY.txt`` files) can
+    be folded into accumulators chunk by chunk. Files without a Year column
+    get one from the four-digit year in their file name.
+    
+    Args:
+        data_paths: CSV path, glob pattern, or list of paths
+        chunksize: Rows per chunk
+        **read_csv_kwargs: Passed to ``pd.read_csv`` (e.g. ``names``,
+            ``header=None`` for headerless SSA files)
+        
+    Yields:
+        DataFrames of at most ``chunksize`` rows with encoded Name/Gender
+    """
+    if isinstance(data_paths, (str, Path)):
+        paths = sorted(glob.glob(str(data_paths))) or [str(data_paths)]
+    else:
+        paths = [str(p) for p in data_paths]
+    
+    numeric = {k: v for k, v in BABYNAMES_DTYPES.items() if v != 'category'}
+    read_csv_kwargs.setdefault('dtype', numeric)
+    for key, value in CSV_NA_OPTIONS.items():
+        read_csv_kwargs.setdefault(key, value)
+    for path in paths:
+        year = year_from_path(path)
+        for chunk in pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs):
+            if 'Year' not in chunk.columns and year is not None:
+                chunk['Year'] = np.int16(year)
+            yield encode_names(chunk)
+
+
+def year_from_path(path: str) -> Optional[int]:
+    """
+    Get the year encoded in a year-partitioned file name (e.g. ``yob2015.txt``).
+    
+    Args:
+        path: File path
+        
+    Returns:
+        The year, or None if the name has no four-digit year
+    """
+    match = re.search(r'(1[89]\d\d|2\d\d\d)', Path(path).stem)
+    return int(match.group(1)) if match else None
+
+
+def get_cache_path(data_path: str, cache_dir: Optional[str] = None) -> Path:
+    """
+    Get the cache directory used for a data file.
+    
+    Args:
+        data_path: Path to the source CSV file
+        cache_dir: Optional cache root (default: ``.cache`` beside the CSV)
+        
+    Returns:
+        Path of the cache directory for this file
+    """
+    source = Path(data_path)
+    root = Path(cache_dir) if cache_dir is not None else source.parent / '.cache'
+    return root / source.stem
+
+
+@traced
+def _read_babynames_csv(data_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Parse the CSV (optionally only some columns) with compact dtypes."""
+    numeric = {k: v for k, v in BABYNAMES_DTYPES.items() if v != 'category'}
+    with span('pd.read_csv'):
+        df = pd.read_csv(data_path, usecols=columns, dtype=numeric, **CSV_NA_OPTIONS)
+    # Converting after parsing is much faster than dtype='category' in read_csv
+    for col, dtype in BABYNAMES_DTYPES.items():
+        if dtype == 'category' and col in df.columns:
+            df[col] = df[col].astype('category')
+    # Year-sorted layout, so year ranges are contiguous row slices
+    if 'Year' in df.columns:
+        sorted_df = sort_by_year(df)
+        if sorted_df is not df:
+            df = sorted_df.reset_index(drop=True)
     return df
 
 
+def _source_fingerprint(data_path: str, with_hash: bool = True) -> dict:
+    """Size, mtime and (optionally) content hash of the source file."""
+    stat = os.stat(data_path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        fingerprint['blake2b'] = _file_hash(data_path)
+    return fingerprint
+
+
+def _file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """Content hash of a file, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_is_fresh(manifest: dict, data_path: str) -> bool:
+    """Check a cache manifest against the current source file."""
+    if manifest.get('version') != CACHE_VERSION:
+        return False
+    return _source_unchanged(manifest['source'], data_path)
+
+
+def _source_unchanged(cached: dict, data_path: str) -> bool:
+    """Check a recorded ``_source_fingerprint`` against the current file."""
+    current = _source_fingerprint(data_path, with_hash=False)
+    if current['size'] != cached['size']:
+        return False
+    if current['mtime_ns'] == cached['mtime_ns']:
+        return True
+    # Same size but touched/copied: fall back to comparing content
+    return _file_hash(data_path) == cached['blake2b']
+
+
+@traced
+def _read_cache(
+    cache_path: Path,
+    data_path: str,
+    columns: Optional[List[str]] = None
+) -> Optional[pd.DataFrame]:
+    """Memory-map a fresh cache (all or some columns), or return None if missing or stale."""
+    manifest_path = cache_path / 'manifest.json'
+    if not manifest_path.exists():
+        return None
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if not _cache_is_fresh(manifest, data_path):
+            return None
+        
+        wanted = manifest['columns'] if columns is None else [
+            col for col in manifest['columns'] if col['name'] in columns
+        ]
+        arrays = {}
+        for col in wanted:
+            # 'c' mode: pages are shared until written, writes stay private
+            values = np.load(cache_path / f"{col['name']}.npy", mmap_mode='c')
+            if col['kind'] == 'categorical':
+                categories = np.load(cache_path / f"{col['name']}.categories.npy")
+                values = pd.Categorical.from_codes(
+                    values, categories=pd.Index(categories.astype(object))
+                )
+            arrays[col['name']] = values
+    except (OSError, ValueError, KeyError) as exc:
+        warnings.warn(f"Ignoring unreadable cache at {cache_path}: {exc}")
+        return None
+    
+    # copy=False keeps each column backed by its own memory map
+    return pd.DataFrame(arrays, copy=False)
+
+
+@traced
+def _write_cache(df: pd.DataFrame, cache_path: Path, data_path: str) -> None:
+    """Write each column as .npy plus a manifest describing the source."""
+    cache_path.mkdir(parents=True, exist_ok=True)
+    manifest_path = cache_path / 'manifest.json'
+    if manifest_path.exists():
+        manifest_path.unlink()
+    
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            _save_array(cache_path / f"{name}.npy", series.cat.codes.to_numpy())
+            _save_array(
+                cache_path / f"{name}.categories.npy",
+                np.asarray(series.cat.categories, dtype=str)
+            )
+            columns.append({'name': name, 'kind': 'categorical'})
+        else:
+            _save_array(cache_path / f"{name}.npy", series.to_numpy())
+            columns.append({'name': name, 'kind': 'array'})
+    
+    manifest = {
+        'version': CACHE_VERSION,
+        'source': _source_fingerprint(data_path),
+        'rows': len(df),
+        'columns': columns
+    }
+    tmp_path = manifest_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _save_array(path: Path, values: np.ndarray) -> None:
+    """
+    Save an array via a temp file and rename, so memory maps held on the
+    previous version of the file stay valid.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, values)
+    os.replace(tmp_path, path)
+
+
+@traced
 def load_name_mapping(mapping_path: str = '../data/name_origin_mapping.csv') -> pd.DataFrame:
     """
     Load the name-to-origin mapping.
@@ -34,6 +314,7 @@ def load_name_mapping(mapping_path: str = '../data/name_origin_mapping.csv') ->
     return df[['Name', 'Origin_Region']]
 
 
+@traced
 def merge_with_origins(
     names_df: pd.DataFrame,
     mapping_df: pd.DataFrame
@@ -41,6 +322,12 @@ def merge_with_origins(
     """
     Merge baby names dataset with origin mapping.
     
+    Instead of a row-wise join, the mapping is compiled into a dense region
+    lookup indexed by name id (see ``build_origin_lookup``) and gathered
+    in one vectorized step. The result shares all existing columns with
+    ``names_df`` and adds ``Origin_Region`` as a categorical; names missing
+    from the mapping get ``'Other'``.
+    
     Args:
         names_df: Baby names DataFrame
         mapping_df: Name-origin mapping DataFrame
@@ -48,11 +335,51 @@ def merge_with_origins(
     Returns:
         Merged DataFrame with origin information
     """
-    merged = names_df.merge(mapping_df, on='Name', how='left')
-    merged['Origin_Region'] = merged['Origin_Region'].fillna('Other')
+    names_df = encode_names(names_df, ['Name'])
+    codes, names = get_codes(names_df['Name'])
+    lookup, regions = build_origin_lookup(names, mapping_df)
+    
+    merged = names_df.copy(deep=False)
+    merged['Origin_Region'] = pd.Categorical.from_codes(lookup[codes], categories=regions)
     return merged
 
 
+@traced
+def build_origin_lookup(
+    names: pd.Index,
+    mapping_df: pd.DataFrame,
+    default_region: str = 'Other'
+) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Compile a name-origin mapping into a dense lookup array.
+    
+    ``lookup[name_id]`` is the region code of that name. The array has one
+    extra trailing slot holding the default region, so missing names
+    (code -1) also resolve to the default.
+    
+    Args:
+        names: Name dictionary (categories of the Name column)
+        mapping_df: DataFrame with Name and Origin_Region columns
+        default_region: Region for names not in the mapping
+        
+    Returns:
+        Tuple of (lookup array, sorted region categories)
+    """
+    mapped_regions = mapping_df['Origin_Region'].dropna().unique().tolist()
+    regions = pd.Index(sorted(set(mapped_regions) | {default_region}))
+    dtype = np.int8 if len(regions) <= np.iinfo(np.int8).max else np.int16
+    default_code = regions.get_loc(default_region)
+    
+    lookup = np.full(len(names) + 1, default_code, dtype=dtype)
+    name_ids = names.get_indexer(mapping_df['Name'])
+    region_codes = regions.get_indexer(mapping_df['Origin_Region'])
+    keep = (name_ids >= 0) & (region_codes >= 0)
+    # Assign in reverse so the first mapping row wins for duplicate names
+    lookup[name_ids[keep][::-1]] = region_codes[keep][::-1]
+    return lookup, regions
+
+
+@traced
 def get_data_summary(df: pd.DataFrame) -> dict:
     """
     Get summary statistics for the dataset.
@@ -63,10 +390,13 @@ def get_data_summary(df: pd.DataFrame) -> dict:
     Returns:
         Dictionary with summary statistics
     """
+    codes, names = get_codes(df['Name'])
+    observed = np.bincount(codes[codes >= 0], minlength=len(names))
+    
     return {
         'total_records': len(df),
         'total_births': df['Count'].sum(),
-        'unique_names': df['Name'].nunique(),
+        'unique_names': int(np.count_nonzero(observed)),
         'year_range': (df['Year'].min(), df['Year'].max()),
         'years_covered': df['Year'].nunique()
     }
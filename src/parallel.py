@@ -0,0 +1,338 @@
+"""
+Process-parallel, partitioned execution of the core aggregations.
+
+Workers read the memory-mapped columns of the loader's columnar cache
+directly (see ``load_data.load_babynames``), so the dataset is shared
+through the page cache instead of being pickled to every process.
+
+* Yearly shares and name diversity partition the year-sorted rows into
+  contiguous year ranges; each partial covers whole years, so merging is
+  a concatenation.
+* Top names partition by name id (a hash of the name dictionary): each
+  worker totals only its own names and returns its local top N, and the
+  global top N is picked from those candidates.
+
+Results are identical to ``calculate_yearly_shares``,
+``calculate_name_diversity`` and ``get_top_names`` on the loaded frame.
+When the cache cannot be written, the executor runs those functions in
+this process instead.
+"""
+import os
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .compute_trends import (
+    calculate_name_diversity,
+    calculate_yearly_shares,
+    count_distinct_per_year,
+    shares_from_matrix,
+    year_region_matrix_from_codes
+)
+from .load_data import _read_cache, build_origin_lookup, get_cache_path, load_babynames, merge_with_origins
+from .topn import top_n_indices
+from .utils import YearIndex, get_top_names
+
+# Year-range tasks per worker, so uneven partitions still balance
+TASKS_PER_WORKER = 4
+
+
+class ParallelExecutor:
+    """
+    Run aggregations over the cached dataset in a process pool.
+
+    Nothing is loaded until the first aggregation, which builds or
+    validates the cache; the worker pool is then started and reused by
+    later calls. Use the executor as a context manager (or call
+    ``close()``) to stop it.
+
+    Example:
+        with ParallelExecutor('data/babynames.csv', n_jobs=32) as executor:
+            shares = executor.yearly_shares(load_name_mapping('data/name_origin_mapping.csv'))
+            top = executor.top_names(1000)
+    """
+
+    def __init__(
+        self,
+        data_path: str = '../data/babynames.csv',
+        n_jobs: Optional[int] = None,
+        cache_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            data_path: Path to the baby names CSV file
+            n_jobs: Worker processes (None = all cores, 1 = in this process)
+            cache_dir: Directory of the columnar cache (written if missing)
+        """
+        self.data_path = data_path
+        self.cache_dir = cache_dir
+        self.cache_path = get_cache_path(data_path, cache_dir)
+        self.n_jobs = n_jobs
+        self._opened = False
+        # The loaded frame, kept only when there is no cache for the workers
+        self._frame: Optional[pd.DataFrame] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'ParallelExecutor':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def has_cache(self) -> bool:
+        """
+        Whether the workers can read the columnar cache.
+
+        False when ``load_babynames`` could not write it; aggregations then
+        run in this process on the parsed frame.
+        """
+        self._open()
+        return self._frame is None
+
+    def _open(self) -> None:
+        """Build or validate the cache and read the dictionaries, once."""
+        if self._opened:
+            return
+        # The mapped columns stay lazy; without a cache this parses the CSV
+        df = load_babynames(self.data_path, cache_dir=self.cache_dir)
+        if _read_cache(self.cache_path, self.data_path, ['Year']) is None:
+            self._frame = df
+        self.names = df['Name'].cat.categories
+        self.genders = df['Gender'].cat.categories
+        self.year_values = df['Year'].to_numpy()
+        self._gender_codes = df['Gender'].cat.codes.to_numpy()
+        self._opened = True
+
+    # ------------------------------------------------------------------
+    # Aggregations
+    # ------------------------------------------------------------------
+
+    def yearly_shares(self, mapping_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        ``calculate_yearly_shares(merge_with_origins(df, mapping_df))`` in parallel.
+
+        Args:
+            mapping_df: Name-origin mapping
+
+        Returns:
+            DataFrame with Year, Origin_Region, Region_Births, Total_Births, and Share
+        """
+        if not self.has_cache():
+            return calculate_yearly_shares(merge_with_origins(self._frame, mapping_df))
+        lookup, regions = build_origin_lookup(self.names, mapping_df)
+        partials = self._map(_shares_task, [
+            (lo, hi, lookup, regions) for lo, hi in self._year_partitions()
+        ])
+        return shares_from_matrix(
+            np.concatenate([years for years, _, _ in partials]),
+            regions,
+            np.concatenate([counts for _, counts, _ in partials]),
+            np.concatenate([present for _, _, present in partials])
+        )
+
+    def name_diversity(self) -> pd.DataFrame:
+        """
+        ``calculate_name_diversity(df)`` in parallel.
+
+        Returns:
+            DataFrame with diversity metrics by year
+        """
+        if not self.has_cache():
+            return calculate_name_diversity(self._frame)
+        partials = self._map(_diversity_task, [
+            (lo, hi, len(self.names)) for lo, hi in self._year_partitions()
+        ])
+        years, unique_names, total_births = (np.concatenate(parts) for parts in zip(*partials))
+        diversity = pd.DataFrame({
+            'Year': years,
+            'Unique_Names': unique_names,
+            'Total_Births': total_births
+        })
+        diversity['Names_Per_1000_Births'] = (
+            diversity['Unique_Names'] / diversity['Total_Births'] * 1000
+        )
+        return diversity
+
+    def top_names(self, n: int = 1000, by_gender: bool = False) -> pd.DataFrame:
+        """
+        ``get_top_names(df, n, by_gender)`` in parallel.
+
+        Args:
+            n: Number of top names to return
+            by_gender: If True, get top N for each gender separately
+
+        Returns:
+            DataFrame with top names and their total counts
+        """
+        if not self.has_cache():
+            return get_top_names(self._frame, n, by_gender)
+        n_parts = self._workers()
+        n_genders = len(self.genders) if by_gender else 1
+        partials = self._map(_top_names_task, [
+            (part, n_parts, n, len(self.names), n_genders) for part in range(n_parts)
+        ])
+
+        if by_gender:
+            # Genders in order of first appearance, as get_top_names gives
+            codes = self._gender_codes
+            gender_order = pd.unique(codes[codes >= 0])
+        else:
+            gender_order = [0]
+
+        top_names = []
+        for g in gender_order:
+            ids = np.concatenate([partial[g][0] for partial in partials])
+            totals = np.concatenate([partial[g][1] for partial in partials])
+            # Candidates in id order, so ties break exactly as in get_top_names
+            order = np.argsort(ids, kind='stable')
+            ids, totals = ids[order], totals[order]
+            top = top_n_indices(totals, n)
+            top_df = pd.DataFrame({
+                'Name': self.names.take(ids[top]).to_numpy(),
+                'Total_Count': totals[top]
+            })
+            if by_gender:
+                top_df['Gender'] = self.genders[g]
+            top_names.append(top_df)
+        return pd.concat(top_names, ignore_index=True)
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def _workers(self) -> int:
+        """Number of worker processes."""
+        return self.n_jobs or os.cpu_count() or 1
+
+    def _year_partitions(self) -> List[Tuple[int, int]]:
+        """Contiguous row ranges of whole years with about equal row counts."""
+        n_parts = self._workers() * TASKS_PER_WORKER
+        offsets = YearIndex(self.year_values).offsets
+        targets = np.linspace(0, len(self.year_values), n_parts + 1)[1:-1]
+        # Snap each cut to the start of a year
+        cuts = offsets[np.minimum(np.searchsorted(offsets, targets), len(offsets) - 1)]
+        bounds = np.unique(np.concatenate([[0], cuts, [len(self.year_values)]]))
+        if len(bounds) == 1:
+            # No rows: one empty partition, so the partials still concatenate
+            return [(0, 0)]
+        return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    def _map(self, task: Callable, args: List[tuple]) -> list:
+        """Run ``task(*a)`` for every ``a``, in order, in the pool."""
+        if self._workers() == 1:
+            _init_worker(self.cache_path)
+            return [task(*a) for a in args]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers(), initializer=_init_worker, initargs=(self.cache_path,)
+            )
+        return list(self._pool.map(_call, [(task, a) for a in args]))
+
+
+# ----------------------------------------------------------------------
+# Worker side (module level so worker processes can run it)
+# ----------------------------------------------------------------------
+
+_worker_cache_path: Optional[Path] = None
+_worker_columns: Dict[str, np.ndarray] = {}
+
+
+def _init_worker(cache_path: Path) -> None:
+    """Point the worker at a cache directory."""
+    global _worker_cache_path
+    if cache_path != _worker_cache_path:
+        _worker_cache_path = cache_path
+        _worker_columns.clear()
+
+
+def _column(name: str) -> np.ndarray:
+    """Memory-mapped cache column (category codes for Name/Gender), opened once."""
+    if name not in _worker_columns:
+        _worker_columns[name] = np.load(_worker_cache_path / f"{name}.npy", mmap_mode='r')
+    return _worker_columns[name]
+
+
+def _call(job: tuple):
+    """Run one (task, args) job in a worker."""
+    task, args = job
+    return task(*args)
+
+
+def _shares_task(
+    lo: int,
+    hi: int,
+    lookup: np.ndarray,
+    regions: pd.Index
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Year x region counts for rows lo:hi, restricted to observed years."""
+    years, _, counts, present = year_region_matrix_from_codes(
+        _column('Year')[lo:hi], lookup[_column('Name')[lo:hi]], regions, _column('Count')[lo:hi]
+    )
+    observed = present.any(axis=1)
+    return years[observed], counts[observed], present[observed]
+
+
+def _diversity_task(
+    lo: int,
+    hi: int,
+    n_names: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Observed years, distinct names and births for rows lo:hi."""
+    year_values = _column('Year')[lo:hi]
+    first_year = year_values.min() if len(year_values) else 0
+    year_offsets = (year_values - first_year).astype(np.int64)
+    n_years = int(year_offsets.max()) + 1 if len(year_values) else 0
+    observed = np.flatnonzero(np.bincount(year_offsets, minlength=n_years))
+    unique_names = count_distinct_per_year(year_offsets, _column('Name')[lo:hi], n_names, n_years)
+    births = np.bincount(year_offsets, weights=_column('Count')[lo:hi], minlength=n_years)
+    return (
+        (observed + first_year).astype(year_values.dtype),
+        unique_names[observed],
+        births[observed].astype(np.int64)
+    )
+
+
+def _top_names_task(
+    part: int,
+    n_parts: int,
+    n: int,
+    n_names: int,
+    n_genders: int
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Local top N among the names with ``id % n_parts == part``.
+
+    Returns:
+        One (name ids, totals) pair per gender (or a single pair)
+    """
+    name_codes = _column('Name')
+    mine = (name_codes % n_parts == part) & (name_codes >= 0)
+    ids = name_codes[mine].astype(np.int64)
+    counts = _column('Count')[mine]
+    if n_genders > 1:
+        gender_codes = _column('Gender')[mine]
+        valid = gender_codes >= 0
+        keys = ids[valid] * n_genders + gender_codes[valid]
+        counts = counts[valid]
+    else:
+        keys = ids
+
+    size = n_names * n_genders
+    totals = np.bincount(keys, weights=counts, minlength=size).astype(np.int64)
+    present = np.bincount(keys, minlength=size) > 0
+    totals = totals.reshape(n_names, n_genders)
+    present = present.reshape(n_names, n_genders)
+
+    candidates = []
+    for g in range(n_genders):
+        top = top_n_indices(totals[:, g], n, present[:, g])
+        candidates.append((top, totals[top, g]))
+    return candidates
@@ -0,0 +1,214 @@
+"""
+Lazy query plans over the load -> merge -> shares -> index pipeline.
+
+The eager chain
+
+    df = load_babynames(path)
+    df = merge_with_origins(df, mapping)
+    df = filter_by_year_range(df, 1900, 2000)
+    index = calculate_immigrant_index(calculate_yearly_shares(df))
+
+materializes a full frame at every step. ``Pipeline`` records the same
+steps and only runs them on ``collect()``, after optimizing the plan:
+
+* year filters are intersected and pushed into the reader, and only the
+  columns the result needs are mapped from the cache;
+* the origin merge and the year x region groupby are fused: region codes
+  are gathered from the name-id lookup straight into one ``np.bincount``,
+  so no Origin_Region column is ever built.
+
+Only the final (small) result is materialized.
+"""
+import pandas as pd
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .compute_trends import (
+    calculate_immigrant_index,
+    shares_from_matrix,
+    year_region_matrix_from_codes
+)
+from .encoding import get_codes
+from .load_data import build_origin_lookup, load_babynames, merge_with_origins
+from .utils import filter_by_year_range
+
+# Columns an aggregated result needs from the source
+AGGREGATE_COLUMNS = ['Year', 'Name', 'Count']
+
+
+class Pipeline:
+    """
+    Immutable, lazily evaluated pipeline; every step returns a new Pipeline.
+
+    Example:
+        index = (
+            Pipeline.scan('data/babynames.csv')
+            .with_origins(load_name_mapping('data/name_origin_mapping.csv'))
+            .filter_years(1900, 2000)
+            .immigrant_index()
+            .collect()
+        )
+    """
+
+    def __init__(self, source: dict, steps: Tuple[tuple, ...] = ()):
+        """
+        Args:
+            source: {'path': ..., 'use_cache': ..., 'cache_dir': ...} or {'frame': df}
+            steps: Recorded (operation, *arguments) tuples
+        """
+        self.source = source
+        self.steps = steps
+
+    @classmethod
+    def scan(
+        cls,
+        data_path: str = '../data/babynames.csv',
+        use_cache: bool = True,
+        cache_dir: Optional[str] = None
+    ) -> 'Pipeline':
+        """
+        Start a pipeline on a baby names CSV (nothing is read yet).
+
+        Args:
+            data_path: Path to the baby names CSV file
+            use_cache: Whether to use the columnar cache
+            cache_dir: Directory for the cache
+
+        Returns:
+            Pipeline
+        """
+        return cls({'path': data_path, 'use_cache': use_cache, 'cache_dir': cache_dir})
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'Pipeline':
+        """Start a pipeline on an already loaded DataFrame."""
+        return cls({'frame': df})
+
+    def _then(self, *step) -> 'Pipeline':
+        return Pipeline(self.source, self.steps + (step,))
+
+    def with_origins(self, mapping_df: pd.DataFrame) -> 'Pipeline':
+        """Lazy ``merge_with_origins``."""
+        return self._then('with_origins', mapping_df)
+
+    def filter_years(self, start_year: int, end_year: int) -> 'Pipeline':
+        """Lazy ``filter_by_year_range`` (inclusive)."""
+        return self._then('filter_years', start_year, end_year)
+
+    def yearly_shares(self) -> 'Pipeline':
+        """Lazy ``calculate_yearly_shares``."""
+        return self._then('yearly_shares')
+
+    def immigrant_index(self, immigrant_regions: Optional[List[str]] = None) -> 'Pipeline':
+        """Lazy ``calculate_immigrant_index`` (implies ``yearly_shares``)."""
+        return self._then('immigrant_index', immigrant_regions)
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def optimize(self) -> dict:
+        """
+        Resolve the recorded steps into a physical plan.
+
+        Every step works year by year, so year filters commute with all of
+        them and can be applied at the source wherever they were recorded.
+
+        Returns:
+            Dict with year_range, columns, mapping, output and
+            immigrant_regions
+        """
+        plan = {
+            'year_range': None,
+            'columns': None,
+            'mapping': None,
+            'output': 'frame',
+            'immigrant_regions': None
+        }
+        for op, *args in self.steps:
+            if op == 'filter_years':
+                start, end = args
+                if plan['year_range'] is not None:
+                    start = max(start, plan['year_range'][0])
+                    end = min(end, plan['year_range'][1])
+                plan['year_range'] = (start, end)
+            elif op == 'with_origins':
+                if plan['output'] != 'frame':
+                    raise ValueError("with_origins must come before aggregation steps")
+                plan['mapping'] = args[0]
+            elif op in ('yearly_shares', 'immigrant_index'):
+                if plan['mapping'] is None:
+                    raise ValueError(f"{op} needs with_origins() first")
+                if op == 'immigrant_index':
+                    plan['immigrant_regions'] = args[0]
+                plan['output'] = op
+        if plan['output'] != 'frame':
+            plan['columns'] = AGGREGATE_COLUMNS
+        return plan
+
+    def explain(self) -> str:
+        """Human-readable optimized plan."""
+        plan = self.optimize()
+        source = self.source.get('path', 'DataFrame')
+        columns = ', '.join(plan['columns']) if plan['columns'] else 'all'
+        years = '{}-{}'.format(*plan['year_range']) if plan['year_range'] else 'all'
+        lines = [f"scan {source} [columns: {columns}; years: {years}]"]
+        if plan['output'] == 'frame':
+            if plan['mapping'] is not None:
+                lines.append("merge_with_origins (array lookup)")
+        else:
+            lines.append("fused origin lookup + year x region bincount")
+            lines.append("shares_from_matrix")
+            if plan['output'] == 'immigrant_index':
+                lines.append("calculate_immigrant_index")
+        return '\n'.join(lines)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def collect(self) -> pd.DataFrame:
+        """
+        Optimize and run the pipeline.
+
+        Returns:
+            The immigrant index, yearly shares, or (without an aggregation
+            step) the filtered frame
+        """
+        plan = self.optimize()
+        df = self._read(plan['columns'], plan['year_range'])
+
+        if plan['output'] == 'frame':
+            return df if plan['mapping'] is None else merge_with_origins(df, plan['mapping'])
+        if len(df) == 0:
+            raise ValueError("No rows left after filtering")
+
+        # Fused merge + groupby: region code per row straight from the name id
+        codes, names = get_codes(df['Name'])
+        lookup, regions = build_origin_lookup(names, plan['mapping'])
+        shares = shares_from_matrix(*year_region_matrix_from_codes(
+            df['Year'].to_numpy(), lookup[codes], regions, df['Count'].to_numpy()
+        ))
+        if plan['output'] == 'yearly_shares':
+            return shares
+        return calculate_immigrant_index(shares, plan['immigrant_regions'])
+
+    def _read(
+        self,
+        columns: Optional[List[str]],
+        year_range: Optional[Tuple[int, int]]
+    ) -> pd.DataFrame:
+        """Source rows and columns with the pushed-down projection and filter."""
+        if 'path' in self.source:
+            return load_babynames(
+                self.source['path'],
+                use_cache=self.source['use_cache'],
+                cache_dir=self.source['cache_dir'],
+                columns=columns,
+                year_range=year_range
+            )
+
+        df = self.source['frame']
+        if year_range is not None:
+            df = filter_by_year_range(df, *year_range)
+        return df if columns is None else df[columns]
@@ -0,0 +1,349 @@
+"""
+Bootstrap confidence intervals and permutation tests for policy-era changes.
+
+Resampling works on the years x names count matrix from
+``compute_trends.year_name_counts`` instead of on rows. A bootstrap
+replicate reweights names (Poisson or multinomial weights), so the
+immigrant share of every year for a whole batch of replicates is two
+sparse x dense matrix products rather than a rerun of
+``calculate_yearly_shares`` and ``calculate_immigrant_index``.
+
+The permutation test is name-level too: it shuffles the immigrant flag
+across names, so the observed change is compared with the changes of
+random name groups of the same size.
+
+Replicates run in fixed-size batches, each seeded from one
+``SeedSequence``; batches are spread over a process pool, so results
+depend only on ``seed`` and ``batch_size``, never on the number of
+workers.
+"""
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+from typing import Iterable, List, Optional, Tuple, Union
+
+from .compute_trends import (
+    DEFAULT_IMMIGRANT_REGIONS,
+    policy_window_bounds,
+    policy_window_grid,
+    range_means,
+    year_name_counts
+)
+from .load_data import build_origin_lookup
+
+RESAMPLING_METHODS = ('poisson', 'multinomial')
+
+
+class PolicyResampler:
+    """
+    Resampling engine for the immigrant name share around policy years.
+
+    Example:
+        resampler = PolicyResampler.from_frame(df, load_name_mapping())
+        ci = resampler.bootstrap([1924, 1965], n_resamples=10_000, n_jobs=8)
+        p = resampler.permutation_test([1924, 1965], n_permutations=10_000)
+    """
+
+    def __init__(
+        self,
+        years: np.ndarray,
+        names: pd.Index,
+        counts: sparse.spmatrix,
+        mapping_df: pd.DataFrame,
+        immigrant_regions: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            years, names, counts: Output of ``year_name_counts``
+            mapping_df: Name-origin mapping (Name, Origin_Region)
+            immigrant_regions: Regions counted as immigrant (default: all non-Anglo)
+        """
+        if immigrant_regions is None:
+            immigrant_regions = DEFAULT_IMMIGRANT_REGIONS
+        lookup, regions = build_origin_lookup(names, mapping_df)
+        is_immigrant = np.isin(regions.to_numpy()[lookup[:-1]], immigrant_regions)
+
+        # Names without births cannot change any share
+        counts = sparse.csr_matrix(counts, dtype=np.float64)
+        used = np.flatnonzero(counts.getnnz(axis=0))
+        self.years = np.asarray(years)
+        self.names = names[used]
+        self.counts = counts[:, used]
+        self.is_immigrant = is_immigrant[used]
+        # calculate_immigrant_index has no row for years without immigrant names
+        self.indexed_years = self.counts @ self.is_immigrant > 0
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        mapping_df: pd.DataFrame,
+        immigrant_regions: Optional[List[str]] = None
+    ) -> 'PolicyResampler':
+        """
+        Build the engine from a baby names DataFrame.
+
+        Args:
+            df: Baby names DataFrame with Year, Name and Count
+            mapping_df: Name-origin mapping
+            immigrant_regions: Regions counted as immigrant
+
+        Returns:
+            PolicyResampler
+        """
+        return cls(*year_name_counts(df), mapping_df, immigrant_regions)
+
+    def immigrant_shares(self, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Immigrant name share (%) of each year under per-name weights.
+
+        Args:
+            weights: Array of shape (n_names,) or (n_names, n_replicates);
+                all ones (the observed data) if omitted
+
+        Returns:
+            Shares of shape (n_years,) or (n_years, n_replicates); NaN for
+            years missing from ``calculate_immigrant_index``
+        """
+        if weights is None:
+            weights = np.ones(len(self.names))
+        totals = self.counts @ weights
+        immigrant = self.counts @ (weights * self.is_immigrant.reshape((-1,) + (1,) * (weights.ndim - 1)))
+        indexed = self.indexed_years.reshape((-1,) + (1,) * (weights.ndim - 1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(indexed & (totals > 0), immigrant / totals * 100, np.nan)
+
+    def changes(
+        self,
+        policy_years: Iterable[int],
+        before_years: Union[int, Iterable[int]] = 10,
+        after_years: Union[int, Iterable[int]] = 10
+    ) -> pd.DataFrame:
+        """
+        Observed changes, as ``calculate_change_around_policies`` on the index.
+
+        Returns:
+            DataFrame with Policy_Year, Before_Years, After_Years, Before_Avg,
+            After_Avg and Absolute_Change
+        """
+        policy, before, after = policy_window_grid(policy_years, before_years, after_years)
+        bounds = policy_window_bounds(self.years, policy, before, after)
+        shares = self.immigrant_shares()
+        before_avg = range_means(shares, *bounds[:2])
+        after_avg = range_means(shares, *bounds[2:])
+        return pd.DataFrame({
+            'Policy_Year': policy,
+            'Before_Years': before,
+            'After_Years': after,
+            'Before_Avg': before_avg,
+            'After_Avg': after_avg,
+            'Absolute_Change': after_avg - before_avg
+        })
+
+    def bootstrap(
+        self,
+        policy_years: Iterable[int],
+        before_years: Union[int, Iterable[int]] = 10,
+        after_years: Union[int, Iterable[int]] = 10,
+        n_resamples: int = 10_000,
+        method: str = 'poisson',
+        confidence: float = 0.95,
+        seed: int = 0,
+        n_jobs: Optional[int] = 1,
+        batch_size: int = 100
+    ) -> pd.DataFrame:
+        """
+        Name-level bootstrap confidence intervals for the change in share.
+
+        Each replicate reweights names with Poisson(1) weights, or with
+        multinomial counts (a classic resample of names with replacement).
+
+        Args:
+            policy_years: Candidate policy years
+            before_years: Width(s) of the window before each policy year
+            after_years: Width(s) of the window after each policy year
+            n_resamples: Number of bootstrap replicates
+            method: 'poisson' or 'multinomial'
+            confidence: Confidence level of the percentile intervals
+            seed: Seed for the replicate weights
+            n_jobs: Worker processes (1 = in this process, None = all cores)
+            batch_size: Replicates per task (bounds memory per worker)
+
+        Returns:
+            ``changes()`` output plus Std_Error, CI_Low and CI_High
+        """
+        if method not in RESAMPLING_METHODS:
+            raise ValueError(f"Unknown method {method!r}; expected one of {RESAMPLING_METHODS}")
+        result = self.changes(policy_years, before_years, after_years)
+        resampler, bounds = self._restrict_to_windows(result)
+        replicates = _run_batches(
+            resampler, '_bootstrap_batch', (method, bounds), n_resamples, seed, n_jobs, batch_size
+        )
+
+        alpha = (1 - confidence) / 2
+        low, high = np.nanpercentile(replicates, [100 * alpha, 100 * (1 - alpha)], axis=0)
+        result['Std_Error'] = np.nanstd(replicates, axis=0, ddof=1)
+        result['CI_Low'] = low
+        result['CI_High'] = high
+        return result
+
+    def permutation_test(
+        self,
+        policy_years: Iterable[int],
+        before_years: Union[int, Iterable[int]] = 10,
+        after_years: Union[int, Iterable[int]] = 10,
+        n_permutations: int = 10_000,
+        seed: int = 0,
+        n_jobs: Optional[int] = 1,
+        batch_size: int = 100
+    ) -> pd.DataFrame:
+        """
+        Two-sided name-level permutation p-values for the change in share.
+
+        Under the null that the origin labels are unrelated to how names
+        moved around the policy year, the immigrant names are exchangeable
+        with the others. Each permutation shuffles the immigrant flag
+        across the names with births in the windows and recomputes every
+        year's share (one sparse x dense product per batch), so the
+        observed change is ranked among the changes of random name groups
+        of the same size.
+
+        Args:
+            policy_years: Candidate policy years
+            before_years: Width(s) of the window before each policy year
+            after_years: Width(s) of the window after each policy year
+            n_permutations: Number of permutations
+            seed: Seed for the permutations
+            n_jobs: Worker processes (1 = in this process, None = all cores)
+            batch_size: Permutations per task
+
+        Returns:
+            ``changes()`` output plus P_Value
+        """
+        result = self.changes(policy_years, before_years, after_years)
+        resampler, bounds = self._restrict_to_windows(result)
+        replicates = _run_batches(
+            resampler, '_permutation_batch', (bounds,), n_permutations, seed, n_jobs, batch_size
+        )
+
+        observed = np.abs(result['Absolute_Change'].to_numpy())
+        exceed = (np.abs(replicates) >= observed - 1e-12).sum(axis=0)
+        result['P_Value'] = (exceed + 1) / (n_permutations + 1)
+        return result
+
+    def _restrict_to_windows(
+        self,
+        changes: pd.DataFrame
+    ) -> Tuple['PolicyResampler', Tuple[np.ndarray, ...]]:
+        """
+        Copy of the engine limited to the years any window covers.
+
+        Workers then only receive (and reweight) the names that matter.
+
+        Returns:
+            Tuple of (restricted engine, window bounds into its years)
+        """
+        policy, before, after = (
+            changes[col].to_numpy() for col in ('Policy_Year', 'Before_Years', 'After_Years')
+        )
+        bounds = policy_window_bounds(self.years, policy, before, after)
+        lo, hi = min(bounds[0].min(), bounds[2].min()), max(bounds[1].max(), bounds[3].max())
+        counts = self.counts[lo:hi]
+        used = np.flatnonzero(counts.getnnz(axis=0))
+
+        restricted = object.__new__(PolicyResampler)
+        restricted.years = self.years[lo:hi]
+        restricted.names = self.names[used]
+        restricted.counts = counts[:, used]
+        restricted.is_immigrant = self.is_immigrant[used]
+        restricted.indexed_years = self.indexed_years[lo:hi]
+        return restricted, tuple(b - lo for b in bounds)
+
+
+# ----------------------------------------------------------------------
+# Batches (module level so worker processes can run them)
+# ----------------------------------------------------------------------
+
+_worker_resampler: Optional[PolicyResampler] = None
+
+
+def _init_worker(resampler: PolicyResampler) -> None:
+    """Receive the engine once per worker process."""
+    global _worker_resampler
+    _worker_resampler = resampler
+
+
+def _window_changes(shares: np.ndarray, bounds: Tuple[np.ndarray, ...]) -> np.ndarray:
+    """After-minus-before means, shape (n_windows, n_replicates)."""
+    return range_means(shares, *bounds[2:]) - range_means(shares, *bounds[:2])
+
+
+def _bootstrap_batch(
+    resampler: PolicyResampler,
+    seed: np.random.SeedSequence,
+    size: int,
+    method: str,
+    bounds: Tuple[np.ndarray, ...]
+) -> np.ndarray:
+    """Changes for ``size`` bootstrap replicates, shape (size, n_windows)."""
+    rng = np.random.default_rng(seed)
+    n_names = len(resampler.names)
+    if method == 'poisson':
+        weights = rng.poisson(1.0, size=(n_names, size)).astype(np.float64)
+    else:
+        weights = rng.multinomial(n_names, np.full(n_names, 1 / n_names), size=size).T.astype(np.float64)
+    return _window_changes(resampler.immigrant_shares(weights), bounds).T
+
+
+def _permutation_batch(
+    resampler: PolicyResampler,
+    seed: np.random.SeedSequence,
+    size: int,
+    bounds: Tuple[np.ndarray, ...]
+) -> np.ndarray:
+    """Changes for ``size`` shuffles of the immigrant flag over names, shape (size, n_windows)."""
+    rng = np.random.default_rng(seed)
+    # One independent shuffle per column
+    labels = rng.permuted(np.tile(resampler.is_immigrant[:, None], (1, size)), axis=0)
+    totals = resampler.counts @ np.ones(len(resampler.names))
+    immigrant = resampler.counts @ labels.astype(np.float64)
+    # As in immigrant_shares: no index value for years without immigrant names
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shares = np.where(immigrant > 0, immigrant / totals[:, None] * 100, np.nan)
+    return _window_changes(shares, bounds).T
+
+
+def _run_task(task: tuple) -> np.ndarray:
+    """Run one batch in a worker process."""
+    name, seed, size, args = task
+    return globals()[name](_worker_resampler, seed, size, *args)
+
+
+def _run_batches(
+    resampler: PolicyResampler,
+    batch_name: str,
+    args: tuple,
+    n_total: int,
+    seed: int,
+    n_jobs: Optional[int],
+    batch_size: int
+) -> np.ndarray:
+    """
+    Run ``n_total`` replicates in seeded batches, optionally in parallel.
+
+    Returns:
+        Replicates stacked in batch order, shape (n_total, n_windows)
+    """
+    sizes = [batch_size] * (n_total // batch_size)
+    if n_total % batch_size:
+        sizes.append(n_total % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(batch_name, s, size, args) for s, size in zip(seeds, sizes)]
+
+    if n_jobs == 1:
+        _init_worker(resampler)
+        return np.concatenate([_run_task(task) for task in tasks])
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(resampler,)) as pool:
+        return np.concatenate(list(pool.map(_run_task, tasks)))
@@ -0,0 +1,212 @@
+"""
+Similar-trajectory search over every name's popularity curve.
+
+Each name becomes one row of a dense names x years matrix of yearly birth
+shares (from a ``TrajectoryStore``), optionally restricted to a year range,
+e.g. 1965-2014 for "names that rose like Santiago after 1965". Rows are
+normalized once at build time, so cosine similarity or Pearson correlation
+to every name is a single matrix-vector product:
+
+* cosine: rows scaled to unit length;
+* correlation: rows centered, then scaled to unit length.
+
+With ``n_components`` the rows are projected on their top singular vectors
+first (truncated SVD), which shrinks the matrix and smooths year-to-year
+noise. A top-k query is one product plus ``argpartition``; batch queries
+are chunked matrix products.
+
+Example:
+    store = TrajectoryStore.from_babynames('data/babynames.csv')
+    index = TrajectoryIndex.from_store(store, year_range=(1965, 2014))
+    index.query('Santiago', k=20)
+    index.query_batch(mapping['Name'], k=10)
+"""
+import pandas as pd
+import numpy as np
+from typing import Iterable, Optional, Tuple
+
+from .topn import top_n_indices
+from .trajectories import TrajectoryStore
+
+METRICS = ('correlation', 'cosine')
+
+
+class TrajectoryIndex:
+    """
+    Normalized per-name share curves, ready for top-k similarity queries.
+    """
+
+    def __init__(
+        self,
+        names: pd.Index,
+        vectors: np.ndarray,
+        metric: str = 'correlation',
+        years: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            names: Indexed names (row order of ``vectors``)
+            vectors: Unit-length rows; dot products are the similarities
+            metric: 'correlation' or 'cosine' (how the rows were normalized)
+            years: Years covered by the curves
+        """
+        self.names = names
+        self.vectors = vectors
+        self.metric = metric
+        self.years = years
+
+    @classmethod
+    def from_store(
+        cls,
+        store: TrajectoryStore,
+        gender: Optional[str] = None,
+        year_range: Optional[Tuple[int, int]] = None,
+        metric: str = 'correlation',
+        n_components: Optional[int] = None,
+        min_births: int = 1,
+        dtype: type = np.float32
+    ) -> 'TrajectoryIndex':
+        """
+        Build an index from a trajectory store.
+
+        Args:
+            store: TrajectoryStore
+            gender: Gender code, or None for all births
+            year_range: Optional inclusive (start_year, end_year) to compare
+            metric: 'correlation' (shape of the curve) or 'cosine'
+            n_components: Keep this many SVD components (None = all years)
+            min_births: Leave out names with fewer births in the range
+            dtype: Float type of the vectors (float32 halves memory)
+
+        Returns:
+            TrajectoryIndex
+        """
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}")
+
+        shares = store.shares(gender)
+        counts = store.counts(gender)
+        rows = np.arange(len(store.years))
+        if year_range is not None:
+            rows = rows[(store.years >= year_range[0]) & (store.years <= year_range[1])]
+            shares, counts = shares.tocsr()[rows], counts.tocsr()[rows]
+
+        births = np.asarray(counts.sum(axis=0)).ravel()
+        keep = np.flatnonzero(births >= max(min_births, 1))
+        # Names x years, dense: the year axis is short
+        vectors = shares.tocsc()[:, keep].T.toarray().astype(dtype)
+
+        if metric == 'correlation':
+            vectors -= vectors.mean(axis=1, keepdims=True)
+        if n_components is not None and n_components < vectors.shape[1]:
+            # Right singular vectors of names x years are the eigenvectors of
+            # the years x years Gram matrix: no SVD of the tall matrix
+            gram = (vectors.T @ vectors).astype(np.float64)
+            _, eigenvectors = np.linalg.eigh(gram)
+            # eigh sorts eigenvalues ascending
+            top = eigenvectors[:, ::-1][:, :n_components]
+            vectors = vectors @ top.astype(dtype)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        # Flat curves (constant share) have no direction: they stay zero
+        # and match nothing
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+        return cls(store.names[keep], vectors, metric, store.years[rows])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _rows(self, names: Iterable[str]) -> np.ndarray:
+        """Row positions of names, with a KeyError listing unknown ones."""
+        names = list(names)
+        rows = self.names.get_indexer(names)
+        if (rows < 0).any():
+            missing = [name for name, row in zip(names, rows) if row < 0]
+            raise KeyError(f"Names not in the index (no births in range?): {missing[:10]}")
+        return rows
+
+    def similarities(self, name: str) -> pd.Series:
+        """
+        Similarity of one name to every indexed name.
+
+        Returns:
+            Series indexed by name
+        """
+        row = self._rows([name])[0]
+        return pd.Series(self.vectors @ self.vectors[row], index=self.names, name=name)
+
+    def query(self, name: str, k: int = 10, include_self: bool = False) -> pd.DataFrame:
+        """
+        The k names whose curves are most similar to ``name``'s.
+
+        Args:
+            name: Query name
+            k: Number of results
+            include_self: Keep the query name in the results
+
+        Returns:
+            DataFrame with Name and Similarity, most similar first
+        """
+        row = self._rows([name])[0]
+        sims = self.vectors @ self.vectors[row]
+        if not include_self:
+            sims[row] = -np.inf
+        top = _top_k(sims, k)
+        return pd.DataFrame({
+            'Name': self.names.take(top).to_numpy(),
+            'Similarity': sims[top].astype(np.float64)
+        })
+
+    def query_batch(
+        self,
+        names: Iterable[str],
+        k: int = 10,
+        include_self: bool = False,
+        batch_size: int = 256
+    ) -> pd.DataFrame:
+        """
+        Top-k similar names for many query names at once.
+
+        Queries are processed ``batch_size`` at a time, each batch as one
+        (batch x dims) @ (dims x names) product, so memory stays bounded at
+        ``batch_size x len(index)`` similarities.
+
+        Args:
+            names: Query names (e.g. every name of the origin mapping)
+            k: Results per query
+            include_self: Keep each query name in its own results
+            batch_size: Queries per matrix product
+
+        Returns:
+            DataFrame with Query, Rank, Name and Similarity
+        """
+        names = list(names)
+        rows = self._rows(names)
+
+        queries, ranks, results, scores = [], [], [], []
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            sims = self.vectors[batch] @ self.vectors.T
+            if not include_self:
+                sims[np.arange(len(batch)), batch] = -np.inf
+            for i in range(len(batch)):
+                top = _top_k(sims[i], k)
+                queries.append(np.full(len(top), start + i))
+                ranks.append(np.arange(1, len(top) + 1))
+                results.append(top)
+                scores.append(sims[i, top])
+
+        if not results:
+            return pd.DataFrame(columns=['Query', 'Rank', 'Name', 'Similarity'])
+        return pd.DataFrame({
+            'Query': np.asarray(names, dtype=object)[np.concatenate(queries)],
+            'Rank': np.concatenate(ranks),
+            'Name': self.names.take(np.concatenate(results)).to_numpy(),
+            'Similarity': np.concatenate(scores).astype(np.float64)
+        })
+
+
+def _top_k(sims: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest similarities, skipping excluded (-inf) entries."""
+    top = top_n_indices(sims, min(k + 1, len(sims)))
+    return top[np.isfinite(sims[top])][:k]
@@ -0,0 +1,213 @@
+"""
+Streaming aggregation for datasets larger than memory.
+
+``StreamingAggregator`` folds chunks (from ``load_data.iter_babynames_chunks``)
+into fixed-size accumulators and reproduces the outputs of
+``calculate_yearly_shares``, ``calculate_name_diversity``, ``get_top_names``
+and ``get_data_summary`` without ever holding the full dataset. Memory is
+bounded by the chunk size plus the accumulators, which scale with
+years x distinct names rather than with the number of rows.
+"""
+import pandas as pd
+import numpy as np
+from typing import Iterable, Optional
+
+from .compute_trends import shares_from_matrix
+from .encoding import Vocabulary, get_codes
+from .load_data import build_origin_lookup
+from .topn import top_n_indices
+
+
+class StreamingAggregator:
+    """
+    Incremental accumulators for the core trend outputs.
+
+    Example:
+        agg = StreamingAggregator(load_name_mapping())
+        for chunk in iter_babynames_chunks('data/namesbystate/*.TXT', header=None,
+                                           names=['State', 'Gender', 'Year', 'Name', 'Count']):
+            agg.update(chunk)
+        shares = agg.yearly_shares()
+    """
+
+    def __init__(self, mapping_df: Optional[pd.DataFrame] = None):
+        """
+        Args:
+            mapping_df: Name-origin mapping for ``yearly_shares`` (optional)
+        """
+        self.mapping = mapping_df
+        self._names = Vocabulary()
+        self._genders = Vocabulary()
+        self.regions = pd.Index(['Other'])
+        self._lookup = np.zeros(1, dtype=np.int8)
+
+        self.total_records = 0
+        self.first_year: Optional[int] = None
+        # Per-year accumulators, indexed by year - first_year
+        self._region_counts = np.zeros((0, 0), dtype=np.int64)
+        self._region_rows = np.zeros((0, 0), dtype=np.int64)
+        # Which names occur in which year (years x name capacity)
+        self._seen = np.zeros((0, 0), dtype=bool)
+        # Births per (name id, gender)
+        self._name_totals = np.zeros((0, 0), dtype=np.int64)
+        self._name_rows = np.zeros((0, 0), dtype=np.int64)
+
+    def update(self, chunk: pd.DataFrame) -> 'StreamingAggregator':
+        """
+        Fold one chunk into the accumulators.
+
+        Args:
+            chunk: DataFrame with Year, Name, Gender and Count columns
+
+        Returns:
+            self, for chaining
+        """
+        if len(chunk) == 0:
+            return self
+        name_codes, names = get_codes(chunk['Name'])
+        gender_codes, genders = get_codes(chunk['Gender'])
+        name_ids = self._names.extend(names)[name_codes]
+        gender_ids = self._genders.extend(genders)[gender_codes]
+        years = chunk['Year'].to_numpy().astype(np.int64)
+        counts = chunk['Count'].to_numpy()
+        self._grow(int(years.min()), int(years.max()))
+
+        year_offsets = years - self.first_year
+        valid = (name_ids >= 0) & (gender_ids >= 0)
+
+        # Year x region counts; missing names (-1) hit the lookup's default slot
+        n_cols = len(self.regions) + 1
+        region_codes = self._lookup[name_ids]
+        cells = year_offsets * n_cols + region_codes
+        size = self._region_counts.size
+        self._region_counts += np.bincount(
+            cells, weights=counts, minlength=size
+        ).astype(np.int64).reshape(self._region_counts.shape)
+        self._region_rows += np.bincount(cells, minlength=size).reshape(self._region_rows.shape)
+
+        # Distinct names per year
+        self._seen[year_offsets[valid], name_ids[valid]] = True
+
+        # Name x gender totals
+        n_genders = self._name_totals.shape[1]
+        keys = name_ids[valid].astype(np.int64) * n_genders + gender_ids[valid]
+        size = self._name_totals.size
+        self._name_totals += np.bincount(
+            keys, weights=counts[valid], minlength=size
+        ).astype(np.int64).reshape(self._name_totals.shape)
+        self._name_rows += np.bincount(keys, minlength=size).reshape(self._name_rows.shape)
+
+        self.total_records += len(chunk)
+        return self
+
+    def update_all(self, chunks: Iterable[pd.DataFrame]) -> 'StreamingAggregator':
+        """
+        Fold every chunk of an iterator into the accumulators.
+
+        Args:
+            chunks: Iterable of DataFrames (e.g. ``iter_babynames_chunks(...)``)
+
+        Returns:
+            self, for chaining
+        """
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    # ------------------------------------------------------------------
+    # Outputs
+    # ------------------------------------------------------------------
+
+    def yearly_shares(self) -> pd.DataFrame:
+        """Same output as ``calculate_yearly_shares`` on the merged data."""
+        years = np.arange(len(self._region_counts), dtype=np.int16) + self.first_year
+        present = self._region_rows > 0
+        return shares_from_matrix(years, self.regions, self._region_counts, present)
+
+    def name_diversity(self) -> pd.DataFrame:
+        """Same output as ``calculate_name_diversity``."""
+        observed = np.flatnonzero(self._region_rows.sum(axis=1))
+        diversity = pd.DataFrame({
+            'Year': (observed + self.first_year).astype(np.int16),
+            'Unique_Names': self._seen[observed].sum(axis=1),
+            'Total_Births': self._region_counts[observed].sum(axis=1)
+        })
+        diversity['Names_Per_1000_Births'] = (
+            diversity['Unique_Names'] / diversity['Total_Births'] * 1000
+        )
+        return diversity
+
+    def top_names(self, n: int = 1000, by_gender: bool = False) -> pd.DataFrame:
+        """Same output as ``get_top_names``."""
+        names = self._names.values
+        totals = self._name_totals[:len(names)]
+        present = self._name_rows[:len(names)] > 0
+
+        if by_gender:
+            top_names = []
+            for g, gender in enumerate(self._genders.values):
+                top = top_n_indices(totals[:, g], n, present[:, g])
+                top_names.append(pd.DataFrame({
+                    'Name': names.take(top).to_numpy(),
+                    'Total_Count': totals[top, g],
+                    'Gender': gender
+                }))
+            return pd.concat(top_names, ignore_index=True)
+
+        top = top_n_indices(totals.sum(axis=1), n, present.any(axis=1))
+        return pd.DataFrame({
+            'Name': names.take(top).to_numpy(),
+            'Total_Count': totals.sum(axis=1)[top]
+        })
+
+    def summary(self) -> dict:
+        """Same output as ``get_data_summary``."""
+        observed = np.flatnonzero(self._region_rows.sum(axis=1)) + (self.first_year or 0)
+        return {
+            'total_records': self.total_records,
+            'total_births': self._region_counts.sum(),
+            'unique_names': int(self._seen.any(axis=0).sum()),
+            # NaN bounds without rows, as min()/max() of an empty column
+            'year_range': (observed.min(), observed.max()) if len(observed) else (np.nan, np.nan),
+            'years_covered': len(observed)
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _grow(self, min_year: int, max_year: int) -> None:
+        """Resize accumulators for new years, names, genders or regions."""
+        if self.first_year is None:
+            self.first_year = min_year
+        last_year = max(self.first_year + len(self._region_counts) - 1, max_year)
+        new_first_year = min(self.first_year, min_year)
+        front = self.first_year - new_first_year
+        n_years = last_year - new_first_year + 1
+        self.first_year = new_first_year
+
+        n_names, n_genders = len(self._names), len(self._genders)
+        if self.mapping is not None and len(self._lookup) != n_names + 1:
+            self._lookup, self.regions = build_origin_lookup(self._names.values, self.mapping)
+        elif self.mapping is None:
+            self._lookup = np.zeros(n_names + 1, dtype=np.int8)
+
+        # Grow name capacity geometrically so resizes stay rare
+        name_capacity = self._seen.shape[1]
+        if n_names > name_capacity:
+            name_capacity = max(n_names, 2 * name_capacity)
+
+        self._region_counts = _pad(self._region_counts, front, n_years, len(self.regions) + 1)
+        self._region_rows = _pad(self._region_rows, front, n_years, len(self.regions) + 1)
+        self._seen = _pad(self._seen, front, n_years, name_capacity)
+        self._name_totals = _pad(self._name_totals, 0, name_capacity, n_genders)
+        self._name_rows = _pad(self._name_rows, 0, name_capacity, n_genders)
+
+
+def _pad(values: np.ndarray, front: int, n_rows: int, n_cols: int) -> np.ndarray:
+    """Zero-pad a 2-D accumulator to (n_rows, n_cols), shifting it down by ``front`` rows."""
+    if front == 0 and values.shape == (n_rows, n_cols):
+        return values
+    padded = np.zeros((n_rows, n_cols), dtype=values.dtype)
+    padded[front:front + values.shape[0], :values.shape[1]] = values
+    return padded
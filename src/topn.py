@@ -0,0 +1,227 @@
+"""
+Top-N selection over aggregated counts.
+
+Exact top-N uses ``np.argpartition`` on aggregated totals instead of a full
+sort. For chunked or partitioned input, ``HeavyHitters`` is a mergeable
+Misra-Gries summary that keeps a bounded number of counters and reports
+its error bound.
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, Optional, Tuple
+
+from .encoding import get_codes
+
+
+def top_n_indices(
+    values: np.ndarray,
+    n: int,
+    mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Indices of the ``n`` largest values, largest first.
+
+    Selection uses ``argpartition`` (linear time) and only the selected
+    entries are sorted. Ties are broken by index, so the result matches a
+    stable descending sort.
+
+    Args:
+        values: 1-D array of totals
+        n: Number of entries to return
+        mask: Optional boolean array; only True entries are eligible
+
+    Returns:
+        Array of at most ``n`` indices
+    """
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    ids = np.flatnonzero(mask) if mask is not None else np.arange(len(values))
+    candidates = values[ids]
+
+    if n < len(ids):
+        threshold = candidates[np.argpartition(-candidates, n - 1)[n - 1]]
+        above = np.flatnonzero(candidates > threshold)
+        # Lowest indices win among ties at the cut-off
+        ties = np.flatnonzero(candidates == threshold)[:n - len(above)]
+        keep = np.concatenate([above, ties])
+        ids, candidates = ids[keep], candidates[keep]
+
+    return ids[np.lexsort((ids, -candidates))]
+
+
+def windowed_totals(
+    years: np.ndarray,
+    keys: np.ndarray,
+    weights: np.ndarray,
+    n_keys: int,
+    windows: Iterable[Tuple[int, int]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Totals per key for several (possibly overlapping) year windows in one pass.
+
+    The window boundaries split the years into elementary intervals; rows
+    are binned once by (interval, key) and each window's totals are the sum
+    of the intervals it covers.
+
+    Args:
+        years: Year of each row
+        keys: Integer key of each row (-1 = skip)
+        weights: Weight (count) of each row
+        n_keys: Number of distinct keys
+        windows: Inclusive (start_year, end_year) pairs
+
+    Returns:
+        Tuple of (totals, present), each of shape (n_windows, n_keys)
+    """
+    windows = list(windows)
+    edges = np.unique([b for start, end in windows for b in (start, end + 1)])
+    # Interval i covers [edges[i-1], edges[i]); 0 and len(edges) are outside all windows
+    interval = np.searchsorted(edges, years, side='right')
+    n_intervals = len(edges) + 1
+
+    valid = keys >= 0
+    cells = interval[valid].astype(np.int64) * n_keys + keys[valid]
+    size = n_intervals * n_keys
+    by_interval = np.bincount(cells, weights=weights[valid], minlength=size).reshape(n_intervals, n_keys)
+    rows_by_interval = np.bincount(cells, minlength=size).reshape(n_intervals, n_keys)
+
+    totals = np.zeros((len(windows), n_keys), dtype=np.int64)
+    present = np.zeros((len(windows), n_keys), dtype=bool)
+    for w, (start, end) in enumerate(windows):
+        first = np.searchsorted(edges, start, side='right')
+        last = np.searchsorted(edges, end + 1, side='right')
+        totals[w] = by_interval[first:last].sum(axis=0)
+        present[w] = rows_by_interval[first:last].sum(axis=0) > 0
+    return totals, present
+
+
+class HeavyHitters:
+    """
+    Mergeable heavy-hitters summary (Misra-Gries) over weighted keys.
+
+    Keeps at most ``capacity`` counters. Each stored count is a lower bound
+    on the true total and undercounts by at most ``error_bound``, so every
+    key whose total exceeds ``error_bound`` is guaranteed to be tracked.
+    Summaries built on separate chunks or partitions can be merged with the
+    same guarantee.
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        """
+        Args:
+            capacity: Maximum number of counters kept
+        """
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.total = 0
+
+    @property
+    def error_bound(self) -> float:
+        """Maximum amount by which any stored count undercounts."""
+        return (self.total - self.counts.sum()) / (self.capacity + 1)
+
+    def update(self, keys: pd.Series, weights: pd.Series) -> 'HeavyHitters':
+        """
+        Add a batch of weighted keys (e.g. a chunk's Name and Count).
+
+        Args:
+            keys: Key of each row
+            weights: Weight of each row
+
+        Returns:
+            self, for chaining
+        """
+        # Aggregate the batch on integer codes, decoding only distinct keys
+        codes, categories = get_codes(pd.Series(keys))
+        valid = codes >= 0
+        sums = np.bincount(codes[valid], weights=np.asarray(weights)[valid], minlength=len(categories))
+        seen = np.flatnonzero(np.bincount(codes[valid], minlength=len(categories)))
+        batch = pd.Series(sums[seen].astype(np.int64), index=categories[seen])
+        self.total += int(batch.sum())
+        self._absorb(batch)
+        return self
+
+    def merge(self, other: 'HeavyHitters') -> 'HeavyHitters':
+        """
+        Merge another summary into this one.
+
+        Args:
+            other: Summary built on a disjoint part of the data
+
+        Returns:
+            self, for chaining
+        """
+        self.total += other.total
+        self._absorb(other.counts)
+        return self
+
+    def top(self, n: int) -> pd.DataFrame:
+        """
+        Estimated top ``n`` keys.
+
+        Args:
+            n: Number of keys to return
+
+        Returns:
+            DataFrame with Name and Total_Count (lower-bound estimates)
+        """
+        top = top_n_indices(self.counts.to_numpy(), n)
+        return pd.DataFrame({
+            'Name': self.counts.index.to_numpy()[top],
+            'Total_Count': self.counts.to_numpy()[top]
+        })
+
+    def _absorb(self, counts: pd.Series) -> None:
+        """Add counters and shrink back to capacity."""
+        combined = self.counts.add(counts, fill_value=0).astype(np.int64)
+        if len(combined) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from every counter
+            values = combined.to_numpy()
+            cutoff = np.partition(values, len(values) - self.capacity - 1)[
+                len(values) - self.capacity - 1
+            ]
+            combined = combined - cutoff
+            combined = combined[combined > 0]
+        self.counts = combined
+
+
+def approximate_top_names(
+    chunks: Iterable[pd.DataFrame],
+    n: int = 1000,
+    capacity: Optional[int] = None,
+    by_gender: bool = False
+) -> pd.DataFrame:
+    """
+    Approximate ``get_top_names`` over a stream of chunks.
+
+    Args:
+        chunks: Iterable of DataFrames (e.g. ``iter_babynames_chunks(...)``)
+        n: Number of top names to return
+        capacity: Counters kept per summary (default: ``10 * n``)
+        by_gender: If True, get top N for each gender separately
+
+    Returns:
+        DataFrame with Name, Total_Count (lower-bound estimates) and, with
+        ``by_gender``, Gender
+    """
+    capacity = capacity or 10 * n
+    sketches: Dict[str, HeavyHitters] = {}
+    for chunk in chunks:
+        if not by_gender:
+            if None not in sketches:
+                sketches[None] = HeavyHitters(capacity)
+            sketches[None].update(chunk['Name'], chunk['Count'])
+            continue
+        # Aggregate the chunk once, then route the small result per gender
+        totals = chunk.groupby(['Gender', 'Name'], observed=True)['Count'].sum()
+        for gender, gender_totals in totals.groupby(level=0, observed=True):
+            if gender not in sketches:
+                sketches[gender] = HeavyHitters(capacity)
+            sketches[gender].update(gender_totals.index.get_level_values(1), gender_totals)
+
+    if not by_gender:
+        return sketches[None].top(n)
+    return pd.concat(
+        [sketch.top(n).assign(Gender=gender) for gender, sketch in sketches.items()],
+        ignore_index=True
+    )
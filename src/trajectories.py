@@ -0,0 +1,371 @@
+"""
+Per-name trajectories as sparse years x names count matrices.
+
+Per-name questions (popularity curves, peaks, first appearance) on the
+long-format frame mean filtering all 1.8M rows each time. ``TrajectoryStore``
+aggregates the frame once into one CSC matrix per gender (rows = every year
+from first to last, columns = the Name dictionary), so:
+
+* one name's series is a single column slice, O(years);
+* whole-vocabulary operations (shares of yearly births, peak years, first
+  years, per-year ranks) are array operations over the non-zero cells.
+
+The store persists as plain ``.npy`` arrays (data/indices/indptr per gender)
+that are memory-mapped on load.
+
+Example:
+    store = TrajectoryStore.from_babynames('data/babynames.csv')
+    store.series('Mary', normalize=True)
+    store.peak_years()
+"""
+import json
+import os
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from scipy import sparse
+from typing import Dict, List, Optional
+
+from .encoding import get_codes
+from .load_data import (
+    _save_array,
+    _source_fingerprint,
+    _source_unchanged,
+    get_cache_path,
+    load_babynames
+)
+
+# Bump when the on-disk layout changes so stale stores are rebuilt
+TRAJECTORY_VERSION = 1
+
+
+class TrajectoryStore:
+    """
+    Years x names birth counts, one CSC matrix per gender.
+
+    Layout of a saved store::
+
+        manifest.json                years, genders, shape, source fingerprint
+        names.npy                    name dictionary (column order)
+        <gender>.data.npy            CSC arrays of that gender's counts
+        <gender>.indices.npy
+        <gender>.indptr.npy
+    """
+
+    def __init__(
+        self,
+        years: np.ndarray,
+        names: pd.Index,
+        counts: Dict[str, sparse.csc_matrix]
+    ):
+        """
+        Args:
+            years: Every year from first to last (the matrix rows)
+            names: Name dictionary (the matrix columns)
+            counts: {gender: CSC matrix of shape (len(years), len(names))}
+        """
+        self.years = years
+        self.names = names
+        self.genders = list(counts)
+        self._counts = counts
+        self._combined: Optional[sparse.csc_matrix] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'TrajectoryStore':
+        """
+        Aggregate a baby names frame (Year, Name, Gender, Count).
+
+        Args:
+            df: Baby names DataFrame, e.g. from ``load_babynames``
+
+        Returns:
+            TrajectoryStore
+        """
+        name_codes, names = get_codes(df['Name'])
+        gender_codes, genders = get_codes(df['Gender'])
+        year_values = df['Year'].to_numpy()
+        first_year = year_values.min() if len(year_values) else 0
+        year_offsets = (year_values - first_year).astype(np.int64)
+        n_years = int(year_offsets.max()) + 1 if len(year_values) else 0
+        values = df['Count'].to_numpy()
+
+        valid = name_codes >= 0
+        counts = {}
+        for g, gender in enumerate(genders):
+            rows = valid & (gender_codes == g)
+            # Duplicate (year, name) cells are summed by the conversion
+            matrix = sparse.coo_matrix(
+                (values[rows], (year_offsets[rows], name_codes[rows])),
+                shape=(n_years, len(names))
+            ).tocsc()
+            matrix.sum_duplicates()
+            counts[str(gender)] = matrix
+        years = np.arange(n_years, dtype=year_values.dtype) + first_year
+        return cls(years, names, counts)
+
+    @classmethod
+    def from_babynames(
+        cls,
+        data_path: str = '../data/babynames.csv',
+        cache_dir: Optional[str] = None,
+        rebuild: bool = False
+    ) -> 'TrajectoryStore':
+        """
+        Open the store of a baby names CSV, building it on first use.
+
+        The store lives in the loader's cache directory (``trajectories/``)
+        and is rebuilt when the CSV changes.
+
+        Args:
+            data_path: Path to the baby names CSV file
+            cache_dir: Cache root, as for ``load_babynames``
+            rebuild: Rebuild even if a fresh store exists
+
+        Returns:
+            TrajectoryStore with memory-mapped matrices
+        """
+        store_path = get_cache_path(data_path, cache_dir) / 'trajectories'
+        if not rebuild:
+            store = cls.load(store_path, data_path)
+            if store is not None:
+                return store
+        df = load_babynames(data_path, cache_dir=cache_dir, columns=['Year', 'Name', 'Gender', 'Count'])
+        cls.from_frame(df).save(store_path, data_path)
+        return cls.load(store_path)
+
+    def save(self, path: str, data_path: Optional[str] = None) -> None:
+        """
+        Write the store as ``.npy`` arrays plus a manifest.
+
+        Args:
+            path: Store directory
+            data_path: Source CSV, recorded so ``load`` can detect changes
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        manifest_path = path / 'manifest.json'
+        if manifest_path.exists():
+            manifest_path.unlink()
+
+        _save_array(path / 'names.npy', np.asarray(self.names, dtype=str))
+        for gender, matrix in self._counts.items():
+            for part in ('data', 'indices', 'indptr'):
+                _save_array(path / f"{gender}.{part}.npy", getattr(matrix, part))
+
+        manifest = {
+            'version': TRAJECTORY_VERSION,
+            'first_year': int(self.years[0]) if len(self.years) else 0,
+            'year_dtype': self.years.dtype.str,
+            'shape': [len(self.years), len(self.names)],
+            'genders': self.genders,
+            'source': _source_fingerprint(data_path) if data_path is not None else None
+        }
+        tmp_path = manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    @classmethod
+    def load(cls, path: str, data_path: Optional[str] = None) -> Optional['TrajectoryStore']:
+        """
+        Memory-map a saved store.
+
+        Args:
+            path: Store directory
+            data_path: If given, return None when this CSV has changed
+                since the store was built
+
+        Returns:
+            TrajectoryStore, or None if missing, outdated or stale
+        """
+        path = Path(path)
+        try:
+            with open(path / 'manifest.json') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != TRAJECTORY_VERSION:
+                return None
+            if data_path is not None and (
+                manifest['source'] is None or not _source_unchanged(manifest['source'], data_path)
+            ):
+                return None
+
+            shape = tuple(manifest['shape'])
+            counts = {}
+            for gender in manifest['genders']:
+                arrays = [
+                    np.load(path / f"{gender}.{part}.npy", mmap_mode='r')
+                    for part in ('data', 'indices', 'indptr')
+                ]
+                # Built from canonical arrays, so scipy keeps the memory maps
+                counts[gender] = sparse.csc_matrix(tuple(arrays), shape=shape)
+            names = pd.Index(np.load(path / 'names.npy').astype(object))
+        except (OSError, ValueError, KeyError):
+            return None
+
+        years = (np.arange(shape[0]) + manifest['first_year']).astype(manifest['year_dtype'])
+        return cls(years, names, counts)
+
+    # ------------------------------------------------------------------
+    # Matrices
+    # ------------------------------------------------------------------
+
+    def counts(self, gender: Optional[str] = None) -> sparse.csc_matrix:
+        """
+        Years x names births of one gender, or of all genders combined.
+
+        Args:
+            gender: Gender code (e.g. 'F'), or None for all
+
+        Returns:
+            CSC matrix of shape (len(years), len(names))
+        """
+        if gender is not None:
+            if gender not in self._counts:
+                raise KeyError(f"Unknown gender {gender!r}; store has {self.genders}")
+            return self._counts[gender]
+        if self._combined is None:
+            if not self.genders:
+                # Store of an empty frame
+                combined = sparse.csc_matrix((len(self.years), len(self.names)), dtype=np.int64)
+            else:
+                combined = self._counts[self.genders[0]].copy()
+            for other in self.genders[1:]:
+                combined = combined + self._counts[other]
+            self._combined = combined.tocsc()
+        return self._combined
+
+    def year_totals(self, gender: Optional[str] = None) -> np.ndarray:
+        """Births per year (over all names)."""
+        return np.asarray(self.counts(gender).sum(axis=1), dtype=np.int64).ravel()
+
+    def name_totals(self, gender: Optional[str] = None) -> pd.Series:
+        """Births per name over all years."""
+        totals = np.asarray(self.counts(gender).sum(axis=0), dtype=np.int64).ravel()
+        return pd.Series(totals, index=pd.Index(self.names, name='Name'), name='Total_Count')
+
+    def shares(self, gender: Optional[str] = None) -> sparse.csc_matrix:
+        """
+        Each cell as a fraction of that year's births.
+
+        Args:
+            gender: Gender code, or None for all
+
+        Returns:
+            CSC matrix of float shares (years without births stay zero)
+        """
+        totals = self.year_totals(gender).astype(np.float64)
+        scale = np.divide(1.0, totals, out=np.zeros_like(totals), where=totals > 0)
+        return sparse.diags(scale) @ self.counts(gender).astype(np.float64)
+
+    # ------------------------------------------------------------------
+    # Per-name series
+    # ------------------------------------------------------------------
+
+    def series(
+        self,
+        name: str,
+        gender: Optional[str] = None,
+        normalize: bool = False
+    ) -> pd.Series:
+        """
+        One name's births per year, in O(years).
+
+        Args:
+            name: Name to fetch
+            gender: Gender code, or None for all
+            normalize: Return shares of yearly births instead of counts
+
+        Returns:
+            Series indexed by Year (zeros in years without the name)
+        """
+        try:
+            j = self.names.get_loc(name)
+        except KeyError:
+            raise KeyError(f"Unknown name {name!r}") from None
+        matrix = self.counts(gender)
+        lo, hi = matrix.indptr[j], matrix.indptr[j + 1]
+        values = np.zeros(len(self.years), dtype=np.float64 if normalize else np.int64)
+        values[matrix.indices[lo:hi]] = matrix.data[lo:hi]
+        if normalize:
+            totals = self.year_totals(gender)
+            values = np.divide(values, totals, out=np.zeros_like(values), where=totals > 0)
+        return pd.Series(values, index=pd.Index(self.years, name='Year'), name=name)
+
+    def frame(
+        self,
+        names: List[str],
+        gender: Optional[str] = None,
+        normalize: bool = False
+    ) -> pd.DataFrame:
+        """Several names' series side by side (Year x name)."""
+        return pd.concat([self.series(name, gender, normalize) for name in names], axis=1)
+
+    # ------------------------------------------------------------------
+    # Whole-vocabulary statistics
+    # ------------------------------------------------------------------
+
+    def peak_years(self, gender: Optional[str] = None, normalize: bool = True) -> pd.Series:
+        """
+        Year in which each name was most popular.
+
+        Args:
+            gender: Gender code, or None for all
+            normalize: Compare shares of yearly births (default) rather
+                than raw counts, which favour later, larger years
+
+        Returns:
+            Series of peak years indexed by name (names with births only;
+            ties go to the earliest year)
+        """
+        matrix = self.shares(gender).tocsc() if normalize else self.counts(gender)
+        return self._first_per_name(matrix, lambda data, indices: (indices, -data))
+
+    def first_years(self, gender: Optional[str] = None) -> pd.Series:
+        """
+        First year each name appears.
+
+        Returns:
+            Series of years indexed by name (names with births only)
+        """
+        return self._first_per_name(self.counts(gender), lambda data, indices: (indices,))
+
+    def _first_per_name(self, matrix: sparse.csc_matrix, sort_keys) -> pd.Series:
+        """Year of the first cell per column under ``np.lexsort(sort_keys + (column,))``."""
+        matrix = matrix.copy()
+        matrix.eliminate_zeros()
+        lengths = np.diff(matrix.indptr)
+        columns = np.repeat(np.arange(len(self.names)), lengths)
+        order = np.lexsort(sort_keys(matrix.data, matrix.indices) + (columns,))
+        nonempty = lengths > 0
+        rows = matrix.indices[order][matrix.indptr[:-1][nonempty]]
+        return pd.Series(
+            self.years[rows], index=pd.Index(self.names[nonempty], name='Name'), name='Year'
+        )
+
+    def ranks(self, gender: Optional[str] = None) -> sparse.csr_matrix:
+        """
+        Popularity rank of every name in every year it appears.
+
+        Rank 1 is the most births that year; tied names share the best
+        rank (as ``rank(method='min', ascending=False)``).
+
+        Args:
+            gender: Gender code, or None for all
+
+        Returns:
+            CSR matrix of ranks with the sparsity pattern of ``counts``
+        """
+        matrix = self.counts(gender).tocsr()
+        matrix.eliminate_zeros()
+        rows = np.repeat(np.arange(len(self.years)), np.diff(matrix.indptr))
+        order = np.lexsort((-matrix.data, rows))
+        data, rows = matrix.data[order], rows[order]
+
+        positions = np.arange(len(data))
+        run_start = np.ones(len(data), dtype=bool)
+        run_start[1:] = (rows[1:] != rows[:-1]) | (data[1:] != data[:-1])
+        tie_start = np.maximum.accumulate(np.where(run_start, positions, 0))
+        ranks = np.empty(len(data), dtype=np.int64)
+        ranks[order] = tie_start - matrix.indptr[rows] + 1
+        return sparse.csr_matrix((ranks, matrix.indices, matrix.indptr), shape=matrix.shape)
+
@@ -2,98 +2,254 @@
 Utility functions for baby names analysis.
 """
 import pandas as pd
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+from .classify import classify_names, get_default_classifier
+from .encoding import decode, get_codes, get_name_gender_codes
+from .instrument import traced
+from .topn import top_n_indices, windowed_totals
 
 
 def classify_name_origin(name: str) -> str:
     """
     Classify a name into an origin region using rule-based approach.
     
+    For many names use ``classify.classify_names``, which classifies a
+    whole column in a few vectorized lookups.
+    
     Args:
         name: The name to classify
         
     Returns:
         Origin region string
     """
-    # Define name patterns
-    latin_names = {
-        'Jose', 'Juan', 'Luis', 'Carlos', 'Jesus', 'Miguel', 'Antonio',
-        'Francisco', 'Pedro', 'Jorge', 'Manuel', 'Maria', 'Carmen', 'Rosa',
-        'Ana', 'Sofia', 'Isabella', 'Camila', 'Valentina', 'Diego', 'Santiago'
-    }
-    
-    asian_names = {
-        'Ming', 'Wei', 'Li', 'Chen', 'Yuki', 'Hiroshi', 'Kim', 'Park',
-        'Nguyen', 'Priya', 'Raj', 'Arjun'
-    }
-    
-    african_middle_eastern_names = {
-        'Mohammed', 'Muhammad', 'Ahmad', 'Hassan', 'Omar', 'Ali', 'Ibrahim',
-        'Fatima', 'Aisha', 'Aaliyah', 'Jamal', 'Malik'
-    }
-    
-    irish_italian_names = {
-        'Patrick', 'Sean', 'Connor', 'Liam', 'Ryan', 'Brendan', 'Brian',
-        'Kevin', 'Colleen', 'Kathleen', 'Erin', 'Giovanni', 'Giuseppe',
-        'Antonio', 'Marco', 'Angela', 'Gianna'
-    }
-    
-    # Classify
-    if name in latin_names:
-        return 'Latin'
-    elif name in asian_names:
-        return 'Asian'
-    elif name in african_middle_eastern_names:
-        return 'African_MiddleEastern'
-    elif name in irish_italian_names:
-        return 'Irish_Italian'
-    else:
-        return 'Anglo'
+    return get_default_classifier()(name)
 
 
+@traced
 def get_top_names(
     df: pd.DataFrame,
     n: int = 1000,
-    by_gender: bool = False
+    by_gender: bool = False,
+    windows: Dict[str, Tuple[int, int]] = None
 ) -> pd.DataFrame:
     """
     Get the top N most common names from the dataset.
     
+    Totals are accumulated per integer name id (or packed name/gender id)
+    in a single pass, covering every gender and year window at once; the
+    top N per group is then picked with ``argpartition`` and only the
+    returned names are decoded.
+    
     Args:
         df: Baby names DataFrame
         n: Number of top names to return
         by_gender: If True, get top N for each gender separately
+        windows: Optional {label: (start_year, end_year)}; if given, top N
+            for each window, labelled in a Window column
         
     Returns:
         DataFrame with top names and their total counts
     """
     if by_gender:
-        top_names = []
-        for gender in df['Gender'].unique():
-            gender_df = df[df['Gender'] == gender]
-            top = (
-                gender_df.groupby('Name')['Count']
-                .sum()
-                .sort_values(ascending=False)
-                .head(n)
-                .reset_index()
-            )
-            top['Gender'] = gender
-            top_names.append(top)
-        result = pd.concat(top_names, ignore_index=True)
+        keys, names, genders = get_name_gender_codes(df)
+        gender_codes, _ = get_codes(df['Gender'])
+        # Genders in order of first appearance, as Series.unique() gives
+        gender_order = pd.unique(gender_codes[gender_codes >= 0])
     else:
-        result = (
-            df.groupby('Name')['Count']
-            .sum()
-            .sort_values(ascending=False)
-            .head(n)
-            .reset_index()
+        keys, names = get_codes(df['Name'])
+        genders, gender_order = None, [0]
+    n_genders = len(genders) if by_gender else 1
+    n_keys = len(names) * n_genders
+    counts = df['Count'].to_numpy()
+    
+    if windows is None:
+        labels = [None]
+        valid = keys >= 0
+        totals = np.bincount(keys[valid], weights=counts[valid], minlength=n_keys)[None, :]
+        present = np.bincount(keys[valid], minlength=n_keys)[None, :] > 0
+    else:
+        labels = list(windows)
+        totals, present = windowed_totals(
+            df['Year'].to_numpy(), keys, counts, n_keys, windows.values()
         )
+    totals = totals.astype(np.int64).reshape(len(labels), len(names), n_genders)
+    present = present.reshape(len(labels), len(names), n_genders)
+    
+    top_names = []
+    for w, label in enumerate(labels):
+        for g in gender_order:
+            top = top_n_indices(totals[w, :, g], n, present[w, :, g])
+            top_df = pd.DataFrame({
+                'Name': decode(top, names),
+                'Total_Count': totals[w, top, g]
+            })
+            if by_gender:
+                top_df['Gender'] = genders[g]
+            if label is not None:
+                top_df['Window'] = label
+            top_names.append(top_df)
+    
+    return pd.concat(top_names, ignore_index=True)
+
+
+def _name_gender_totals(
+    df: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray, pd.Index, pd.Index]:
+    """
+    Total births per name and gender in one pass.
+    
+    Args:
+        df: Baby names DataFrame with Name, Gender and Count
+        
+    Returns:
+        Tuple of (totals, present, names, genders) where ``totals`` and
+        ``present`` have shape (n_names, n_genders)
+    """
+    keys, names, genders = get_name_gender_codes(df)
+    valid = keys >= 0
+    size = len(names) * len(genders)
+    counts = df['Count'].to_numpy()[valid]
+    totals = np.bincount(keys[valid], weights=counts, minlength=size)
+    present = np.bincount(keys[valid], minlength=size) > 0
+    shape = (len(names), len(genders))
+    return totals.astype(np.int64).reshape(shape), present.reshape(shape), names, genders
+
+
+@traced
+def get_dominant_gender(
+    df: pd.DataFrame,
+    names: List[str] = None,
+    unknown: str = 'U'
+) -> pd.Series:
+    """
+    Get the gender with the most births for each name.
+    
+    All names are resolved from one Name x Gender aggregation, so the cost
+    does not grow with the number of names requested.
+    
+    Args:
+        df: Baby names DataFrame with Name, Gender and Count
+        names: Names to look up (default: every name in the dataset)
+        unknown: Value for names that do not occur in the dataset
+        
+    Returns:
+        Series of dominant genders indexed by name
+    """
+    totals, present, all_names, genders = _name_gender_totals(df)
+    # Ties go to the first gender, matching groupby().idxmax()
+    dominant = np.where(present, totals, -1).argmax(axis=1)
+    values = np.append(genders.to_numpy()[dominant], unknown)
+    values[:-1][~present.any(axis=1)] = unknown
+    
+    if names is None:
+        return pd.Series(values[:-1], index=pd.Index(all_names, name='Name'), name='Dominant_Gender')
+    
+    # Unknown names get code -1, which picks the trailing `unknown` slot
+    lookup = all_names.get_indexer(names)
+    return pd.Series(values[lookup], index=pd.Index(names, name='Name'), name='Dominant_Gender')
+
+
+class YearIndex:
+    """
+    Row offsets of each year in a frame sorted by Year.
+    
+    ``offsets[i]:offsets[i + 1]`` are the rows of ``years[i]``, so any
+    year range maps to one contiguous row range found by binary search.
+    
+    Example:
+        index = YearIndex.from_frame(df)
+        lo, hi = index.rows(1924, 1964)
+        quota_era = df.iloc[lo:hi]        # zero-copy slice
+    """
+    
+    def __init__(self, year_values: np.ndarray):
+        """
+        Args:
+            year_values: Year column, sorted ascending
+        """
+        starts = np.flatnonzero(np.diff(year_values)) + 1
+        starts = np.concatenate([[0], starts]) if len(year_values) else starts
+        self.years = year_values[starts]
+        self.offsets = np.append(starts, len(year_values))
+    
+    def __len__(self) -> int:
+        return len(self.years)
     
-    result.columns = ['Name', 'Total_Count'] if not by_gender else ['Name', 'Total_Count', 'Gender']
-    return result
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'YearIndex':
+        """
+        Build the index of a year-sorted frame.
+        
+        Args:
+            df: DataFrame sorted by Year (see ``sort_by_year``)
+            
+        Returns:
+            YearIndex
+        """
+        year_values = df['Year'].to_numpy()
+        if not _is_sorted(year_values):
+            raise ValueError("DataFrame is not sorted by Year; use sort_by_year() first")
+        return cls(year_values)
+    
+    def rows(self, start_year: int, end_year: int) -> Tuple[int, int]:
+        """
+        Row range holding an inclusive range of years.
+        
+        Args:
+            start_year: Start year (inclusive)
+            end_year: End year (inclusive)
+            
+        Returns:
+            Tuple of (first row, end row) for ``iloc`` slicing
+        """
+        lo = np.searchsorted(self.years, start_year, side='left')
+        hi = np.searchsorted(self.years, end_year, side='right')
+        return int(self.offsets[lo]), int(self.offsets[max(lo, hi)])
+
+
+def _is_sorted(values: np.ndarray) -> bool:
+    """Whether a 1-D array is in ascending order."""
+    return bool(np.all(values[1:] >= values[:-1]))
+
+
+def _year_rows(df: pd.DataFrame, start_year: int, end_year: int) -> Optional[Tuple[int, int]]:
+    """
+    Row range of an inclusive year range, or None if the frame is not sorted by Year.
+    
+    Nothing is cached between calls: the sortedness check and the binary
+    search run on the current Year column, so in-place edits are seen.
+    """
+    year_values = df['Year'].to_numpy()
+    if not _is_sorted(year_values):
+        return None
+    lo = int(np.searchsorted(year_values, start_year, side='left'))
+    hi = int(np.searchsorted(year_values, end_year, side='right'))
+    return lo, max(lo, hi)
+
+
+@traced
+def sort_by_year(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Put a frame in the year-sorted layout that ``YearIndex`` relies on.
+    
+    The sort is stable, so rows keep their order within a year. Frames
+    that are already sorted are returned unchanged.
+    
+    Args:
+        df: DataFrame with a Year column
+        
+    Returns:
+        DataFrame sorted by Year
+    """
+    year_values = df['Year'].to_numpy()
+    if _is_sorted(year_values):
+        return df
+    return df.iloc[np.argsort(year_values, kind='stable')]
 
 
+@traced
 def filter_by_year_range(
     df: pd.DataFrame,
     start_year: int,
@@ -102,6 +258,10 @@ def filter_by_year_range(
     """
     Filter DataFrame to a specific year range.
     
+    For frames sorted by Year (``load_babynames`` returns them that way)
+    the rows are found with a binary search instead of a boolean mask over
+    every row. The result is always a copy.
+    
     Args:
         df: DataFrame with Year column
         start_year: Start year (inclusive)
@@ -110,9 +270,39 @@ def filter_by_year_range(
     Returns:
         Filtered DataFrame
     """
+    rows = _year_rows(df, start_year, end_year)
+    if rows is not None:
+        return df.iloc[rows[0]:rows[1]].copy()
     return df[(df['Year'] >= start_year) & (df['Year'] <= end_year)].copy()
 
 
+@traced
+def slice_year_range(
+    df: pd.DataFrame,
+    start_year: int,
+    end_year: int
+) -> pd.DataFrame:
+    """
+    ``filter_by_year_range`` without the copy.
+    
+    Frames sorted by Year give a zero-copy row slice that shares memory
+    with ``df``; copy it before modifying it in place.
+    
+    Args:
+        df: DataFrame with Year column
+        start_year: Start year (inclusive)
+        end_year: End year (inclusive)
+        
+    Returns:
+        Rows of ``df`` in the year range
+    """
+    rows = _year_rows(df, start_year, end_year)
+    if rows is not None:
+        return df.iloc[rows[0]:rows[1]]
+    return df[(df['Year'] >= start_year) & (df['Year'] <= end_year)]
+
+
+@traced
 def print_summary_stats(stats: Dict[str, Any]) -> None:
     """
     Pretty print summary statistics.
@@ -138,6 +328,7 @@ def print_summary_stats(stats: Dict[str, Any]) -> None:
     print("=" * 60)
 
 
+@traced
 def create_mapping_template(
     top_names: pd.DataFrame,
     output_path: str = '../data/name_origin_template.csv'
@@ -150,7 +341,7 @@ def create_mapping_template(
         output_path: Path to save the template
     """
     template = top_names.copy()
-    template['Origin_Region'] = template['Name'].apply(classify_name_origin)
+    template['Origin_Region'] = np.asarray(classify_names(template['Name']))
     template['Notes'] = ''
     
     template.to_csv(output_path, index=False)
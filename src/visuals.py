@@ -1,12 +1,27 @@
 """
 Visualization utilities for baby names analysis.
 """
+import contextlib
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import plotly
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 from typing import List, Optional, Dict
 
+from .instrument import span, traced
+
+# Formats written when none are given
+DEFAULT_FORMATS = ('html', 'png')
 
+
+@traced
 def add_policy_markers(
     fig: go.Figure,
     show_1924: bool = True,
@@ -50,6 +65,7 @@ def add_policy_markers(
     return fig
 
 
+@traced
 def plot_immigrant_index(
     index_df: pd.DataFrame,
     title: str = "Baby Names as Immigration Time Capsules",
@@ -108,6 +124,7 @@ def plot_immigrant_index(
     return fig
 
 
+@traced
 def plot_regional_composition(
     regional_df: pd.DataFrame,
     immigrant_regions: List[str] = None,
@@ -163,6 +180,7 @@ def plot_regional_composition(
     return fig
 
 
+@traced
 def plot_period_comparison(
     period_stats: pd.DataFrame,
     title: str = "Immigrant Name Share by Policy Era",
@@ -204,11 +222,12 @@ def plot_period_comparison(
     return fig
 
 
+@traced
 def save_figure(
     fig: go.Figure,
     filename: str,
     output_dir: str = '../reports/figures',
-    formats: List[str] = ['html', 'png']
+    formats: Optional[List[str]] = None
 ) -> None:
     """
     Save a Plotly figure in multiple formats.
@@ -217,15 +236,153 @@ def save_figure(
         fig: Plotly figure to save
         filename: Base filename (without extension)
         output_dir: Output directory path
-        formats: List of formats to save ('html', 'png', 'pdf', etc.)
+        formats: List of formats to save ('html', 'png', 'pdf', etc.),
+            default ['html', 'png']
     """
-    from pathlib import Path
+    if formats is None:
+        formats = DEFAULT_FORMATS
     
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
     for fmt in formats:
-        if fmt == 'html':
-            fig.write_html(str(output_path / f"{filename}.html"))
-        else:
-            fig.write_image(str(output_path / f"{filename}.{fmt}"))
+        with span(f"plotly.write_{fmt}"):
+            if fmt == 'html':
+                fig.write_html(str(output_path / f"{filename}.html"))
+            else:
+                fig.write_image(str(output_path / f"{filename}.{fmt}"))
+
+
+# Manifest of spec hashes of exported files, kept in the output directory
+EXPORT_MANIFEST = '.export_manifest.json'
+
+
+def _figure_hash(fig: go.Figure, fmt: str, image_options: dict) -> str:
+    """Hash of everything that determines an exported file."""
+    digest = hashlib.sha1(fig.to_json().encode())
+    digest.update(json.dumps(
+        {'format': fmt, 'plotly': plotly.__version__, **image_options}, sort_keys=True
+    ).encode())
+    return digest.hexdigest()
+
+
+def _image_server(n_workers: int):
+    """
+    Context manager keeping one kaleido browser open for all image renders.
+    
+    With kaleido >= 1 every ``write_image`` call otherwise starts its own
+    browser; older kaleido already reuses one render process.
+    """
+    try:
+        import kaleido
+    except ImportError:
+        return contextlib.nullcontext()
+    if not hasattr(kaleido, 'start_sync_server'):
+        return contextlib.nullcontext()
+    
+    @contextlib.contextmanager
+    def server():
+        kaleido.start_sync_server(n=n_workers, silence_warnings=True)
+        try:
+            yield
+        finally:
+            kaleido.stop_sync_server(silence_warnings=True)
+    
+    return server()
+
+
+@traced
+def export_figures(
+    figures: Dict[str, go.Figure],
+    output_dir: str = '../reports/figures',
+    formats: Optional[List[str]] = None,
+    max_workers: int = 4,
+    force: bool = False,
+    **image_options
+) -> pd.DataFrame:
+    """
+    Export many figures in several formats at once.
+    
+    Files whose figure spec (and format/options) hash matches the one
+    recorded at their last export are skipped. The remaining files are
+    written by a thread pool; static formats share one kaleido renderer
+    instead of starting one per file. If a file fails to render, the others
+    are still written and recorded, then the first error is raised.
+    
+    Args:
+        figures: {base filename: figure}
+        output_dir: Output directory path
+        formats: Formats to write for every figure ('html', 'png', 'pdf', etc.),
+            default ['html', 'png']
+        max_workers: Files written concurrently
+        force: Re-export files even if they are up to date
+        **image_options: Passed to ``write_image`` (width, height, scale)
+        
+    Returns:
+        DataFrame with File, Format, Status ('exported' or 'up to date')
+        and Seconds, one row per file
+    """
+    if formats is None:
+        formats = DEFAULT_FORMATS
+    
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_path / EXPORT_MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    
+    jobs, rows = [], {}
+    for filename, fig in figures.items():
+        for fmt in formats:
+            file_name = f"{filename}.{fmt}"
+            spec_hash = _figure_hash(fig, fmt, image_options)
+            if not force and manifest.get(file_name) == spec_hash and (output_path / file_name).exists():
+                rows[file_name] = {'File': file_name, 'Format': fmt, 'Status': 'up to date', 'Seconds': 0.0}
+            else:
+                rows[file_name] = None
+                jobs.append((file_name, fmt, fig, spec_hash))
+    
+    def export(job):
+        file_name, fmt, fig, _ = job
+        target = output_path / file_name
+        # Write beside the target and rename, so a failed render leaves no partial file
+        tmp_target = target.with_name(f".{target.stem}.tmp.{fmt}")
+        start = time.perf_counter()
+        try:
+            with span(f"plotly.write_{fmt}"):
+                if fmt == 'html':
+                    fig.write_html(str(tmp_target))
+                else:
+                    fig.write_image(str(tmp_target), format=fmt, **image_options)
+        except BaseException:
+            tmp_target.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_target, target)
+        return time.perf_counter() - start
+    
+    if jobs:
+        needs_images = any(fmt != 'html' for _, fmt, _, _ in jobs)
+        errors = {}
+        with _image_server(max_workers) if needs_images else contextlib.nullcontext():
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {pool.submit(export, job): job for job in jobs}
+                # Record every success, even if another file fails
+                for future in as_completed(futures):
+                    file_name, fmt, _, spec_hash = futures[future]
+                    try:
+                        elapsed = future.result()
+                    except Exception as e:
+                        errors[file_name] = e
+                        continue
+                    manifest[file_name] = spec_hash
+                    rows[file_name] = {'File': file_name, 'Format': fmt, 'Status': 'exported', 'Seconds': elapsed}
+        tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(tmp_path, manifest_path)
+        if errors:
+            # The first failing file in job order, so reruns fail the same way
+            raise next(errors[job[0]] for job in jobs if job[0] in errors)
+    
+    return pd.DataFrame(list(rows.values()), columns=['File', 'Format', 'Status', 'Seconds'])
@@ -0,0 +1,83 @@
+"""
+Shared fixtures: small baby names frames with the real columns.
+
+Frames are small enough for the naive pandas/loop equivalents the tests
+compare against, and use few distinct counts so ties are common.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def make_babynames(n_names: int = 60, years=range(1900, 1931), seed: int = 0) -> pd.DataFrame:
+    """
+    Random Id, Name, Year, Gender, Count frame (one row per name/year/gender present).
+
+    Args:
+        n_names: Distinct names
+        years: Years covered
+        seed: Random seed
+
+    Returns:
+        DataFrame in the babynames.csv layout
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Name{i:03d}" for i in range(n_names)], dtype=object)
+    rows = []
+    for year in years:
+        for gender in ('F', 'M'):
+            present = rng.random(n_names) < 0.6
+            counts = rng.integers(5, 15, size=present.sum())
+            rows.append(pd.DataFrame({
+                'Name': names[present],
+                'Year': year,
+                'Gender': gender,
+                'Count': counts
+            }))
+    df = pd.concat(rows, ignore_index=True)
+    # Shuffle so first-appearance order differs from name order
+    df = df.sample(frac=1, random_state=seed).reset_index(drop=True)
+    df.insert(0, 'Id', np.arange(1, len(df) + 1))
+    return df
+
+
+def normalized(df: pd.DataFrame) -> pd.DataFrame:
+    """Plain dtypes, sorted on the key columns, for order-insensitive comparison."""
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype == object:
+            df[col] = df[col].astype(str)
+        elif df[col].dtype.kind in 'iu':
+            df[col] = df[col].astype(np.int64)
+    keys = [col for col in ('Year', 'Origin_Region', 'Gender', 'Name') if col in df.columns]
+    return df.sort_values(keys).reset_index(drop=True)
+
+
+def assert_same(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(normalized(result), normalized(expected), check_exact=False)
+
+
+@pytest.fixture
+def babynames() -> pd.DataFrame:
+    return make_babynames()
+
+
+@pytest.fixture
+def babynames_csv(tmp_path, babynames) -> str:
+    """The ``babynames`` frame written as babynames.csv in a temporary directory."""
+    path = tmp_path / 'babynames.csv'
+    babynames.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def mapping(babynames) -> pd.DataFrame:
+    """Origin mapping covering two thirds of the names, every region used."""
+    names = np.sort(babynames['Name'].unique())[:40]
+    regions = np.array(['Anglo', 'Latin', 'Asian', 'Irish_Italian', 'African_MiddleEastern'])
+    return pd.DataFrame({'Name': names, 'Origin_Region': regions[np.arange(len(names)) % 5]})
@@ -0,0 +1,43 @@
+import pytest
+
+from src.aggregates import AggregateStore
+from src.compute_trends import calculate_immigrant_index, calculate_name_diversity, calculate_yearly_shares
+from src.load_data import merge_with_origins
+from src.utils import get_top_names
+
+from .conftest import assert_same
+
+
+@pytest.fixture
+def eager(babynames, mapping):
+    shares = calculate_yearly_shares(merge_with_origins(babynames, mapping))
+    return {
+        'shares': shares,
+        'index': calculate_immigrant_index(shares),
+        'diversity': calculate_name_diversity(babynames),
+        'top': get_top_names(babynames, 500)
+    }
+
+
+def test_aggregate_store_matches_eager(tmp_path, babynames, mapping, eager):
+    store = AggregateStore(tmp_path / 'store')
+    # Added in two parts, the second replacing one year of the first
+    store.add_frame(babynames[babynames['Year'] <= 1915])
+    store.add_frame(babynames[babynames['Year'] >= 1915])
+    store.set_mapping(mapping)
+    store.save()
+
+    reopened = AggregateStore(tmp_path / 'store')
+    for s in (store, reopened):
+        assert_same(s.yearly_shares(), eager['shares'])
+        assert_same(s.immigrant_index(), eager['index'])
+        assert_same(s.name_diversity(), eager['diversity'])
+        assert_same(s.top_names(500), eager['top'])
+
+    # A year file replaces that year's partition
+    year = babynames[babynames['Year'] == 1920][['Name', 'Gender', 'Count']]
+    year.assign(Count=year['Count'] * 2).to_csv(tmp_path / 'yob1920.txt', index=False, header=False)
+    assert reopened.add_year_file(tmp_path / 'yob1920.txt') == 1920
+    doubled = babynames.copy()
+    doubled.loc[doubled['Year'] == 1920, 'Count'] *= 2
+    assert_same(reopened.name_diversity(), calculate_name_diversity(doubled))
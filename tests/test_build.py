@@ -0,0 +1,118 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.build import Build, Stage, _topological_order
+
+
+class Counter:
+    """Stage function that counts its calls."""
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.func(*args)
+
+
+@pytest.fixture
+def graph(tmp_path):
+    source = tmp_path / 'source.csv'
+    pd.DataFrame({'x': [1, 2, 3]}).to_csv(source, index=False)
+    funcs = {
+        'raw': Counter(lambda: pd.read_csv(source)),
+        'double': Counter(lambda df: df.assign(x=df['x'] * 2)),
+        'total': Counter(lambda df: pd.DataFrame({'total': [df['x'].sum()]})),
+        'other': Counter(lambda df: df.assign(y=1)),
+    }
+
+    def make(params=None):
+        return Build([
+            Stage('raw', funcs['raw'], files=[source]),
+            Stage('double', funcs['double'], deps=['raw'], output=tmp_path / 'double.csv',
+                  params=params or {}),
+            Stage('total', funcs['total'], deps=['double'], output=tmp_path / 'total.csv'),
+            Stage('other', funcs['other'], deps=['raw'], output=tmp_path / 'other.csv'),
+        ], tmp_path / 'state.json')
+
+    return make, funcs, source, tmp_path
+
+
+def statuses(report: pd.DataFrame) -> dict:
+    return dict(zip(report['Stage'], report['Status']))
+
+
+def touch(path, text):
+    path.write_text(text)
+    # Make sure the mtime changes even on coarse clocks
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_first_run_builds_then_nothing(graph):
+    make, funcs, _, tmp_path = graph
+    assert set(statuses(make().run()).values()) <= {'built', 'computed'}
+    assert pd.read_csv(tmp_path / 'total.csv')['total'][0] == 12
+
+    report = statuses(make().run())
+    assert report == {'raw': 'not needed', 'double': 'up to date', 'total': 'up to date', 'other': 'up to date'}
+    assert funcs['raw'].calls == 1
+
+
+def test_source_change_rebuilds_downstream(graph):
+    make, funcs, source, tmp_path = graph
+    make().run()
+    touch(source, 'x\n1\n2\n4\n')
+    report = statuses(make().run())
+    assert report['double'] == report['total'] == report['other'] == 'built'
+    assert pd.read_csv(tmp_path / 'total.csv')['total'][0] == 14
+
+    # Same content, new mtime: rehashed, but nothing is stale
+    touch(source, 'x\n1\n2\n4\n')
+    assert statuses(make().run())['double'] == 'up to date'
+
+
+def test_edited_output_rebuilds_only_downstream(graph):
+    make, funcs, _, tmp_path = graph
+    make().run()
+    touch(tmp_path / 'double.csv', 'x\n10\n')
+    report = statuses(make().run())
+    assert report == {'raw': 'not needed', 'double': 'up to date', 'total': 'built', 'other': 'up to date'}
+    assert pd.read_csv(tmp_path / 'total.csv')['total'][0] == 10
+    assert funcs['raw'].calls == 1
+
+
+def test_params_deleted_outputs_force_and_targets(graph):
+    make, funcs, _, tmp_path = graph
+    make().run()
+    assert statuses(make({'factor': 3}).run())['double'] == 'built'
+
+    (tmp_path / 'other.csv').unlink()
+    assert statuses(make({'factor': 3}).run())['other'] == 'built'
+
+    assert set(statuses(make({'factor': 3}).run(force=True)).values()) <= {'built', 'computed'}
+
+    report = make({'factor': 3}).run(targets=['double'])
+    assert list(report['Stage']) == ['raw', 'double']
+
+
+def test_value_reads_back_up_to_date_outputs(graph):
+    make, funcs, _, _ = graph
+    make().run()
+    build = make()
+    build.run()
+    assert build.value('total')['total'][0] == 12
+    assert funcs['total'].calls == 1
+
+
+def test_invalid_graphs(tmp_path):
+    with pytest.raises(ValueError):
+        Build([Stage('a', lambda: 1), Stage('a', lambda: 2)], tmp_path / 's.json')
+    with pytest.raises(ValueError):
+        Build([Stage('a', lambda x: x, deps=['missing'])], tmp_path / 's.json')
+    stages = {'a': Stage('a', lambda b: b, deps=['b']), 'b': Stage('b', lambda a: a, deps=['a'])}
+    with pytest.raises(ValueError):
+        _topological_order(stages)
@@ -0,0 +1,148 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import changepoints
+from src.changepoints import (
+    _noise_variance,
+    detect_changepoints,
+    name_changepoints,
+    region_changepoints,
+    summarize_breaks
+)
+from src.trajectories import TrajectoryStore
+
+from .conftest import make_babynames
+
+YEARS = np.arange(1900, 1960)
+
+
+def cost(x: np.ndarray) -> float:
+    return float(((x - x.mean()) ** 2).sum())
+
+
+def naive_segmentation(x: np.ndarray, max_breaks: int, min_size: int, penalty: float) -> list:
+    """Greedy binary segmentation with an explicit loop over segments and splits."""
+    threshold = max(penalty * _noise_variance(x[None, :])[0] * np.log(len(x)), 1e-12 * cost(x))
+    breaks = [0, len(x)]
+    found = []
+    for _ in range(max_breaks):
+        best, best_gain = None, -np.inf
+        for lo, hi in zip(breaks[:-1], breaks[1:]):
+            for t in range(lo + min_size, hi - min_size + 1):
+                gain = cost(x[lo:hi]) - cost(x[lo:t]) - cost(x[t:hi])
+                if gain > best_gain:
+                    best, best_gain = t, gain
+        if best is None or best_gain <= threshold:
+            break
+        breaks = sorted(breaks + [best])
+        found.append((best, best_gain))
+    return found
+
+
+def planted(n_series: int = 40, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0, 1, (n_series, len(YEARS)))
+    values[:, YEARS >= 1924] += rng.uniform(2, 5, (n_series, 1))
+    values[::2, YEARS >= 1945] -= 4
+    # Flat and near-flat series, as rare names give
+    values[-1] = 0
+    values[-2] = 0
+    values[-2, 30] = 1
+    return values
+
+
+@pytest.mark.parametrize('max_breaks,min_size,penalty', [(1, 5, 2.0), (3, 5, 2.0), (4, 3, 0.5)])
+def test_matches_naive_loop(max_breaks, min_size, penalty):
+    values = planted()
+    breaks = detect_changepoints(values, YEARS, max_breaks=max_breaks, min_size=min_size, penalty=penalty)
+    for i, x in enumerate(values):
+        expected = naive_segmentation(x, max_breaks, min_size, penalty)
+        got = breaks[breaks['Series'] == i].sort_values('Order')
+        assert list(got['Break_Year']) == [YEARS[t] for t, _ in expected]
+        np.testing.assert_allclose(got['Gain'], [g for _, g in expected], rtol=1e-8)
+
+
+def test_segment_means():
+    values = planted()
+    breaks = detect_changepoints(values, YEARS)
+    for i, x in enumerate(values):
+        got = breaks[breaks['Series'] == i]
+        bounds = [0] + [int(np.searchsorted(YEARS, y)) for y in got['Break_Year']] + [len(x)]
+        means = [x[a:b].mean() for a, b in zip(bounds[:-1], bounds[1:])]
+        np.testing.assert_allclose(got['Mean_Before'], means[:-1])
+        np.testing.assert_allclose(got['Mean_After'], means[1:])
+
+
+def test_finds_planted_breaks():
+    breaks = detect_changepoints(planted(), YEARS)
+    assert (breaks['Series'].isin([38, 39])).sum() == 0
+    strongest = breaks[breaks['Order'] == 1]
+    near = [np.abs(strongest['Break_Year'] - year) <= 1 for year in (1924, 1945)]
+    assert (near[0] | near[1]).all()
+    summary = summarize_breaks(breaks, policy_years=[1924], window=1, years=YEARS)
+    assert summary.loc[0, 'Ratio'] > 5
+
+
+def test_short_series_have_no_breaks():
+    assert detect_changepoints(np.ones((3, 7)), np.arange(7), min_size=4).empty
+
+
+class CountingPool(changepoints.ProcessPoolExecutor):
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        CountingPool.created += 1
+        super().__init__(*args, **kwargs)
+
+
+@pytest.fixture
+def counting_pool(monkeypatch):
+    CountingPool.created = 0
+    monkeypatch.setattr(changepoints, 'ProcessPoolExecutor', CountingPool)
+    return CountingPool
+
+
+def test_chunks_and_jobs_do_not_change_results(counting_pool):
+    values = planted(100)
+    serial = detect_changepoints(values, YEARS)
+    parallel = detect_changepoints(values, YEARS, chunk_size=30, n_jobs=2)
+    assert counting_pool.created == 1
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_name_changepoints_parallel(counting_pool):
+    store = TrajectoryStore.from_frame(make_babynames(n_names=80, years=range(1900, 1960)))
+    serial = name_changepoints(store, min_births=1, penalty=0.5)
+    assert not serial.empty
+    parallel = name_changepoints(store, min_births=1, penalty=0.5, chunk_size=25, n_jobs=2)
+    assert counting_pool.created == 1
+    pd.testing.assert_frame_equal(serial, parallel)
+
+    # Same as segmenting the dense share matrix directly
+    shares = store.shares().toarray().T
+    direct = detect_changepoints(shares, store.years, np.asarray(store.names, dtype=object), penalty=0.5)
+    pd.testing.assert_frame_equal(serial, direct)
+
+
+def test_region_changepoints_pivots_shares():
+    rng = np.random.default_rng(3)
+    shares = pd.DataFrame({
+        'Year': np.repeat(YEARS, 2),
+        'Origin_Region': np.tile(['Anglo', 'Latin'], len(YEARS)),
+        'Share': rng.normal(10, 0.1, 2 * len(YEARS))
+    })
+    shares.loc[(shares['Origin_Region'] == 'Latin') & (shares['Year'] >= 1930), 'Share'] += 5
+    breaks = region_changepoints(shares, max_breaks=1)
+    assert list(breaks.loc[breaks['Series'] == 'Latin', 'Break_Year']) == [1930]
+
+
+def test_import_does_not_load_scipy():
+    code = "import sys; import src.changepoints; print('scipy' in sys.modules)"
+    root = Path(__file__).resolve().parents[1]
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
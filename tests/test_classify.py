@@ -0,0 +1,44 @@
+import pandas as pd
+
+from src.classify import NameClassifier, classify_names, default_origin_rules
+from src.utils import classify_name_origin
+
+
+def naive_classify(name: str, rules: pd.DataFrame, default: str) -> str:
+    """First matching rule, in table order."""
+    for region, kind, pattern in rules.itertuples(index=False):
+        if (kind == 'exact' and name == pattern) or \
+                (kind == 'suffix' and name.endswith(pattern)) or \
+                (kind == 'prefix' and name.startswith(pattern)):
+            return region
+    return default
+
+
+def test_classifier_matches_rule_loop():
+    rules = pd.DataFrame([
+        ('Latin', 'exact', 'Santiago'),
+        ('Irish_Italian', 'prefix', 'Mc'),
+        ('Irish_Italian', 'suffix', 'ino'),
+        ('Latin', 'suffix', 'ez'),
+        ('Asian', 'suffix', 'ko'),
+        ('Latin', 'prefix', 'San'),
+        ('Asian', 'exact', 'Mcko'),
+        ('Other', 'suffix', 'Santiagos'),
+    ], columns=['Region', 'Kind', 'Pattern'])
+    names = ['Santiago', 'Mckenzie', 'Mcko', 'Gino', 'Lopez', 'Yoko', 'Sandra', 'Ko', 'ez', 'Ann', 'Sanino']
+    classifier = NameClassifier(rules)
+    expected = [naive_classify(name, rules, 'Anglo') for name in names]
+    assert list(classifier.classify(names)) == expected
+    assert [classifier(name) for name in names] == expected
+    # Categorical input is classified per category
+    assert list(classifier.classify(pd.Series(names * 2, dtype='category'))) == expected * 2
+
+
+def test_default_rules_agree_with_scalar_function():
+    rules = default_origin_rules()
+    names = list(rules['Pattern'].unique()) + ['Unknownname']
+    classified = classify_names(names)
+    assert list(classified) == [naive_classify(name, rules, 'Anglo') for name in names]
+    # The scalar helper keeps its own (shorter) lists; where both know a name they agree
+    for name in ['Santiago', 'Wei', 'Omar', 'Liam', 'Zzz']:
+        assert classify_names([name])[0] == classify_name_origin(name)
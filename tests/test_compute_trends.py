@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.compute_trends import (
+    analyze_policy_periods,
+    calculate_change_around_policies,
+    calculate_change_around_policy,
+    calculate_immigrant_index,
+    calculate_immigrant_indices,
+    calculate_name_diversity,
+    calculate_yearly_shares,
+    count_distinct_per_year,
+    range_means,
+    year_name_counts,
+    year_region_matrix
+)
+from src.load_data import merge_with_origins
+from src.utils import filter_by_year_range
+
+
+def naive_shares(df: pd.DataFrame) -> pd.DataFrame:
+    """The original groupby/merge implementation."""
+    totals = df.groupby('Year')['Count'].sum().rename('Total_Births').reset_index()
+    by_region = df.groupby(['Year', 'Origin_Region'])['Count'].sum().rename('Region_Births').reset_index()
+    result = by_region.merge(totals, on='Year')
+    result['Share'] = result['Region_Births'] / result['Total_Births'] * 100
+    return result
+
+
+def naive_index(index_df: pd.DataFrame, start: int, end: int) -> pd.Series:
+    return index_df[(index_df['Year'] >= start) & (index_df['Year'] <= end)]['Immigrant_Name_Share']
+
+
+def test_yearly_shares_match_groupby(babynames, mapping):
+    merged = merge_with_origins(babynames, mapping)
+    expected = naive_shares(merged.astype({'Origin_Region': object}))
+    result = calculate_yearly_shares(merged)
+    result = result.astype({'Origin_Region': object}).sort_values(['Year', 'Origin_Region'])
+    pd.testing.assert_frame_equal(
+        result.reset_index(drop=True),
+        expected.sort_values(['Year', 'Origin_Region']).reset_index(drop=True),
+        check_dtype=False
+    )
+
+
+def test_yearly_shares_of_no_rows(babynames, mapping):
+    merged = filter_by_year_range(merge_with_origins(babynames, mapping), 2000, 2010)
+    years, regions, counts, present = year_region_matrix(merged)
+    assert len(years) == 0
+    assert counts.shape == present.shape == (0, len(regions) + 1)
+    result = calculate_yearly_shares(merged)
+    assert result.shape == (0, 5)
+    assert list(result.columns) == ['Year', 'Origin_Region', 'Region_Births', 'Total_Births', 'Share']
+
+
+def test_year_name_counts_of_no_rows(babynames, mapping):
+    years, names, counts = year_name_counts(babynames.iloc[:0])
+    assert len(years) == len(names) == 0 and counts.shape == (0, 0)
+    assert calculate_immigrant_indices(babynames.iloc[:0], {'base': mapping}).empty
+
+
+def test_immigrant_indices_match_per_scheme(babynames, mapping):
+    other = mapping.assign(Origin_Region=np.where(mapping.index % 2, 'Latin', 'Anglo'))
+    schemes = {'base': mapping, 'other': (other, ['Latin'])}
+    result = calculate_immigrant_indices(babynames, schemes)
+    for label, (scheme, regions) in {'base': (mapping, None), 'other': (other, ['Latin'])}.items():
+        shares = calculate_yearly_shares(merge_with_origins(babynames, scheme))
+        expected = calculate_immigrant_index(shares, regions)
+        got = result[result['Scheme'] == label].drop(columns='Scheme').reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+@pytest.fixture
+def index_df() -> pd.DataFrame:
+    rng = np.random.default_rng(4)
+    years = np.arange(1900, 1980)
+    values = rng.random(len(years)) * 10
+    # Shuffled rows and a missing value, as the prefix sums must handle
+    df = pd.DataFrame({'Year': years, 'Immigrant_Name_Share': values}).sample(frac=1, random_state=1)
+    df.loc[df['Year'] == 1930, 'Immigrant_Name_Share'] = np.nan
+    return df.drop(index=df.index[df['Year'] == 1950])
+
+
+def test_policy_periods_match_masks(index_df):
+    periods = {'a': (1890, 1923), 'b': (1924, 1964), 'c': (1965, 2014), 'empty': (2050, 2060)}
+    result = analyze_policy_periods(index_df, periods).set_index('Period')
+    assert list(result.index) == ['a', 'b', 'c']
+    for period in result.index:
+        values = naive_index(index_df, *periods[period])
+        assert result.loc[period, 'Avg_Immigrant_Share'] == pytest.approx(values.mean())
+        assert result.loc[period, 'Min_Immigrant_Share'] == pytest.approx(values.min())
+        assert result.loc[period, 'Max_Immigrant_Share'] == pytest.approx(values.max())
+
+
+@pytest.mark.parametrize('policy_year', [1924, 1930, 1950, 1965, 1905, 1978])
+@pytest.mark.parametrize('before,after', [(10, 10), (3, 7), (1, 1)])
+def test_change_around_policy_matches_masks(index_df, policy_year, before, after):
+    years = index_df['Year']
+    before_avg = index_df[(years >= policy_year - before) & (years < policy_year)]['Immigrant_Name_Share'].mean()
+    after_avg = index_df[(years > policy_year) & (years <= policy_year + after)]['Immigrant_Name_Share'].mean()
+    result = calculate_change_around_policy(index_df, policy_year, before, after)
+    np.testing.assert_allclose(
+        [result['before_avg'], result['after_avg'], result['absolute_change']],
+        [before_avg, after_avg, after_avg - before_avg]
+    )
+    grid = calculate_change_around_policies(index_df, [1905, policy_year], [1, before], after)
+    row = grid[(grid['Policy_Year'] == policy_year) & (grid['Before_Years'] == before)].iloc[0]
+    assert row['After_Avg'] == pytest.approx(after_avg, nan_ok=True)
+
+
+def test_range_means_skip_nan():
+    values = np.array([1.0, np.nan, 3.0, 5.0, np.nan])
+    lo, hi = np.array([0, 1, 1, 4, 2]), np.array([5, 2, 4, 5, 2])
+    expected = [np.nanmean(values[a:b]) if np.any(~np.isnan(values[a:b])) else np.nan for a, b in zip(lo, hi)]
+    np.testing.assert_allclose(range_means(values, lo, hi), expected)
+
+
+def test_count_distinct_per_year():
+    rng = np.random.default_rng(5)
+    offsets = rng.integers(0, 6, size=500)
+    codes = rng.integers(-1, 40, size=500)
+    result = count_distinct_per_year(offsets, codes, 40, 7)
+    expected = [len(set(codes[(offsets == y) & (codes >= 0)])) for y in range(7)]
+    np.testing.assert_array_equal(result, expected)
+
+
+def naive_diversity(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby('Year').agg(Unique_Names=('Name', 'nunique'), Total_Births=('Count', 'sum'))
+
+
+def test_name_diversity_matches_nunique(babynames):
+    expected = naive_diversity(babynames)
+    exact = calculate_name_diversity(babynames).set_index('Year')
+    np.testing.assert_array_equal(exact['Unique_Names'], expected['Unique_Names'])
+    np.testing.assert_array_equal(exact['Total_Births'], expected['Total_Births'])
+    np.testing.assert_allclose(
+        exact['Names_Per_1000_Births'], expected['Unique_Names'] / expected['Total_Births'] * 1000
+    )
+
+
+def test_name_diversity_of_no_rows(babynames):
+    for method in ('exact', 'hll'):
+        result = calculate_name_diversity(babynames.iloc[:0], method=method)
+        assert result.shape == (0, 4)
+        assert list(result.columns) == ['Year', 'Unique_Names', 'Total_Births', 'Names_Per_1000_Births']
+
+
+def test_name_diversity_hll(babynames):
+    expected = naive_diversity(babynames)
+    hll = calculate_name_diversity(babynames, method='hll', error=0.02).set_index('Year')
+    # Small cardinalities use linear counting, which is nearly exact
+    np.testing.assert_allclose(hll['Unique_Names'], expected['Unique_Names'], rtol=0.1)
+    with pytest.raises(ValueError):
+        calculate_name_diversity(babynames, method='bogus')
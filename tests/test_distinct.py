@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.distinct import (
+    YearlySketches,
+    _bucket_and_rank,
+    estimate_cardinality,
+    hash_names,
+    precision_for_error
+)
+
+
+def naive_bucket_and_rank(h: int, p: int):
+    """Bit-string version of the register index and rank."""
+    bits = format(h, '064b')
+    rest = bits[p:]
+    zeros = len(rest) - len(rest.lstrip('0'))
+    return int(bits[:p], 2), zeros + 1
+
+
+def test_bucket_and_rank_matches_bit_strings():
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2**63, size=500, dtype=np.uint64) << np.uint64(rng.integers(0, 40))
+    hashes = np.concatenate([hashes, np.array([0, 1, 2**63, 2**64 - 1], dtype=np.uint64)])
+    for p in (4, 10, 14):
+        buckets, ranks = _bucket_and_rank(hashes, p)
+        expected = [naive_bucket_and_rank(int(h), p) for h in hashes]
+        assert list(zip(buckets.tolist(), ranks.tolist())) == expected
+
+
+def test_precision_for_error():
+    assert precision_for_error(0.01) == 14
+    assert 1.04 / np.sqrt(2 ** precision_for_error(0.05)) <= 0.05
+    assert precision_for_error(1.0) == 4
+    assert precision_for_error(1e-9) == 18
+
+
+def frame(names_per_year: dict) -> pd.DataFrame:
+    return pd.DataFrame(
+        [(year, name) for year, names in names_per_year.items() for name in names],
+        columns=['Year', 'Name']
+    )
+
+
+@pytest.mark.parametrize('n', [10, 1_000, 50_000])
+def test_estimate_within_error(n):
+    df = frame({2000: [f"n{i}" for i in range(n)]})
+    sketches = YearlySketches.from_frame(df, error=0.02)
+    # Four standard errors
+    assert sketches.estimate().iloc[0] == pytest.approx(n, rel=4 * sketches.relative_error)
+
+
+def test_ranges_rolling_and_merge_equal_sketching_the_union():
+    names = [f"n{i}" for i in range(3000)]
+    per_year = {year: names[(year - 1990) * 200:(year - 1990) * 200 + 500] for year in range(1990, 2000)}
+    sketches = YearlySketches.from_frame(frame(per_year))
+
+    union = YearlySketches.from_frame(frame({0: per_year[1993] + per_year[1994] + per_year[1995]}))
+    assert sketches.estimate_range(1993, 1995) == pytest.approx(union.estimate().iloc[0])
+    assert sketches.estimate_range(2050, 2060) == 0.0
+    rolling = sketches.rolling(3)
+    assert rolling.index[0] == 1992
+    assert rolling[1995] == pytest.approx(union.estimate().iloc[0])
+
+    # Partitions of the same years merge into the sketches of the whole
+    left_names = {y: v[::2] for y, v in per_year.items() if y < 1997}
+    right_names = {y: v[1::2] for y, v in per_year.items() if y > 1991}
+    left = YearlySketches.from_frame(frame(left_names))
+    merged = left.merge(YearlySketches.from_frame(frame(right_names)))
+    whole = YearlySketches.from_frame(pd.concat([frame(left_names), frame(right_names)]))
+    np.testing.assert_array_equal(merged.years, whole.years)
+    np.testing.assert_array_equal(merged.registers, whole.registers)
+    with pytest.raises(ValueError):
+        left.merge(YearlySketches.from_frame(frame(per_year), error=0.1))
+
+
+def test_sketches_of_no_rows():
+    sketches = YearlySketches.from_frame(frame({}))
+    assert len(sketches.years) == 0
+    assert sketches.estimate().empty and sketches.rolling(3).empty
+    assert sketches.estimate_range(1900, 2000) == 0.0
+    merged = sketches.merge(YearlySketches.from_frame(frame({2000: ['a', 'b']})))
+    assert merged.estimate().round().tolist() == [2.0]
+
+
+def test_hashes_do_not_depend_on_dictionary():
+    a = hash_names(pd.Index(['Ann', 'Bob']))
+    b = hash_names(pd.Index(['Bob', 'Cy', 'Ann']))
+    assert a[0] == b[2] and a[1] == b[0]
+
+
+def test_estimate_cardinality_empty_registers():
+    assert estimate_cardinality(np.zeros((1, 64), dtype=np.uint8))[0] == 0
@@ -0,0 +1,16 @@
+import pandas as pd
+
+from src.encoding import Vocabulary, get_name_gender_codes
+
+
+def test_name_gender_codes_round_trip(babynames):
+    keys, names, genders = get_name_gender_codes(babynames)
+    assert list(names.take(keys // len(genders))) == list(babynames['Name'])
+    assert list(genders.take(keys % len(genders))) == list(babynames['Gender'])
+
+
+def test_vocabulary_ids_are_stable():
+    vocab = Vocabulary(['b', 'a'])
+    ids = vocab.extend(pd.Index(['a', 'c', 'b']))
+    assert list(ids) == [1, 2, 0, -1]
+    assert list(vocab.values) == ['b', 'a', 'c']
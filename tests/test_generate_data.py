@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+
+import generate_data
+from src.compute_trends import calculate_yearly_shares
+from src.load_data import load_babynames, load_name_mapping, merge_with_origins
+from src.parallel import ParallelExecutor
+
+from .conftest import make_babynames
+
+
+def full_recompute(df: pd.DataFrame, mapping: pd.DataFrame) -> pd.DataFrame:
+    shares = calculate_yearly_shares(merge_with_origins(df, mapping[['Name', 'Origin_Region']]))
+    return shares.sort_values(['Year', 'Origin_Region']).reset_index(drop=True)
+
+
+def read_trends(data_dir) -> pd.DataFrame:
+    trends = pd.read_csv(data_dir / 'regional_trends.csv')
+    return trends.sort_values(['Year', 'Origin_Region']).reset_index(drop=True)
+
+
+def test_appended_years_survive_a_mapping_edit(tmp_path):
+    df = make_babynames(years=range(1900, 1921))
+    df.to_csv(tmp_path / 'babynames.csv', index=False)
+    generate_data.main(tmp_path, top_n=20)
+
+    new_year = make_babynames(years=[1921], seed=1)
+    new_year[['Name', 'Gender', 'Count']].to_csv(tmp_path / 'yob1921.txt', index=False, header=False)
+    generate_data.update_trends_from_year_files(tmp_path, [tmp_path / 'yob1921.txt'], top_n=20)
+
+    mapping = load_name_mapping(str(tmp_path / 'name_origin_mapping.csv'))
+    appended = read_trends(tmp_path)
+    assert appended['Year'].max() == 1921
+
+    # Reclassify a few names by hand, then rebuild through the graph
+    mapping.loc[:4, 'Origin_Region'] = 'Latin'
+    mapping.to_csv(tmp_path / 'name_origin_mapping.csv', index=False)
+    report = generate_data.main(tmp_path, top_n=20)
+    assert report.set_index('Stage').loc['regional_trends', 'Status'] == 'built'
+
+    rebuilt = read_trends(tmp_path)
+    expected = full_recompute(load_babynames(str(tmp_path / 'babynames.csv')), mapping)
+    expected = pd.concat([
+        expected,
+        full_recompute(new_year, mapping).astype({'Year': expected['Year'].dtype})
+    ]).sort_values(['Year', 'Origin_Region']).reset_index(drop=True)
+    assert rebuilt['Year'].max() == 1921
+    pd.testing.assert_frame_equal(rebuilt, expected.astype(rebuilt.dtypes.to_dict()), check_exact=False)
+    assert not rebuilt.equals(appended)
+
+    # Nothing changed since: a second run is a no-op
+    report = generate_data.main(tmp_path, top_n=20)
+    assert (report['Status'] != 'built').all()
+
+
+def test_append_passes_jobs_and_force(tmp_path):
+    df = make_babynames(years=range(1900, 1921))
+    df.to_csv(tmp_path / 'babynames.csv', index=False)
+    generate_data.main(tmp_path, top_n=20)
+
+    new_year = make_babynames(years=[1921], seed=1)
+    new_year[['Name', 'Gender', 'Count']].to_csv(tmp_path / 'yob1921.txt', index=False, header=False)
+    report = generate_data.update_trends_from_year_files(
+        tmp_path, [tmp_path / 'yob1921.txt'], top_n=20, n_jobs=2, force=True
+    )
+    # Every file stage is rebuilt; source stages are only computed
+    assert (report.loc[report['Status'] != 'computed', 'Status'] == 'built').all()
+    assert report.set_index('Stage').loc['top_names', 'Status'] == 'built'
+    assert read_trends(tmp_path)['Year'].max() == 1921
+
+
+def test_append_rejects_years_in_babynames(tmp_path):
+    df = make_babynames(years=range(1900, 1921))
+    df.to_csv(tmp_path / 'babynames.csv', index=False)
+    generate_data.main(tmp_path, top_n=20)
+    before = read_trends(tmp_path)
+
+    corrected = df[df['Year'] == 1910].assign(Count=lambda d: d['Count'] * 2)
+    corrected[['Name', 'Gender', 'Count']].to_csv(tmp_path / 'yob1910.txt', index=False, header=False)
+    with pytest.raises(ValueError, match='1910'):
+        generate_data.update_trends_from_year_files(tmp_path, [tmp_path / 'yob1910.txt'], top_n=20)
+    assert not (tmp_path / generate_data.AGGREGATES_DIR / 'summary.npz').exists()
+    pd.testing.assert_frame_equal(read_trends(tmp_path), before)
+
+
+def test_up_to_date_run_does_not_open_the_executor(tmp_path, monkeypatch):
+    make_babynames().to_csv(tmp_path / 'babynames.csv', index=False)
+    generate_data.main(tmp_path, top_n=20, n_jobs=2)
+
+    def fail(self):
+        raise AssertionError("executor opened")
+
+    monkeypatch.setattr(ParallelExecutor, '_open', fail)
+    report = generate_data.main(tmp_path, top_n=20, n_jobs=2)
+    assert (report['Status'] != 'built').all()
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.load_data import (
+    get_cache_path,
+    iter_babynames_chunks,
+    load_babynames,
+    merge_with_origins,
+    year_from_path
+)
+
+
+def by_id(df: pd.DataFrame) -> pd.DataFrame:
+    """Plain-array frame in Id order, for comparisons (cached columns may be memory-mapped)."""
+    df = pd.DataFrame({
+        col: np.array(df[col], dtype=object if col in ('Name', 'Gender') else None) for col in df.columns
+    })
+    return df.sort_values('Id').reset_index(drop=True) if 'Id' in df.columns else df
+
+
+def test_cache_round_trip(babynames, babynames_csv):
+    first = load_babynames(babynames_csv)
+    assert (get_cache_path(babynames_csv) / 'manifest.json').exists()
+    cached = load_babynames(babynames_csv)
+    assert isinstance(cached['Name'].dtype, pd.CategoricalDtype)
+    expected = by_id(babynames)
+    for df in (first, cached, load_babynames(babynames_csv, use_cache=False)):
+        pd.testing.assert_frame_equal(by_id(df), expected, check_dtype=False)
+
+
+def test_cache_is_sorted_by_year(babynames, babynames_csv):
+    load_babynames(babynames_csv)
+    cached = load_babynames(babynames_csv)
+    assert np.all(np.diff(cached['Year'].to_numpy()) >= 0)
+
+
+def test_stale_cache_is_rebuilt(babynames, babynames_csv):
+    load_babynames(babynames_csv)
+    changed = babynames.assign(Count=babynames['Count'] + 1)
+    changed.to_csv(babynames_csv, index=False)
+    pd.testing.assert_frame_equal(by_id(load_babynames(babynames_csv)), by_id(changed), check_dtype=False)
+
+    # Touched but identical: still served, and equal
+    stat = os.stat(babynames_csv)
+    os.utime(babynames_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    pd.testing.assert_frame_equal(by_id(load_babynames(babynames_csv)), by_id(changed), check_dtype=False)
+
+
+def test_merge_with_origins_fills_other(babynames, mapping):
+    merged = merge_with_origins(babynames, mapping)
+    expected = babynames.merge(mapping, on='Name', how='left')['Origin_Region'].fillna('Other')
+    assert len(merged) == len(babynames)
+    assert list(merged['Origin_Region'].astype(object)) == list(expected)
+
+
+@pytest.mark.parametrize('use_cache', [True, False])
+def test_columns_and_year_range(babynames, babynames_csv, use_cache):
+    load_babynames(babynames_csv)
+    df = load_babynames(babynames_csv, use_cache=use_cache, columns=['Name', 'Count'], year_range=(1905, 1910))
+    assert list(df.columns) == ['Name', 'Count']
+    expected = babynames[babynames['Year'].between(1905, 1910)]
+    assert df['Count'].sum() == expected['Count'].sum()
+    assert sorted(df['Name'].astype(str)) == sorted(expected['Name'])
+
+
+def test_chunks_cover_the_file(babynames, babynames_csv, tmp_path):
+    chunks = list(iter_babynames_chunks(babynames_csv, chunksize=100))
+    assert max(len(chunk) for chunk in chunks) <= 100
+    pd.testing.assert_frame_equal(by_id(pd.concat(chunks)), by_id(babynames), check_dtype=False)
+
+    # Year files without a Year column get it from the file name
+    year_df = babynames[babynames['Year'] == 1901][['Name', 'Gender', 'Count']]
+    year_path = tmp_path / 'yob1901.txt'
+    year_df.to_csv(year_path, index=False, header=False)
+    chunks = list(iter_babynames_chunks(str(year_path), header=None, names=['Name', 'Gender', 'Count']))
+    assert (pd.concat(chunks)['Year'] == 1901).all()
+    assert year_from_path('data/yob2015.txt') == 2015
+    assert year_from_path('data/names.txt') is None
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import memo
+from src.compute_trends import calculate_name_diversity, calculate_yearly_shares
+from src.memo import MemoCache, fingerprint
+
+
+@pytest.fixture
+def cache():
+    yield memo.enable_cache()
+    memo.disable_cache()
+
+
+def test_fingerprint_follows_content(babynames):
+    same = babynames.copy(deep=True)
+    assert fingerprint(babynames) == fingerprint(same)
+    # Categorical and plain columns hash differently, but each is stable
+    assert fingerprint(babynames.astype({'Name': 'category'})) == fingerprint(same.astype({'Name': 'category'}))
+
+    changed = babynames.copy()
+    changed.loc[5, 'Count'] += 1
+    assert fingerprint(changed) != fingerprint(babynames)
+    renamed = babynames.copy()
+    renamed.loc[5, 'Name'] = 'Other'
+    assert fingerprint(renamed) != fingerprint(babynames)
+    assert fingerprint(babynames.iloc[::-1]) != fingerprint(babynames)
+    assert fingerprint((1, 'a')) != fingerprint([1, 'a'])
+    assert fingerprint({'a': 1, 'b': 2}) == fingerprint({'b': 2, 'a': 1})
+    assert fingerprint(np.arange(4)) != fingerprint(np.arange(4).reshape(2, 2))
+
+
+def test_memoize_serves_equal_inputs(cache, babynames):
+    df = babynames.assign(Origin_Region='Anglo')
+    first = calculate_yearly_shares(df)
+    second = calculate_yearly_shares(df.copy(deep=True))
+    pd.testing.assert_frame_equal(first, second)
+    assert cache.stats['memory_hits'] == 1 and cache.stats['misses'] == 1
+
+    # Defaults bound: same key with and without the default argument
+    calculate_name_diversity(babynames)
+    calculate_name_diversity(babynames, 'exact')
+    assert cache.stats['memory_hits'] == 2
+
+    # Returned results are copies: mutating one does not touch the cache
+    second.loc[0, 'Share'] = -1
+    assert calculate_yearly_shares(df).loc[0, 'Share'] == first.loc[0, 'Share']
+
+
+def test_memory_lru_eviction():
+    values = {key: np.zeros(100, dtype=np.int64) for key in 'abc'}
+    cache = MemoCache(max_memory_bytes=2 * 800)
+    cache.put('a', values['a'])
+    cache.put('b', values['b'])
+    cache.get('a')
+    cache.put('c', values['c'])
+    # b was least recently used
+    assert cache.get('b') is memo._MISSING
+    assert cache.get('a') is not memo._MISSING
+    assert cache.stats['memory_evictions'] == 1
+    # Entries bigger than the whole budget are not kept in memory
+    cache.put('big', np.zeros(1000))
+    assert 'big' not in cache._memory
+
+
+def test_disk_tier(tmp_path):
+    cache = MemoCache(max_memory_bytes=0, disk_dir=tmp_path, max_disk_bytes=10**6)
+    cache.put('k', pd.Series([1, 2, 3]))
+    reopened = MemoCache(disk_dir=tmp_path)
+    pd.testing.assert_series_equal(reopened.get('k'), pd.Series([1, 2, 3]))
+    assert reopened.stats['disk_hits'] == 1
+    # Promoted to memory
+    reopened.get('k')
+    assert reopened.stats['memory_hits'] == 1
+
+    # A corrupt entry is a miss and is removed
+    (tmp_path / 'bad.pkl').write_bytes(b'not a pickle')
+    assert reopened.get('bad') is memo._MISSING
+    assert not (tmp_path / 'bad.pkl').exists()
+
+
+def test_disk_eviction_by_size(tmp_path):
+    cache = MemoCache(max_memory_bytes=0, disk_dir=tmp_path, max_disk_bytes=30_000)
+    for i in range(5):
+        cache.put(f"k{i}", np.zeros(1000))
+    assert sum(path.stat().st_size for path in tmp_path.glob('*.pkl')) <= 30_000
+    assert cache.stats['disk_evictions'] > 0
+    # The newest entry survives
+    assert (tmp_path / 'k4.pkl').exists()
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src.compute_trends import calculate_name_diversity, calculate_yearly_shares
+from src.load_data import merge_with_origins
+from src import load_data, parallel
+from src.parallel import ParallelExecutor
+from src.utils import get_top_names
+
+from .conftest import assert_same
+
+
+@pytest.fixture
+def eager(babynames, mapping):
+    shares = calculate_yearly_shares(merge_with_origins(babynames, mapping))
+    return {
+        'shares': shares,
+        'diversity': calculate_name_diversity(babynames),
+        'top': get_top_names(babynames, 500),
+        'top_by_gender': get_top_names(babynames, 500, by_gender=True)
+    }
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_parallel_executor_matches_eager(babynames_csv, mapping, eager, n_jobs):
+    with ParallelExecutor(babynames_csv, n_jobs=n_jobs) as executor:
+        assert_same(executor.yearly_shares(mapping), eager['shares'])
+        assert_same(executor.name_diversity(), eager['diversity'])
+        assert_same(executor.top_names(500), eager['top'])
+        assert_same(executor.top_names(500, by_gender=True), eager['top_by_gender'])
+        # Cut-off inside the ranking: the same counts
+        np.testing.assert_array_equal(
+            executor.top_names(7)['Total_Count'], eager['top']['Total_Count'][:7]
+        )
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_parallel_executor_on_no_rows(tmp_path, babynames, mapping, n_jobs):
+    path = tmp_path / 'empty.csv'
+    babynames.iloc[:0].to_csv(path, index=False)
+    with ParallelExecutor(str(path), n_jobs=n_jobs) as executor:
+        assert executor.yearly_shares(mapping).shape == (0, 5)
+        assert executor.name_diversity().shape == (0, 4)
+        assert executor.top_names(10).empty
+
+
+def test_parallel_executor_without_cache(monkeypatch, babynames_csv, mapping, eager):
+    def fail(*args, **kwargs):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(load_data, '_write_cache', fail)
+    # No cache for the workers: everything runs here, without a pool
+    monkeypatch.setattr(parallel, 'ProcessPoolExecutor', fail)
+    with pytest.warns(UserWarning, match='Could not write cache'):
+        executor = ParallelExecutor(babynames_csv, n_jobs=2)
+        assert not executor.has_cache()
+    with executor:
+        assert_same(executor.yearly_shares(mapping), eager['shares'])
+        assert_same(executor.name_diversity(), eager['diversity'])
+        assert_same(executor.top_names(500, by_gender=True), eager['top_by_gender'])
+
+
+def test_parallel_executor_opens_on_first_use(monkeypatch, babynames_csv, mapping, eager):
+    calls = []
+
+    def counting_load(*args, **kwargs):
+        calls.append(args)
+        return load_data.load_babynames(*args, **kwargs)
+
+    monkeypatch.setattr(parallel, 'load_babynames', counting_load)
+    with ParallelExecutor(babynames_csv, n_jobs=2) as executor:
+        assert calls == [] and executor._pool is None
+        assert_same(executor.name_diversity(), eager['diversity'])
+        executor.top_names(5)
+    assert len(calls) == 1
@@ -0,0 +1,21 @@
+import pytest
+
+from src.compute_trends import calculate_immigrant_index, calculate_yearly_shares
+from src.load_data import merge_with_origins
+from src.pipeline import Pipeline
+from src.utils import filter_by_year_range
+
+from .conftest import assert_same
+
+
+def test_pipeline_matches_eager_chain(babynames_csv, babynames, mapping):
+    plan = Pipeline.scan(babynames_csv).filter_years(1902, 1925).with_origins(mapping).filter_years(1900, 1920)
+    merged = filter_by_year_range(merge_with_origins(babynames, mapping), 1902, 1920)
+    shares = calculate_yearly_shares(merged)
+    assert_same(plan.yearly_shares().collect(), shares)
+    assert_same(plan.immigrant_index(['Latin']).collect(), calculate_immigrant_index(shares, ['Latin']))
+    assert plan.optimize()['year_range'] == (1902, 1920)
+    frame = Pipeline.from_frame(babynames).with_origins(mapping).collect()
+    assert len(frame) == len(babynames)
+    with pytest.raises(ValueError):
+        Pipeline.from_frame(babynames).yearly_shares().optimize()
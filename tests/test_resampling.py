@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.compute_trends import (
+    calculate_change_around_policies,
+    calculate_change_around_policy,
+    calculate_immigrant_index,
+    calculate_yearly_shares
+)
+from src.load_data import merge_with_origins
+from src.resampling import PolicyResampler, _permutation_batch
+
+from .conftest import make_babynames
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    return make_babynames(n_names=60, years=range(1900, 1951))
+
+
+@pytest.fixture
+def resampler(frame, mapping) -> PolicyResampler:
+    return PolicyResampler.from_frame(frame, mapping)
+
+
+def eager_index(df: pd.DataFrame, mapping: pd.DataFrame) -> pd.DataFrame:
+    return calculate_immigrant_index(calculate_yearly_shares(merge_with_origins(df, mapping)))
+
+
+def test_changes_match_eager(frame, mapping, resampler):
+    expected = calculate_change_around_policies(eager_index(frame, mapping), [1920, 1924, 1940], [5, 10], 10)
+    result = resampler.changes([1920, 1924, 1940], [5, 10], 10)
+    pd.testing.assert_frame_equal(result, expected.drop(columns='Percent_Change'), check_dtype=False)
+
+
+def test_weighted_shares_equal_reweighted_rows(frame, mapping, resampler):
+    rng = np.random.default_rng(0)
+    weights = rng.integers(0, 4, size=len(resampler.names))
+    # A replicate's weights are births multiplied per name
+    per_name = pd.Series(weights, index=resampler.names)
+    reweighted = frame.assign(Count=frame['Count'] * frame['Name'].map(per_name).to_numpy())
+    reweighted = reweighted[reweighted['Count'] > 0]
+    expected = eager_index(reweighted, mapping).set_index('Year')['Immigrant_Name_Share']
+
+    shares = pd.Series(resampler.immigrant_shares(weights.astype(float)), index=resampler.years).dropna()
+    pd.testing.assert_series_equal(shares, expected, check_names=False, check_index_type=False)
+
+    # Batches of replicates: one column per replicate
+    batch = resampler.immigrant_shares(np.column_stack([weights, np.ones(len(weights))]).astype(float))
+    np.testing.assert_allclose(batch[:, 1], resampler.immigrant_shares(), equal_nan=True)
+
+
+def test_results_do_not_depend_on_workers(resampler):
+    serial = resampler.bootstrap([1924], n_resamples=60, batch_size=25, seed=3)
+    parallel = resampler.bootstrap([1924], n_resamples=60, batch_size=25, seed=3, n_jobs=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert (serial['CI_Low'] <= serial['Absolute_Change']).all()
+    assert (serial['Absolute_Change'] <= serial['CI_High']).all()
+
+    p_serial = resampler.permutation_test([1924], n_permutations=99, batch_size=40, seed=1)
+    p_parallel = resampler.permutation_test([1924], n_permutations=99, batch_size=40, seed=1, n_jobs=2)
+    pd.testing.assert_frame_equal(p_serial, p_parallel)
+    assert ((p_serial['P_Value'] > 0) & (p_serial['P_Value'] <= 1)).all()
+
+    with pytest.raises(ValueError):
+        resampler.bootstrap([1924], method='jackknife')
+
+
+def test_permutations_shuffle_origin_labels_over_names(frame, resampler):
+    restricted, bounds = resampler._restrict_to_windows(resampler.changes([1924], 5, 5))
+    seed = np.random.SeedSequence(7)
+    changes = _permutation_batch(restricted, seed, 4, bounds)
+    # The same shuffles, applied to the mapping and run through the eager functions
+    labels = np.random.default_rng(seed).permuted(np.tile(restricted.is_immigrant[:, None], (1, 4)), axis=0)
+    assert (labels.sum(axis=0) == restricted.is_immigrant.sum()).all()
+    for j in range(4):
+        relabelled = pd.DataFrame({
+            'Name': restricted.names,
+            'Origin_Region': np.where(labels[:, j], 'Latin', 'Anglo')
+        })
+        expected = calculate_change_around_policy(eager_index(frame, relabelled), 1924, 5, 5)
+        assert changes[j, 0] == pytest.approx(expected['absolute_change'])
+
+
+def test_permutation_detects_planted_change(frame, mapping):
+    immigrant = mapping.loc[mapping['Origin_Region'] != 'Anglo', 'Name']
+    planted = frame.copy()
+    after = (planted['Year'] > 1924) & planted['Name'].isin(immigrant)
+    planted.loc[after, 'Count'] *= 5
+    result = PolicyResampler.from_frame(planted, mapping).permutation_test([1924], n_permutations=199)
+    assert result['P_Value'].iloc[0] == pytest.approx(1 / 200)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from src.similarity import TrajectoryIndex
+from src.trajectories import TrajectoryStore
+
+from .test_trajectories import naive_pivot
+
+
+def test_similarity_matches_pandas_corr(babynames):
+    store = TrajectoryStore.from_frame(babynames)
+    shares = naive_pivot(babynames)
+    shares = shares.div(shares.sum(axis=1), axis=0)
+    index = TrajectoryIndex.from_store(store)
+    name = shares.columns[0]
+
+    expected = shares.corrwith(shares[name]).sort_index()
+    sims = index.similarities(name).sort_index()
+    np.testing.assert_allclose(sims[expected.index], expected, atol=1e-5)
+
+    top = index.query(name, k=5)
+    assert name not in set(top['Name'])
+    np.testing.assert_allclose(top['Similarity'], expected.drop(name).nlargest(5), atol=1e-5)
+
+    batch = index.query_batch([name, shares.columns[1]], k=5)
+    pd.testing.assert_frame_equal(
+        batch[batch['Query'] == name][['Name', 'Similarity']].reset_index(drop=True), top
+    )
+
+
+def test_similarity_components_match_svd(babynames):
+    store = TrajectoryStore.from_frame(babynames)
+    full = TrajectoryIndex.from_store(store, dtype=np.float64)
+    reduced = TrajectoryIndex.from_store(store, n_components=5, dtype=np.float64)
+
+    # Reference: project centered rows on the top right singular vectors
+    shares = store.shares().toarray().T
+    centered = shares - shares.mean(axis=1, keepdims=True)
+    _, _, vt = np.linalg.svd(centered, full_matrices=False)
+    projected = centered @ vt[:5].T
+    norms = np.linalg.norm(projected, axis=1, keepdims=True)
+    projected = np.divide(projected, norms, out=np.zeros_like(projected), where=norms > 0)
+
+    np.testing.assert_allclose(reduced.vectors @ reduced.vectors[0], projected @ projected[0], atol=1e-8)
+    # All components: the same similarities as no projection
+    every = TrajectoryIndex.from_store(store, n_components=len(store.years) - 1, dtype=np.float64)
+    np.testing.assert_allclose(every.vectors @ every.vectors[0], full.vectors @ full.vectors[0], atol=1e-8)
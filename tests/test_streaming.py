@@ -0,0 +1,42 @@
+import pytest
+
+from src.compute_trends import calculate_name_diversity, calculate_yearly_shares
+from src.load_data import get_data_summary, iter_babynames_chunks, merge_with_origins
+from src.streaming import StreamingAggregator
+from src.utils import get_top_names
+
+from .conftest import assert_same
+
+
+@pytest.fixture
+def eager(babynames, mapping):
+    shares = calculate_yearly_shares(merge_with_origins(babynames, mapping))
+    return {
+        'shares': shares,
+        'diversity': calculate_name_diversity(babynames),
+        'top': get_top_names(babynames, 500),
+        'top_by_gender': get_top_names(babynames, 500, by_gender=True)
+    }
+
+
+def test_streaming_matches_eager(babynames_csv, babynames, mapping, eager):
+    agg = StreamingAggregator(mapping).update_all(iter_babynames_chunks(babynames_csv, chunksize=97))
+    assert_same(agg.yearly_shares(), eager['shares'])
+    assert_same(agg.name_diversity(), eager['diversity'])
+    # n above the number of names: every name, so no ties at a cut-off
+    assert_same(agg.top_names(500), eager['top'])
+    assert_same(agg.top_names(500, by_gender=True), eager['top_by_gender'])
+    summary = agg.summary()
+    expected = get_data_summary(babynames)
+    assert summary['total_births'] == expected['total_births']
+    assert summary['unique_names'] == expected['unique_names']
+    assert summary['years_covered'] == expected['years_covered']
+
+
+def test_streaming_skips_empty_chunks(babynames, mapping, eager):
+    agg = StreamingAggregator(mapping).update(babynames.iloc[:0])
+    assert agg.yearly_shares().shape == (0, 5)
+    assert agg.name_diversity().shape == (0, 4)
+    assert agg.summary()['years_covered'] == 0
+    agg.update(babynames).update(babynames.iloc[:0])
+    assert_same(agg.yearly_shares(), eager['shares'])
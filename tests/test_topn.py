@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.topn import HeavyHitters, top_n_indices, windowed_totals
+from src.utils import get_top_names
+
+
+def naive_top(values: np.ndarray, n: int, mask=None) -> np.ndarray:
+    """Stable descending sort, then head(n)."""
+    s = pd.Series(values)
+    if mask is not None:
+        s = s[mask]
+    return s.sort_values(ascending=False, kind='stable').head(n).index.to_numpy()
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 3, 4, 5, 10])
+def test_top_n_indices_small(n):
+    values = np.array([5, 3, 3, 1])
+    np.testing.assert_array_equal(top_n_indices(values, n), naive_top(values, n))
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('n', [0, 1, 7, 50, 200, 1000])
+def test_top_n_indices_ties_and_masks(seed, n):
+    rng = np.random.default_rng(seed)
+    # Few distinct values: many ties at every cut-off
+    values = rng.integers(0, 10, size=300)
+    mask = rng.random(300) < 0.5
+    np.testing.assert_array_equal(top_n_indices(values, n), naive_top(values, n))
+    np.testing.assert_array_equal(top_n_indices(values, n, mask), naive_top(values, n, mask))
+
+
+def test_top_n_indices_negative_n():
+    assert len(top_n_indices(np.array([5, 3, 3, 1]), -1)) == 0
+
+
+def test_top_n_indices_empty_mask():
+    values = np.array([3, 2, 1])
+    assert len(top_n_indices(values, 2, np.zeros(3, dtype=bool))) == 0
+
+
+def naive_top_names(df: pd.DataFrame, n: int) -> pd.DataFrame:
+    return (
+        df.groupby('Name')['Count'].sum()
+        .sort_values(ascending=False, kind='stable')
+        .head(n)
+        .reset_index()
+        .rename(columns={'Count': 'Total_Count'})
+    )
+
+
+def assert_same_top(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    """Same counts in order; same names above the cut-off (ties there may differ)."""
+    np.testing.assert_array_equal(result['Total_Count'].to_numpy(), expected['Total_Count'].to_numpy())
+    if len(expected):
+        cutoff = expected['Total_Count'].min()
+        above = expected['Total_Count'] > cutoff
+        assert set(result.loc[above.to_numpy(), 'Name']) == set(expected.loc[above, 'Name'])
+        # Within equal counts names may be ordered differently, not chosen differently
+        assert set(result['Name']) - set(expected['Name']) <= set(
+            result.loc[result['Total_Count'] == cutoff, 'Name']
+        )
+
+
+@pytest.mark.parametrize('n', [0, 1, 10, 60, 500])
+def test_get_top_names_matches_groupby(babynames, n):
+    assert_same_top(get_top_names(babynames, n), naive_top_names(babynames, n))
+
+
+@pytest.mark.parametrize('n', [0, 5, 500])
+def test_get_top_names_by_gender(babynames, n):
+    result = get_top_names(babynames, n, by_gender=True)
+    if n == 0:
+        assert result.empty
+    for gender in babynames['Gender'].unique():
+        expected = naive_top_names(babynames[babynames['Gender'] == gender], n)
+        assert_same_top(result[result['Gender'] == gender].reset_index(drop=True), expected)
+
+
+def test_get_top_names_windows(babynames):
+    windows = {'early': (1900, 1910), 'overlap': (1905, 1920), 'late': (1921, 1930)}
+    result = get_top_names(babynames, 10, windows=windows)
+    for label, (start, end) in windows.items():
+        subset = babynames[babynames['Year'].between(start, end)]
+        assert_same_top(
+            result[result['Window'] == label].reset_index(drop=True),
+            naive_top_names(subset, 10)
+        )
+
+
+def test_windowed_totals_matches_loop():
+    rng = np.random.default_rng(1)
+    years = rng.integers(1900, 1950, size=2000)
+    keys = rng.integers(-1, 20, size=2000)
+    weights = rng.integers(1, 100, size=2000)
+    windows = [(1900, 1949), (1910, 1920), (1915, 1930), (1960, 1970)]
+    totals, present = windowed_totals(years, keys, weights, 20, windows)
+    for w, (start, end) in enumerate(windows):
+        for key in range(20):
+            rows = (years >= start) & (years <= end) & (keys == key)
+            assert totals[w, key] == weights[rows].sum()
+            assert present[w, key] == rows.any()
+
+
+def test_heavy_hitters_bounds():
+    rng = np.random.default_rng(2)
+    keys = pd.Series(rng.zipf(1.5, size=20_000) % 500).astype(str)
+    weights = pd.Series(rng.integers(1, 10, size=20_000))
+    exact = weights.groupby(keys).sum()
+
+    parts = [HeavyHitters(50).update(keys[i::4], weights[i::4]) for i in range(4)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+
+    assert merged.total == weights.sum()
+    assert len(merged.counts) <= 50
+    bound = merged.error_bound
+    for key, count in merged.counts.items():
+        assert exact[key] - bound <= count <= exact[key]
+    # Every key above the bound is tracked
+    assert set(exact[exact > bound].index) <= set(merged.counts.index)
+    assert merged.top(0).empty
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from src.trajectories import TrajectoryStore
+
+
+def naive_pivot(df: pd.DataFrame, gender=None) -> pd.DataFrame:
+    """Year x Name births over every year of the frame, zeros where absent."""
+    if gender is not None:
+        df = df[df['Gender'] == gender]
+    years = np.arange(df['Year'].min(), df['Year'].max() + 1)
+    return df.pivot_table(index='Year', columns='Name', values='Count', aggfunc='sum', fill_value=0).reindex(
+        years, fill_value=0
+    )
+
+
+def test_store_matches_pivot(babynames):
+    store = TrajectoryStore.from_frame(babynames)
+    for gender in (None, 'F'):
+        expected = naive_pivot(babynames, gender)
+        counts = pd.DataFrame(store.counts(gender).toarray(), index=store.years, columns=store.names)
+        counts = counts.loc[:, (counts > 0).any()]
+        pd.testing.assert_frame_equal(
+            counts[expected.columns], expected, check_dtype=False, check_names=False
+        )
+        shares = expected.div(expected.sum(axis=1), axis=0)
+        name = expected.columns[3]
+        np.testing.assert_allclose(store.series(name, gender, normalize=True).to_numpy(), shares[name])
+
+
+def test_store_statistics(babynames):
+    store = TrajectoryStore.from_frame(babynames)
+    counts = naive_pivot(babynames)
+    shares = counts.div(counts.sum(axis=1), axis=0)
+    # idxmax returns the first (earliest) year among ties
+    pd.testing.assert_series_equal(
+        store.peak_years().sort_index(), shares.idxmax().sort_index(), check_names=False, check_dtype=False
+    )
+    first = counts.gt(0).idxmax()
+    pd.testing.assert_series_equal(
+        store.first_years().sort_index(), first.sort_index(), check_names=False, check_dtype=False
+    )
+    ranks = pd.DataFrame(store.ranks().toarray(), index=store.years, columns=store.names)[counts.columns]
+    expected = counts.where(counts > 0).rank(axis=1, method='min', ascending=False).fillna(0)
+    np.testing.assert_array_equal(ranks.to_numpy(), expected.to_numpy())
+
+
+def test_store_of_no_rows(tmp_path, babynames):
+    store = TrajectoryStore.from_frame(babynames.iloc[:0])
+    assert len(store.years) == 0 and len(store.names) == 0
+    assert store.counts().shape == store.shares().shape == (0, 0)
+    assert store.peak_years().empty and store.first_years().empty
+    store.save(tmp_path / 'store')
+    loaded = TrajectoryStore.load(tmp_path / 'store')
+    assert loaded.counts().shape == (0, 0)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import YearIndex, filter_by_year_range, get_dominant_gender, slice_year_range, sort_by_year
+
+
+def test_dominant_gender_matches_idxmax(babynames):
+    totals = babynames.groupby(['Name', 'Gender'])['Count'].sum().unstack()
+    # Ties go to the first gender (F before M), as idxmax
+    expected = totals.idxmax(axis=1)
+    result = get_dominant_gender(babynames)
+    pd.testing.assert_series_equal(
+        result.sort_index(), expected.sort_index(), check_names=False, check_index_type=False
+    )
+    lookup = get_dominant_gender(babynames, ['Name003', 'Nobody'])
+    assert list(lookup) == [expected['Name003'], 'U']
+
+
+@pytest.mark.parametrize('start,end', [(1900, 1930), (1905, 1910), (1910, 1905), (1800, 1850), (1929, 2000)])
+def test_filter_by_year_range_matches_mask(babynames, start, end):
+    expected = babynames[(babynames['Year'] >= start) & (babynames['Year'] <= end)]
+    # Unsorted frame: boolean mask; sorted frame: binary-searched slice
+    pd.testing.assert_frame_equal(filter_by_year_range(babynames, start, end), expected)
+    sorted_df = sort_by_year(babynames)
+    result = filter_by_year_range(sorted_df, start, end)
+    assert sorted(result['Id']) == sorted(expected['Id'])
+
+
+def test_filter_by_year_range_sees_in_place_edits(babynames):
+    df = sort_by_year(babynames).reset_index(drop=True)
+    assert filter_by_year_range(df, 1900, 1900)['Year'].eq(1900).all()
+    df.loc[0, 'Year'] = 1950
+    result = filter_by_year_range(df, 1900, 1900)
+    expected = df[df['Year'] == 1900]
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_filter_by_year_range_returns_a_copy(babynames):
+    df = sort_by_year(babynames).reset_index(drop=True)
+    result = filter_by_year_range(df, 1905, 1910)
+    result['Count'] = 0
+    assert df['Count'].gt(0).all()
+    # The slicing variant shares memory with its input
+    assert np.shares_memory(slice_year_range(df, 1905, 1910)['Count'].to_numpy(), df['Count'].to_numpy())
+
+
+def test_year_index_requires_sorted_years(babynames):
+    with pytest.raises(ValueError):
+        YearIndex.from_frame(babynames)
+    index = YearIndex.from_frame(sort_by_year(babynames))
+    assert len(index) == babynames['Year'].nunique()
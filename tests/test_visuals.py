@@ -0,0 +1,116 @@
+import json
+import sys
+import types
+from pathlib import Path
+
+import plotly.graph_objects as go
+import pytest
+
+from src.visuals import EXPORT_MANIFEST, export_figures, save_figure
+
+
+def make_figure(title: str) -> go.Figure:
+    return go.Figure(go.Scatter(x=[1, 2, 3], y=[3, 1, 2]), layout={'title': title})
+
+
+def test_export_figures_skips_unchanged(tmp_path):
+    figures = {'a': make_figure('a'), 'b': make_figure('b')}
+    first = export_figures(figures, tmp_path, formats=['html'])
+    assert (first['Status'] == 'exported').all()
+
+    figures['b'] = make_figure('changed')
+    second = export_figures(figures, tmp_path, formats=['html'])
+    assert dict(zip(second['File'], second['Status'])) == {'a.html': 'up to date', 'b.html': 'exported'}
+
+
+def test_export_figures_records_successes_when_one_fails(tmp_path):
+    broken = make_figure('broken')
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('render failed')
+
+    broken.write_html = fail
+    figures = {'a': make_figure('a'), 'b': make_figure('b'), 'broken': broken}
+    with pytest.raises(RuntimeError, match='render failed'):
+        export_figures(figures, tmp_path, formats=['html'], max_workers=2)
+
+    manifest = json.loads((tmp_path / EXPORT_MANIFEST).read_text())
+    assert set(manifest) == {'a.html', 'b.html'}
+    assert not (tmp_path / 'broken.html').exists()
+    assert not list(tmp_path.glob('.*.tmp.*'))
+
+    # The files written before the failure are not rendered again
+    rerun = export_figures({'a': figures['a'], 'b': figures['b']}, tmp_path, formats=['html'])
+    assert (rerun['Status'] == 'up to date').all()
+
+
+class FakeKaleido(types.ModuleType):
+    """Stand-in for kaleido >= 1, recording sync-server starts and stops."""
+
+    def __init__(self):
+        super().__init__('kaleido')
+        self.calls = []
+
+    def start_sync_server(self, n, silence_warnings=False):
+        self.calls.append(('start', n))
+
+    def stop_sync_server(self, silence_warnings=False):
+        self.calls.append(('stop',))
+
+
+def stub_write_image(fig, fail=False):
+    def write_image(path, format=None, **options):
+        if fail:
+            raise RuntimeError('render failed')
+        Path(path).write_bytes(f"{format} {sorted(options.items())}".encode())
+
+    fig.write_image = write_image
+    return fig
+
+
+def test_export_figures_shares_one_kaleido_server(tmp_path, monkeypatch):
+    kaleido = FakeKaleido()
+    monkeypatch.setitem(sys.modules, 'kaleido', kaleido)
+    figures = {name: stub_write_image(make_figure(name)) for name in 'ab'}
+
+    first = export_figures(figures, tmp_path, formats=['html', 'png'], max_workers=3, width=400)
+    assert kaleido.calls == [('start', 3), ('stop',)]
+    assert (first['Status'] == 'exported').all()
+    assert (tmp_path / 'a.png').read_bytes() == b"png [('width', 400)]"
+    manifest = json.loads((tmp_path / EXPORT_MANIFEST).read_text())
+    assert set(manifest) == {'a.html', 'a.png', 'b.html', 'b.png'}
+
+    # Nothing to render, so no server; HTML-only renders don't start one either
+    export_figures(figures, tmp_path, formats=['html', 'png'], width=400)
+    export_figures(figures, tmp_path, formats=['html'], force=True)
+    assert len(kaleido.calls) == 2
+    rerun = export_figures(figures, tmp_path, formats=['png'], width=500)
+    assert (rerun['Status'] == 'exported').all()
+    assert kaleido.calls[2:] == [('start', 4), ('stop',)]
+
+
+def test_export_figures_stops_kaleido_server_when_one_fails(tmp_path, monkeypatch):
+    kaleido = FakeKaleido()
+    monkeypatch.setitem(sys.modules, 'kaleido', kaleido)
+    figures = {
+        'a': stub_write_image(make_figure('a')),
+        'broken': stub_write_image(make_figure('broken'), fail=True),
+    }
+    with pytest.raises(RuntimeError, match='render failed'):
+        export_figures(figures, tmp_path, formats=['png'], max_workers=2)
+
+    assert kaleido.calls == [('start', 2), ('stop',)]
+    manifest = json.loads((tmp_path / EXPORT_MANIFEST).read_text())
+    assert set(manifest) == {'a.png'}
+    assert not (tmp_path / 'broken.png').exists()
+    assert not list(tmp_path.glob('.*.tmp.*'))
+
+    rerun = export_figures({'a': figures['a']}, tmp_path, formats=['png'])
+    assert (rerun['Status'] == 'up to date').all()
+    assert len(kaleido.calls) == 2
+
+
+def test_save_figure_default_formats(tmp_path):
+    fig = stub_write_image(make_figure('a'))
+    save_figure(fig, 'a', output_dir=tmp_path)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['a.html', 'a.png']